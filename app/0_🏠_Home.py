@@ -4,6 +4,8 @@ from streamlit_extras.switch_page_button import switch_page
 from dotenv import load_dotenv, find_dotenv
 
 from services.AppData import AppData
+from services.WeatherRefresher import WeatherRefresher
+from services.AttractionsRefresher import AttractionsRefresher
 
 # --------------------------
 # Configurations
@@ -12,6 +14,14 @@ from services.AppData import AppData
 # Load environment variables
 load_dotenv(find_dotenv("../.env"))
 
+# Keep the weather of the upcoming trips up to date (Once per process)
+if AppData().get_config("weather_refresh_enabled"):
+    WeatherRefresher().start()
+
+# Refresh the attractions of the popular destinations before they expire
+if AppData().get_config("attractions_refresh_enabled"):
+    AttractionsRefresher().start()
+
 
 # --------------------------
 # Page
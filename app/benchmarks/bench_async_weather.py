@@ -0,0 +1,192 @@
+"""
+Benchmark the AsyncOpenWeatherMap multi-city fetch against the sync OpenWeatherMap service.
+
+Runs fully offline: the Google Geocoding and OpenWeatherMap APIs are replaced by a fake
+server (httpx mock transports) that adds a fixed latency to every request and answers
+with 429 + Retry-After when more than --server-limit requests are in flight.
+
+Usage (from the repository root, Streamlit warnings go to stderr):
+    python app/benchmarks/bench_async_weather.py [--cities 20] [--latency 0.15] [--concurrency 8] 2>/dev/null
+"""
+
+import os
+import sys
+import time
+import json
+import zlib
+import asyncio
+import argparse
+import tempfile
+import threading
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the real cache and API keys
+os.environ["__CONFIG_OVERRIDE_temp_storage_dir"] = tempfile.mkdtemp()
+os.environ.setdefault("OPENWEATHERMAP_API_KEY", "fake")
+os.environ.setdefault("GOOGLEMAPS_API_KEY", "fake")
+
+from services.AsyncOpenWeatherMap import AsyncOpenWeatherMap  # noqa: E402
+from services.HttpClient import HttpClient  # noqa: E402
+from services.OpenWeatherMap import OpenWeatherMap  # noqa: E402
+
+# --------------------------
+# Fake Server
+# --------------------------
+
+
+class FakeWeatherServer:
+    """
+    Answers the geocoding, forecast and current weather requests with generated data.
+    """
+
+    def __init__(self, latency: float, limit: int):
+        self.latency = latency
+        self.limit = limit
+        self.in_flight = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        if "geocode" in request.url.path:
+            seed = zlib.crc32(params["address"].encode())
+            location = {"lat": -30 + seed % 2500 / 100, "lng": -60 + seed % 2300 / 100}
+            return httpx.Response(
+                200,
+                json={
+                    "status": "OK",
+                    "results": [{"geometry": {"location": location}}],
+                },
+            )
+
+        lat, long = float(params["lat"]), float(params["lon"])
+        if request.url.path.endswith("/forecast"):
+            start = int(time.time()) // 10800 * 10800
+            forecast_list = [
+                {
+                    "dt": start + i * 10800,
+                    "main": {"temp": 20 + (i * 7 + lat) % 12},
+                    "wind": {"speed": (i * 3 + long) % 9},
+                    "weather": [{"description": ("céu limpo", "nublado")[i % 2]}],
+                }
+                for i in range(40)
+            ]
+            return httpx.Response(
+                200, json={"city": {"timezone": -10800}, "list": forecast_list}
+            )
+
+        return httpx.Response(
+            200,
+            json={
+                "name": "Fake",
+                "coord": {"lat": lat, "lon": long},
+                "main": {"temp": 298.15, "pressure": 1013, "humidity": 70},
+                "weather": [{"main": "Clouds", "description": "nublado"}],
+                "dt": int(time.time()),
+            },
+        )
+
+    def _enter(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            if self.in_flight >= self.limit:
+                self.rate_limited += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def sync_handler(self, request: httpx.Request) -> httpx.Response:
+        if not self._enter():
+            return httpx.Response(429, headers={"Retry-After": "1"})
+        try:
+            time.sleep(self.latency)
+            return self.respond(request)
+        finally:
+            self._exit()
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        if not self._enter():
+            return httpx.Response(429, headers={"Retry-After": "1"})
+        try:
+            await asyncio.sleep(self.latency)
+            return self.respond(request)
+        finally:
+            self._exit()
+
+
+def get_cities(count: int) -> list[tuple[str, str]]:
+    with open("data/02_processed/estados-cidades.json", encoding="utf-8") as f:
+        data = json.load(f)
+    cities = [
+        (city, state["sigla"]) for state in data["estados"] for city in state["cidades"]
+    ]
+    return cities[:: max(1, len(cities) // count)][:count]
+
+
+# --------------------------
+# Benchmark
+# --------------------------
+
+
+def run_sync(cities, server) -> float:
+    HttpClient.reset(transport=httpx.MockTransport(server.sync_handler))
+    start = time.perf_counter()
+    open_weather_map = OpenWeatherMap()
+    for city, state in cities:
+        open_weather_map.get_forecast_for_next_5_days(city, state)
+        open_weather_map.get_current_weather(city, state)
+    return time.perf_counter() - start
+
+
+def run_async(cities, server, concurrency) -> float:
+    async def main():
+        open_weather_map = AsyncOpenWeatherMap(
+            concurrency=concurrency,
+            transport=httpx.MockTransport(server.async_handler),
+        )
+        forecasts, weather = await asyncio.gather(
+            open_weather_map.get_forecasts_many(cities),
+            open_weather_map.get_current_weather_many(cities),
+        )
+        assert all(forecasts.values()) and all(weather.values())
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cities", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--server-limit", type=int, default=16)
+    args = parser.parse_args()
+
+    cities = get_cities(args.cities)
+    print(
+        f"{len(cities)} cities, {args.latency * 1000:.0f} ms latency, "
+        f"server limit {args.server_limit} requests in flight"
+    )
+
+    for name, run in (
+        ("sync", lambda server: run_sync(cities, server)),
+        ("async", lambda server: run_async(cities, server, args.concurrency)),
+    ):
+        # Each run starts with empty caches
+        os.environ["__CONFIG_OVERRIDE_temp_storage_dir"] = tempfile.mkdtemp()
+        AsyncOpenWeatherMap._coordinates.clear()
+
+        server = FakeWeatherServer(args.latency, args.server_limit)
+        elapsed = run(server)
+        print(
+            f"{name:<6} {elapsed:7.2f} s  {server.requests:4d} requests  "
+            f"{server.rate_limited:3d} rate limited"
+        )
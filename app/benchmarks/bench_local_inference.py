@@ -0,0 +1,146 @@
+"""
+Compare the local inference backends of the SentimentAnalyzer (and optionally the HuggingFaceProvider).
+
+Each backend runs in its own process, so the peak RSS is not shared between them.
+Reports load time, latency (p50/p95), throughput, peak RSS and the accuracy on a small
+labelled sample, plus the agreement with the original pytorch pipeline.
+
+Usage (from the repository root):
+    python app/benchmarks/bench_local_inference.py [--runs 5] [--backends pytorch quantized onnx] [--llm]
+"""
+
+import os
+import sys
+import time
+import argparse
+import resource
+import statistics
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Labelled sample (text, expected sentiment)
+SAMPLE = [
+    ("Eu amei essa viagem, foi incrível!", "POSITIVE"),
+    ("O hotel era maravilhoso e a equipe muito atenciosa.", "POSITIVE"),
+    ("As praias de Arraial do Cabo são lindas.", "POSITIVE"),
+    ("Adorei a comida do restaurante do centro.", "POSITIVE"),
+    ("Recomendo muito o passeio de barco.", "POSITIVE"),
+    ("Eu odeio esse filme!", "NEGATIVE"),
+    ("O voo atrasou cinco horas, que experiência horrível.", "NEGATIVE"),
+    ("O quarto estava sujo e o ar-condicionado não funcionava.", "NEGATIVE"),
+    ("Choveu a viagem inteira, foi um desastre.", "NEGATIVE"),
+    ("Nunca mais volto nesse lugar.", "NEGATIVE"),
+    ("O ônibus sai da rodoviária às 10 horas.", "NEUTRAL"),
+    ("A cidade fica a 170 km do Rio de Janeiro.", "NEUTRAL"),
+    ("O museu abre de terça a domingo.", "NEUTRAL"),
+    ("Vamos viajar no próximo mês.", "NEUTRAL"),
+]
+
+
+def run_sentiment(backend: str, runs: int, queue: multiprocessing.Queue):
+    from services.SentimentAnalysisProvider import SentimentAnalyzer
+
+    start = time.perf_counter()
+    analyzer = SentimentAnalyzer(backend=backend)
+    load_time = time.perf_counter() - start
+
+    # Warm up
+    analyzer.analyze_sentiment(SAMPLE[0][0])
+
+    latencies = []
+    predictions = []
+    for _ in range(runs):
+        predictions = []
+        for text, _label in SAMPLE:
+            start = time.perf_counter()
+            predictions.append(analyzer.analyze_sentiment(text))
+            latencies.append(time.perf_counter() - start)
+
+    queue.put(
+        {
+            "backend": analyzer.backend,
+            "load_s": load_time,
+            "latencies": latencies,
+            "predictions": predictions,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+    )
+
+
+def run_llm(backend: str, runs: int, queue: multiprocessing.Queue):
+    from services.HuggingFaceProvider import HuggingFaceProvider
+
+    start = time.perf_counter()
+    provider = HuggingFaceProvider(backend=backend)
+    load_time = time.perf_counter() - start
+
+    latencies = []
+    predictions = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        predictions.append(provider.prompt("The capital of Brazil is ..."))
+        latencies.append(time.perf_counter() - start)
+
+    queue.put(
+        {
+            "backend": provider.backend,
+            "load_s": load_time,
+            "latencies": latencies,
+            "predictions": predictions,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+    )
+
+
+def measure(target, backend: str, runs: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=target, args=(backend, runs, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def report(results: list[dict], labels: list[str] = None):
+    baseline = results[0]["predictions"]
+    print(
+        f"{'backend':<10} {'load (s)':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} "
+        f"{'req/s':>7} {'RSS (MB)':>9} {'accuracy':>9} {'parity':>7}"
+    )
+    for result in results:
+        latencies = sorted(result["latencies"])
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        throughput = len(latencies) / sum(latencies)
+        predictions = result["predictions"]
+        parity = sum(a == b for a, b in zip(predictions, baseline)) / len(baseline)
+        accuracy = (
+            sum(a == b for a, b in zip(predictions, labels)) / len(labels)
+            if labels
+            else float("nan")
+        )
+        print(
+            f"{result['backend']:<10} {result['load_s']:>9.2f} {p50:>9.1f} {p95:>9.1f} "
+            f"{throughput:>7.1f} {result['peak_rss_mb']:>9.0f} {accuracy:>9.0%} {parity:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--backends", nargs="+", default=["pytorch", "quantized", "onnx"]
+    )
+    parser.add_argument("--llm", action="store_true", help="Also benchmark TinyLlama")
+    args = parser.parse_args()
+
+    print("## SentimentAnalyzer")
+    results = [measure(run_sentiment, b, args.runs) for b in args.backends]
+    report(results, labels=[label for _text, label in SAMPLE])
+
+    if args.llm:
+        print("\n## HuggingFaceProvider")
+        results = [measure(run_llm, b, 1) for b in args.backends]
+        report(results)
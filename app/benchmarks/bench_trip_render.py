@@ -0,0 +1,85 @@
+"""
+Benchmark a full TripView.render_trip of a stored trip, and the AppData.get_config calls it makes.
+
+Runs fully offline in Streamlit bare mode (The widgets render to nowhere): the trip is the
+test mock, with a summary and itinerary so no AI provider is called, and the Google Maps
+geocoding answers fixed coordinates so only the map URLs are built.
+
+Usage (from the repository root, Streamlit warnings go to stderr):
+    python app/benchmarks/bench_trip_render.py [--renders 200] 2>/dev/null
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the real storage and API keys
+os.environ["__CONFIG_OVERRIDE_temp_storage_dir"] = tempfile.mkdtemp()
+os.environ.setdefault("GOOGLEMAPS_API_KEY", "fake")
+
+from unittest.mock import patch  # noqa: E402
+
+from services.AppData import AppData  # noqa: E402
+from services.GoogleMaps import GoogleMaps  # noqa: E402
+from services.Trip import Trip  # noqa: E402
+from views.TripView import TripView  # noqa: E402
+from tests.mocks import mock_trip_model  # noqa: E402
+
+
+def count_config_calls(view: TripView) -> int:
+    """
+    Count the AppData.get_config calls of one render.
+    """
+    get_config = AppData.get_config
+    calls = 0
+
+    def counting_get_config(self, key):
+        nonlocal calls
+        calls += 1
+        return get_config(self, key)
+
+    with patch.object(AppData, "get_config", counting_get_config):
+        view.render_trip()
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--renders", type=int, default=200)
+    args = parser.parse_args()
+
+    trip_model = mock_trip_model()
+    trip_model.summary = "Uma viagem de teste."
+    trip_model.meta = {"summary_generated": True}
+    view = TripView(Trip().from_model(trip_model))
+
+    location = (trip_model.destination_latitude, trip_model.destination_longitude)
+    with patch.object(GoogleMaps, "get_latitude_longitude", return_value=location):
+        # Warm up the catalogs, indexes and Streamlit
+        for _ in range(3):
+            view.render_trip()
+
+        calls = count_config_calls(view)
+
+        start_time = time.perf_counter()
+        for _ in range(args.renders):
+            view.render_trip()
+        render_ms = (time.perf_counter() - start_time) / args.renders * 1000
+
+    app_data = AppData()
+    start_time = time.perf_counter()
+    for _ in range(10000):
+        app_data.get_config("datetime_display_format")
+    config_us = (time.perf_counter() - start_time) / 10000 * 1e6
+
+    print(f"get_config calls per render: {calls}")
+    print(f"render_trip: {render_ms:.3f} ms")
+    print(f"get_config: {config_us:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
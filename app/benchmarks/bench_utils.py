@@ -0,0 +1,92 @@
+"""
+Benchmark the Utils slug and date helpers over all the municipality names.
+
+Slugifies every city and "city, state" name of the city state data one by one and in a
+single batch (When Utils.slugify_batch exists), then converts the dates of a trip the
+way the pages and the trip loading do.
+
+Usage (from the repository root, Streamlit warnings go to stderr):
+    python app/benchmarks/bench_utils.py [--repeat 5] 2>/dev/null
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta  # noqa: E402
+
+from lib.Utils import Utils  # noqa: E402
+from services.CityState import CityStateData  # noqa: E402
+
+
+def best_of(repeat: int, function) -> float:
+    """
+    Run a function some times and get its fastest run in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    names = []
+    for state in CityStateData().city_state_data.get("estados", []):
+        for city in state["cidades"]:
+            names += [city, f"{city}, {state['nome']}"]
+
+    # Slugs
+    seconds = best_of(args.repeat, lambda: [Utils.slugify(name) for name in names])
+    print(f"slugify: {len(names)} names in {seconds * 1000:.1f} ms")
+    print(f"  {seconds / len(names) * 1e6:.2f} us per name")
+
+    if hasattr(Utils, "slugify_batch"):
+        assert Utils.slugify_batch(names) == [Utils.slugify(name) for name in names]
+        seconds = best_of(args.repeat, lambda: Utils.slugify_batch(names))
+        print(f"slugify_batch: {len(names)} names in {seconds * 1000:.1f} ms")
+        print(f"  {seconds / len(names) * 1e6:.2f} us per name")
+
+    # Dates, as many as the forecasts and days of a long trip
+    start = datetime(2026, 1, 1, 9, 30)
+    datetimes = [start + timedelta(hours=3 * i) for i in range(1000)]
+    dates = [value.date() for value in datetimes]
+    iso_strings = [value.isoformat() for value in datetimes]
+    display_strings = [Utils.to_date_string(value, "display") for value in dates]
+
+    cases = {
+        "to_date_string(date, 'display')": lambda: [
+            Utils.to_date_string(value, format="display") for value in dates
+        ],
+        "to_date_string(datetime)": lambda: [
+            Utils.to_date_string(value) for value in datetimes
+        ],
+        "to_date_string(str, 'iso_date_only')": lambda: [
+            Utils.to_date_string(value, format="iso_date_only") for value in iso_strings
+        ],
+        "to_time_string(datetime)": lambda: [
+            Utils.to_time_string(value) for value in datetimes
+        ],
+        "to_datetime(iso str)": lambda: [
+            Utils.to_datetime(value) for value in iso_strings
+        ],
+        "to_datetime(display str)": lambda: [
+            Utils.to_datetime(value) for value in display_strings
+        ],
+        "to_datetime(date)": lambda: [Utils.to_datetime(value) for value in dates],
+    }
+    for label, function in cases.items():
+        seconds = best_of(args.repeat, function)
+        print(f"{label}: {seconds / 1000 * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
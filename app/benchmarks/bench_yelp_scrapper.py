@@ -0,0 +1,155 @@
+"""
+Benchmark the YelpAttractionsScrapper against the previous sequential html.parser implementation.
+
+Runs fully offline: the proxy is replaced by an httpx mock transport that answers every
+search page with the saved HTML fixture (app/tests/fixtures/yelp_search.html), after a
+fixed latency.
+
+Usage (from the repository root, Streamlit warnings go to stderr):
+    python app/benchmarks/bench_yelp_scrapper.py [--limit 50] [--latency 0.4] [--runs 3] 2>/dev/null
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import bs4
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("RF_PROXY_API_KEY", "fake")
+
+from lib.Utils import Utils  # noqa: E402
+from services.HttpClient import HttpClient  # noqa: E402
+from services.YelpAttractionsScrapper import YelpAttractionsScrapper  # noqa: E402
+from models.Attraction import AttractionModel  # noqa: E402
+
+FIXTURE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "tests",
+    "fixtures",
+    "yelp_search.html",
+)
+
+# --------------------------
+# Previous Implementation
+# --------------------------
+
+
+def legacy_get_near_attractions(
+    city_name, state_name, start=0, limit=18, recursive=True
+):
+    """
+    The scraper before the concurrent fetch: one page after the other, parsed with html.parser.
+    """
+    search_query = Utils.url_encode(f"{city_name}, {state_name}")
+    url = f"https://www.yelp.com.br/search?hl=pt_BR&find_desc=&find_loc={search_query}&start={start}"
+    response = HttpClient().get(
+        f"https://pr.rafaeloliveira.design/?api_key=fake&url={url}"
+    )
+    response.raise_for_status()
+    cards = legacy_parse(response.text, city_name, state_name)[:limit]
+
+    while recursive and len(cards) < limit:
+        _cards = legacy_get_near_attractions(
+            city_name, state_name, start + 10, limit - len(cards), recursive=False
+        )
+        if not _cards:
+            break
+        cards.extend(_cards)
+    return cards
+
+
+def legacy_parse(html, city_name, state_name):
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    cards = []
+    for attraction in soup.select('li div[data-testid="serp-ia-card"]'):
+        anchor = attraction.select_one('a[href^="/biz/"]:has(img)')
+        review_count, review_stars = 0, -1
+        for review in attraction.select("span"):
+            if " reviews)" in review.text:
+                review_count = int(
+                    review.text.replace(" reviews)", "").replace("(", "")
+                )
+                review_stars = float(review.previous_sibling.text)
+        cards.append(
+            AttractionModel(
+                name=anchor.select_one("img")["alt"],
+                city_name=city_name,
+                state_name=state_name,
+                url=f"https://www.yelp.com{anchor['href']}",
+                review_count=review_count,
+                review_stars=review_stars,
+                description="",
+                image=anchor.select_one("img")["src"],
+            )
+        )
+    return cards
+
+
+# --------------------------
+# Benchmark
+# --------------------------
+
+
+def run(get_attractions, city_name, limit, latency, html) -> tuple[float, int]:
+    def handler(request: httpx.Request) -> httpx.Response:
+        time.sleep(latency)
+        return httpx.Response(200, text=html)
+
+    HttpClient.reset(transport=httpx.MockTransport(handler))
+    start = time.perf_counter()
+    cards = get_attractions(city_name, "SP", 0, limit)
+    return time.perf_counter() - start, len(cards)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.4)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(FIXTURE, encoding="utf-8") as f:
+        html = f.read()
+
+    # Parsing only, one page
+    parse_times = {}
+    for name, parse in (
+        ("html.parser", lambda: legacy_parse(html, "São Paulo", "SP")),
+        (
+            "lxml",
+            lambda: YelpAttractionsScrapper()._parse_attractions(
+                html, "São Paulo", "SP"
+            ),
+        ),
+    ):
+        start = time.perf_counter()
+        for _ in range(20):
+            parse()
+        parse_times[name] = (time.perf_counter() - start) / 20
+    print(
+        f"parse one page ({len(html) // 1024} KB): html.parser "
+        f"{parse_times['html.parser'] * 1000:.1f} ms, lxml {parse_times['lxml'] * 1000:.1f} ms"
+    )
+
+    print(
+        f"limit={args.limit}, {args.latency * 1000:.0f} ms per page, {args.runs} runs"
+    )
+    scrapper = YelpAttractionsScrapper()
+    for name, get_attractions in (
+        ("sequential", legacy_get_near_attractions),
+        ("concurrent", scrapper.get_near_attractions),
+    ):
+        times = []
+        for i in range(args.runs):
+            # A new city on each run, so the Streamlit caches never hit
+            elapsed, count = run(
+                get_attractions, f"Cidade {name} {i}", args.limit, args.latency, html
+            )
+            times.append(elapsed)
+        print(
+            f"{name:<11} {statistics.median(times):6.2f} s median  {count} attractions"
+        )
@@ -0,0 +1,163 @@
+import numpy as np
+
+from bisect import bisect_left
+from typing import Iterable
+
+from lib.SearchIndex import SearchIndex
+
+
+class AutocompleteIndex:
+    """
+    A prefix index of names, for autocompletion.
+
+    Every word start of every name is a sorted key (e.g. "sao paulo" and "paulo" for
+    "São Paulo"), so a prefix of any of its words finds a name with a binary search.
+    The keys are folded like the SearchIndex terms, so the lookup is case and accent insensitive.
+
+    The matches are ranked by weight (e.g. popularity), then the names that start with the
+    query, then the shortest names. When nothing matches, the prefixes one typo away from
+    the query (A letter deleted, replaced, inserted or swapped) are looked up instead.
+    """
+
+    # Typos are only looked up for queries with at least this many letters
+    MIN_TYPO_LENGTH = 3
+    # Length of the key prefixes kept in a set, to skip the typos that match no key
+    PREFIX_SET_LENGTH = 6
+
+    def __init__(self, names: Iterable[str], weights: Iterable[float] = None):
+        """
+        Initialize the AutocompleteIndex class.
+
+        Args:
+            names (Iterable[str]): The names to index, their position is their ID.
+            weights (Iterable[float], optional): The weight of each name, higher first.
+        """
+        keys, lengths = [], []
+        for name_id, name in enumerate(names):
+            words = SearchIndex.tokenize(name)
+            keys.extend(
+                (" ".join(words[i:]), name_id, i > 0) for i in range(len(words))
+            )
+            lengths.append(len(name))
+        keys.sort()
+
+        self.size = len(lengths)
+        self._keys = [key for key, _, _ in keys]
+        self._ids = np.array([name_id for _, name_id, _ in keys], dtype=np.int64)
+        self._inner = np.array([inner for _, _, inner in keys], dtype=bool)
+        self._lengths = np.array(lengths, dtype=np.int64)
+        self._weights = np.zeros(self.size, dtype=np.float64)
+        if weights is not None:
+            self.set_weights(weights)
+        self._alphabet = sorted(set("".join(self._keys)))
+        self._prefixes = {
+            key[:length]
+            for key in self._keys
+            for length in range(1, self.PREFIX_SET_LENGTH + 1)
+        }
+
+    def suggest(self, query: str, limit: int = 10) -> list[int]:
+        """
+        Find the names that complete a query, best first.
+
+        Args:
+            query (str): The beginning of a name, or of any of its words.
+            limit (int, optional): The maximum number of names. Defaults to 10.
+
+        Returns:
+            list[int]: The name IDs.
+        """
+        query = " ".join(SearchIndex.tokenize(query))
+        if not query or limit <= 0:
+            return []
+
+        matches = self._get_range(query)
+        if not matches and len(query) >= self.MIN_TYPO_LENGTH:
+            return self._rank(
+                [self._get_range(typo) for typo in self._get_typos(query)], limit
+            )
+        return self._rank([matches], limit)
+
+    def set_weights(self, weights: Iterable[float]) -> None:
+        """
+        Replace the weights of the names, e.g. when their popularity changes.
+
+        Args:
+            weights (Iterable[float]): The weight of each name, higher first.
+        """
+        self._weights = np.fromiter(weights, dtype=np.float64, count=self.size)
+
+    def __len__(self) -> int:
+        return self.size
+
+    # --------------------------
+    # Lookup
+    # --------------------------
+
+    def _get_range(self, prefix: str) -> range:
+        """
+        Get the positions of the keys that start with a prefix.
+
+        Args:
+            prefix (str): The folded prefix.
+
+        Returns:
+            range: The positions in the sorted keys.
+        """
+        start = bisect_left(self._keys, prefix)
+        if start == len(self._keys) or not self._keys[start].startswith(prefix):
+            return range(0)
+        return range(start, bisect_left(self._keys, prefix + "\uffff", start))
+
+    def _rank(self, ranges: list[range], limit: int) -> list[int]:
+        """
+        Rank the names of the keys in some ranges.
+
+        Args:
+            ranges (list[range]): The positions of the matching keys.
+            limit (int): The maximum number of names.
+
+        Returns:
+            list[int]: The name IDs, best first.
+        """
+        ranges = [r for r in ranges if r]
+        if not ranges:
+            return []
+        positions = np.concatenate([np.arange(r.start, r.stop) for r in ranges])
+
+        # One match per name, preferring its first word
+        ids, inner = self._ids[positions], self._inner[positions]
+        order = np.lexsort((inner, ids))
+        ids, inner = ids[order], inner[order]
+        first = np.ones(len(ids), dtype=bool)
+        first[1:] = ids[1:] != ids[:-1]
+        ids, inner = ids[first], inner[first]
+
+        order = np.lexsort((ids, self._lengths[ids], inner, -self._weights[ids]))
+        return ids[order[:limit]].tolist()
+
+    def _get_typos(self, query: str) -> set[str]:
+        """
+        Get the strings one typo away from a query, that start like some key.
+
+        Args:
+            query (str): The folded query.
+
+        Returns:
+            set[str]: The deletions, replacements, insertions and swaps of the query.
+        """
+        typos = set()
+        for i in range(len(query) + 1):
+            head, tail = query[:i], query[i:]
+            if tail:
+                typos.add(head + tail[1:])
+            if len(tail) > 1:
+                typos.add(head + tail[1] + tail[0] + tail[2:])
+            # Letters added at the end are already matched by the prefix
+            if tail:
+                for letter in self._alphabet:
+                    typos.add(head + letter + tail)
+                    typos.add(head + letter + tail[1:])
+        typos.discard(query)
+        length = self.PREFIX_SET_LENGTH
+        return {typo for typo in typos if typo[:length] in self._prefixes}
@@ -0,0 +1,97 @@
+from datetime import datetime, date
+from typing import Iterator, List
+
+from lib.Utils import Utils
+
+from models.Weather import ForecastModel
+
+
+class ForecastIndex:
+    """
+    A list of forecasts indexed by calendar date.
+
+    The index is built once (O(forecasts)) and each lookup by date is O(1),
+    so it can be shared by everything that needs to match forecasts to trip days.
+    Only the first forecast found for each date is kept.
+    """
+
+    def __init__(self, forecast_list: List[ForecastModel | dict] = None):
+        """
+        Initialize the ForecastIndex class.
+
+        Args:
+            forecast_list (List[ForecastModel | dict], optional): The forecasts to index.
+        """
+        self._by_date: dict[date, ForecastModel] = {}
+
+        for forecast in forecast_list or []:
+            # Convert to ForecastModel object if not already
+            if not isinstance(forecast, ForecastModel):
+                forecast = ForecastModel(**forecast)
+
+            self._by_date.setdefault(self.to_date(forecast.date), forecast)
+
+    def get(self, day: date | datetime | str) -> ForecastModel | None:
+        """
+        Get the forecast for a calendar date.
+
+        Args:
+            day (date | datetime | str): The date to look for.
+
+        Returns:
+            ForecastModel | None: The forecast for the date, or None if not available.
+        """
+        return self._by_date.get(self.to_date(day))
+
+    def between(
+        self, start_date: date | datetime | str, end_date: date | datetime | str
+    ) -> List[ForecastModel]:
+        """
+        Get the forecasts between two calendar dates (inclusive), sorted by date.
+
+        Args:
+            start_date (date | datetime | str): The first date.
+            end_date (date | datetime | str): The last date.
+
+        Returns:
+            List[ForecastModel]: The forecasts within the dates.
+        """
+        start_date = self.to_date(start_date)
+        end_date = self.to_date(end_date)
+        return [
+            forecast
+            for day, forecast in sorted(self._by_date.items())
+            if start_date <= day <= end_date
+        ]
+
+    def to_list(self) -> List[ForecastModel]:
+        """
+        Get all the indexed forecasts, one per date, sorted by date.
+
+        Returns:
+            List[ForecastModel]: The forecasts.
+        """
+        return [forecast for _, forecast in sorted(self._by_date.items())]
+
+    def __len__(self) -> int:
+        return len(self._by_date)
+
+    def __iter__(self) -> Iterator[ForecastModel]:
+        return iter(self.to_list())
+
+    @staticmethod
+    def to_date(value: date | datetime | str) -> date:
+        """
+        Convert a date, datetime or iso string to a calendar date.
+
+        Args:
+            value (date | datetime | str): The value to convert.
+
+        Returns:
+            date: The calendar date.
+        """
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return Utils.to_datetime(value).date()
@@ -0,0 +1,202 @@
+import math
+import numpy as np
+
+from typing import Iterable
+
+
+class GeoIndex:
+    """
+    A spatial index of points (latitude, longitude), with haversine distances in km.
+
+    The points are bucketed in a grid of 'cell_degrees' cells, so a radius query only
+    measures the points of the cells that overlap its bounding box, and a nearest query
+    grows its radius until it holds enough points.
+    """
+
+    EARTH_RADIUS_KM = 6371.0088
+    KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+    def __init__(
+        self,
+        points: Iterable[tuple[float, float] | None],
+        cell_degrees: float = 1.0,
+    ):
+        """
+        Initialize the GeoIndex class.
+
+        Args:
+            points (Iterable[tuple[float, float] | None]): The (latitude, longitude) of each point,
+                their position is their ID. Points without coordinates (None) are not indexed.
+            cell_degrees (float, optional): The size of the grid cells in degrees. Defaults to 1.
+        """
+        self.cell_degrees = float(cell_degrees)
+        self.lon_cells = max(1, math.ceil(360 / self.cell_degrees))
+
+        ids, lats, lons = [], [], []
+        for point_id, point in enumerate(points):
+            if point and point[0] is not None and point[1] is not None:
+                ids.append(point_id)
+                lats.append(point[0])
+                lons.append(point[1])
+
+        self._ids = np.asarray(ids, dtype=np.int64)
+        self._lats = np.radians(np.asarray(lats, dtype=np.float64))
+        self._lons = np.radians(np.asarray(lons, dtype=np.float64))
+
+        # Grid cells: (latitude cell, longitude cell) -> positions in the arrays
+        cells: dict[tuple[int, int], list[int]] = {}
+        for position, cell in enumerate(zip(*self._get_cells(lats, lons))):
+            cells.setdefault(cell, []).append(position)
+        self._cells = {
+            cell: np.asarray(positions, dtype=np.int64)
+            for cell, positions in cells.items()
+        }
+
+    def within_radius(
+        self, lat: float, lon: float, km: float
+    ) -> list[tuple[int, float]]:
+        """
+        Find the points within a distance, nearest first.
+
+        Args:
+            lat (float): The latitude of the center.
+            lon (float): The longitude of the center.
+            km (float): The radius in km.
+
+        Returns:
+            list[tuple[int, float]]: The point IDs and their distances in km.
+        """
+        positions = self._get_candidates(lat, lon, km)
+        distances = self.haversine(
+            lat, lon, self._lats[positions], self._lons[positions]
+        )
+        inside = distances <= km
+        positions, distances = positions[inside], distances[inside]
+
+        order = np.lexsort((self._ids[positions], distances))
+        return [(int(self._ids[positions[i]]), float(distances[i])) for i in order]
+
+    def nearest(
+        self, lat: float, lon: float, k: int = 10, max_km: float = None
+    ) -> list[tuple[int, float]]:
+        """
+        Find the nearest points, nearest first.
+
+        Args:
+            lat (float): The latitude of the center.
+            lon (float): The longitude of the center.
+            k (int, optional): The maximum number of points. Defaults to 10.
+            max_km (float, optional): The maximum distance in km. Defaults to no limit.
+
+        Returns:
+            list[tuple[int, float]]: The point IDs and their distances in km.
+        """
+        if k <= 0 or not len(self):
+            return []
+
+        # Grow the radius until it holds k points (Or the whole globe)
+        max_radius = math.pi * self.EARTH_RADIUS_KM
+        radius = self.cell_degrees * self.KM_PER_DEGREE
+        while True:
+            radius = min(radius, max_radius, max_km or max_radius)
+            points = self.within_radius(lat, lon, radius)
+            if len(points) >= k or radius >= min(max_radius, max_km or max_radius):
+                return points[:k]
+            radius *= 2
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @classmethod
+    def haversine(
+        cls, lat: float, lon: float, lats: np.ndarray, lons: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calculate the great-circle distances from a point.
+
+        Args:
+            lat (float): The latitude of the point in degrees.
+            lon (float): The longitude of the point in degrees.
+            lats (np.ndarray): The latitudes of the other points in radians.
+            lons (np.ndarray): The longitudes of the other points in radians.
+
+        Returns:
+            np.ndarray: The distances in km.
+        """
+        lat, lon = math.radians(lat), math.radians(lon)
+        a = (
+            np.sin((lats - lat) / 2) ** 2
+            + math.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+        )
+        return 2 * cls.EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+    # --------------------------
+    # Grid
+    # --------------------------
+
+    def _get_cells(
+        self, lats: list[float], lons: list[float]
+    ) -> tuple[list[int], list[int]]:
+        """
+        Get the grid cells of points in degrees.
+
+        Args:
+            lats (list[float]): The latitudes.
+            lons (list[float]): The longitudes.
+
+        Returns:
+            tuple[list[int], list[int]]: The latitude and longitude cells.
+        """
+        lat_cells = np.floor(np.asarray(lats, dtype=np.float64) / self.cell_degrees)
+        lon_cells = np.floor(np.asarray(lons, dtype=np.float64) / self.cell_degrees)
+        return (
+            lat_cells.astype(int).tolist(),
+            (lon_cells.astype(int) % self.lon_cells).tolist(),
+        )
+
+    def _get_candidates(self, lat: float, lon: float, km: float) -> np.ndarray:
+        """
+        Get the positions of the points in the cells that overlap the bounding box of a circle.
+
+        Args:
+            lat (float): The latitude of the center.
+            lon (float): The longitude of the center.
+            km (float): The radius in km.
+
+        Returns:
+            np.ndarray: The positions of the candidate points.
+        """
+        delta_lat = km / self.KM_PER_DEGREE
+        min_lat, max_lat = lat - delta_lat, lat + delta_lat
+        lat_cells = range(
+            math.floor(min_lat / self.cell_degrees),
+            math.floor(max_lat / self.cell_degrees) + 1,
+        )
+
+        # The box is widest on its side closest to a pole, where it may cover every longitude
+        lon_cells = range(self.lon_cells)
+        if max_lat < 90 and min_lat > -90:
+            cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+            delta_lon = km / (self.KM_PER_DEGREE * cos_lat)
+            if delta_lon < 180:
+                lon_cells = range(
+                    math.floor((lon - delta_lon) / self.cell_degrees),
+                    math.floor((lon + delta_lon) / self.cell_degrees) + 1,
+                )
+
+        # Look up the cells of the box, or filter the indexed cells if there are fewer
+        if len(lat_cells) * len(lon_cells) <= len(self._cells):
+            positions = [
+                self._cells[(lat_cell, lon_cell % self.lon_cells)]
+                for lat_cell in lat_cells
+                for lon_cell in lon_cells
+                if (lat_cell, lon_cell % self.lon_cells) in self._cells
+            ]
+        else:
+            lon_set = {lon_cell % self.lon_cells for lon_cell in lon_cells}
+            positions = [
+                cell_positions
+                for (lat_cell, lon_cell), cell_positions in self._cells.items()
+                if lat_cell in lat_cells and lon_cell in lon_set
+            ]
+        return np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
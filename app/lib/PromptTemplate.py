@@ -0,0 +1,148 @@
+import os
+import re
+import threading
+import yaml
+
+from functools import lru_cache
+
+
+class PromptTemplate:
+    """
+    A prompt template compiled once into a list of literal and placeholder segments.
+
+    Rendering walks the segments a single time, so the inserted values are never scanned
+    again for other placeholders. Reserved markers found inside the values are removed.
+    """
+
+    # Parsed config files: path -> (mtime, data)
+    _config_cache: dict[str, tuple[float, dict]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, template: str, placeholders: tuple[str, ...]):
+        """
+        Initialize and compile the template.
+
+        Args:
+            template (str): The template text.
+            placeholders (tuple[str, ...]): The reserved markers (e.g. '%%LOCATION%%').
+        """
+        self.template = template
+        self.placeholders = tuple(placeholders)
+        self._marker_re = re.compile(
+            "|".join(re.escape(placeholder) for placeholder in self.placeholders)
+        )
+        self.segments = self._compile(template)
+
+    def render(self, values: dict[str, str]) -> str:
+        """
+        Render the template in a single pass.
+
+        Placeholders without a value are kept as they are.
+
+        Args:
+            values (dict[str, str]): The values to insert, keyed by marker.
+
+        Returns:
+            str: The rendered text.
+        """
+        parts = []
+        for is_placeholder, text in self.segments:
+            if is_placeholder and values.get(text) is not None:
+                parts.append(self.escape(str(values[text])))
+            else:
+                parts.append(text)
+        return "".join(parts)
+
+    def escape(self, text: str) -> str:
+        """
+        Remove the reserved markers from a value.
+
+        Args:
+            text (str): The text to escape.
+
+        Returns:
+            str: The text without reserved markers.
+        """
+        if "%%" not in text:
+            return text
+        return self._marker_re.sub("", text)
+
+    # --------------------------
+    # Loaders
+    # --------------------------
+
+    @staticmethod
+    def from_string(template: str, placeholders: tuple[str, ...]) -> "PromptTemplate":
+        """
+        Get a compiled template for the given text (Compiled templates are cached).
+
+        Args:
+            template (str): The template text.
+            placeholders (tuple[str, ...]): The reserved markers.
+
+        Returns:
+            PromptTemplate: The compiled template.
+        """
+        return _compile_cached(template, tuple(placeholders))
+
+    @staticmethod
+    def from_config(
+        config_file: str, template_key: str, placeholders: tuple[str, ...]
+    ) -> "PromptTemplate":
+        """
+        Get a compiled template from a YAML config file.
+
+        The file is parsed once per process and parsed again only when it changes on disk.
+
+        Args:
+            config_file (str): The path of the YAML config file.
+            template_key (str): The key of the template in the config file.
+            placeholders (tuple[str, ...]): The reserved markers.
+
+        Returns:
+            PromptTemplate: The compiled template.
+
+        Raises:
+            KeyError: If the template key does not exist in the config file.
+        """
+        mtime = os.path.getmtime(config_file)
+        cached = PromptTemplate._config_cache.get(config_file)
+
+        if not cached or cached[0] != mtime:
+            with PromptTemplate._lock:
+                with open(config_file, "r", encoding="utf-8") as file:
+                    data = yaml.safe_load(file)
+                cached = (mtime, data)
+                PromptTemplate._config_cache[config_file] = cached
+
+        return PromptTemplate.from_string(cached[1][template_key], placeholders)
+
+    # --------------------------
+    # Utils
+    # --------------------------
+
+    def _compile(self, template: str) -> list[tuple[bool, str]]:
+        """
+        Split the template into literal and placeholder segments.
+
+        Args:
+            template (str): The template text.
+
+        Returns:
+            list[tuple[bool, str]]: The segments as (is_placeholder, text) pairs.
+        """
+        segments = []
+        position = 0
+        for match in self._marker_re.finditer(template):
+            if match.start() > position:
+                segments.append((False, template[position : match.start()]))
+            segments.append((True, match.group(0)))
+            position = match.end()
+        if position < len(template):
+            segments.append((False, template[position:]))
+        return segments
+
+
+@lru_cache(maxsize=64)
+def _compile_cached(template: str, placeholders: tuple[str, ...]) -> PromptTemplate:
+    return PromptTemplate(template, placeholders)
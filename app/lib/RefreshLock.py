@@ -0,0 +1,83 @@
+import os
+import time
+import threading
+
+
+class RefreshLock:
+    """
+    Marks the keys being refreshed, so each key is refreshed once across threads and processes.
+
+    A key is held in memory by this process and by a lock file created exclusively, which the
+    other processes can not create again until it is released. A lock file older than
+    'max_age' seconds is taken over, as it was left behind by a crashed refresh.
+    """
+
+    def __init__(self, max_age: float):
+        """
+        Initialize the RefreshLock class.
+
+        Args:
+            max_age (float): The seconds after which a lock file is considered stale.
+        """
+        self.max_age = max_age
+        self._keys: set[str] = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, lock_path: str) -> bool:
+        """
+        Mark a key as being refreshed.
+
+        Args:
+            key (str): The key.
+            lock_path (str): The lock file of the key, shared with the other processes.
+
+        Returns:
+            bool: True if the key was not being refreshed, by this process or another one.
+        """
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+
+        acquired = False
+        try:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > self.max_age:
+                    os.remove(lock_path)  # Left behind by a crashed refresh
+            except OSError:
+                pass
+            os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL))
+            acquired = True
+        except FileExistsError:
+            pass
+        finally:
+            if not acquired:
+                with self._lock:
+                    self._keys.discard(key)
+        return acquired
+
+    def release(self, key: str, lock_path: str) -> None:
+        """
+        Mark a key as refreshed, removing its lock file.
+
+        Args:
+            key (str): The key.
+            lock_path (str): The lock file of the key.
+        """
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+        with self._lock:
+            self._keys.discard(key)
+
+    def get_keys(self) -> list[str]:
+        """
+        Get the keys being refreshed by this process.
+
+        Returns:
+            list[str]: The keys, sorted.
+        """
+        with self._lock:
+            return sorted(self._keys)
@@ -0,0 +1,162 @@
+import re
+import numpy as np
+
+from array import array
+from functools import lru_cache
+from typing import Iterable
+
+from lib.Utils import Utils
+
+
+class SearchIndex:
+    """
+    An inverted index of text documents, ranked with BM25.
+
+    Each field of a document is weighted (e.g. a match in the name counts more than in the
+    description), and the final score can be boosted by a prior in [0, 1] of each document
+    (e.g. its popularity): score = bm25 * (1 + prior_weight * prior).
+
+    The BM25 weight of each posting is computed when the index is built, so a query only
+    adds up the weights of the postings of its terms and selects the best documents.
+    The text is folded with Utils.slugify, so the search is case and accent insensitive.
+    """
+
+    WORD_PATTERN = re.compile(r"[^\W_]+")
+
+    def __init__(
+        self,
+        documents: Iterable[dict[str, str]],
+        field_weights: dict[str, float],
+        stopwords: Iterable[str] = (),
+        priors: Iterable[float] = None,
+        prior_weight: float = 0.0,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        """
+        Initialize the SearchIndex class.
+
+        Args:
+            documents (Iterable[dict[str, str]]): The documents to index, their position is their ID.
+            field_weights (dict[str, float]): The fields to index and the weight of their terms.
+            stopwords (Iterable[str], optional): The words that are not indexed.
+            priors (Iterable[float], optional): The prior of each document, in [0, 1].
+            prior_weight (float, optional): How much the prior boosts the score. Defaults to 0.
+            k1 (float, optional): The BM25 term frequency saturation. Defaults to 1.2.
+            b (float, optional): The BM25 document length normalization. Defaults to 0.75.
+        """
+        self.stopwords = {token for word in stopwords for token in self.tokenize(word)}
+
+        # One row per term occurrence: (term ID, document ID, field weight)
+        term_ids: dict[str, int] = {}
+        rows_term, rows_doc, rows_weight = array("q"), array("q"), array("f")
+        lengths = array("f")
+        for doc_id, document in enumerate(documents):
+            length = 0.0
+            for field, weight in field_weights.items():
+                terms = self.tokenize(document.get(field) or "", self.stopwords)
+                rows_term.extend([term_ids.setdefault(t, len(term_ids)) for t in terms])
+                rows_doc.extend([doc_id] * len(terms))
+                rows_weight.extend([weight] * len(terms))
+                length += weight * len(terms)
+            lengths.append(length)
+
+        self.size = len(lengths)
+        lengths = np.frombuffer(lengths, dtype=np.float32)
+        average_length = float(lengths.mean()) if self.size else 0.0
+        norms = k1 * (1 - b + b * lengths / (average_length or 1.0))
+
+        # Sum the weighted frequency of each (term, document), sorted by term then document
+        keys, inverse = np.unique(
+            np.frombuffer(rows_term, dtype=np.int64) * max(self.size, 1)
+            + np.frombuffer(rows_doc, dtype=np.int64),
+            return_inverse=True,
+        )
+        tf = np.bincount(
+            inverse, weights=np.frombuffer(rows_weight, dtype=np.float32)
+        ).astype(np.float32)
+        terms, doc_ids = np.divmod(keys, max(self.size, 1))
+        doc_ids = doc_ids.astype(np.int32)
+
+        # BM25 weight of each posting
+        document_frequency = np.bincount(terms, minlength=len(term_ids))
+        idf = np.log1p(
+            (self.size - document_frequency + 0.5) / (document_frequency + 0.5)
+        )
+        weights = (idf[terms] * tf * (k1 + 1) / (tf + norms[doc_ids])).astype(
+            np.float32
+        )
+
+        # Postings of each term: (document IDs, BM25 weights)
+        bounds = np.searchsorted(terms, np.arange(len(term_ids) + 1))
+        self._postings: dict[str, tuple[np.ndarray, np.ndarray]] = {
+            term: (
+                doc_ids[bounds[i] : bounds[i + 1]],
+                weights[bounds[i] : bounds[i + 1]],
+            )
+            for term, i in term_ids.items()
+        }
+
+        self._boosts = np.ones(self.size, dtype=np.float32)
+        if priors is not None:
+            priors = np.clip(np.fromiter(priors, dtype=np.float32), 0, 1)
+            self._boosts += prior_weight * priors
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[int, float]]:
+        """
+        Search the documents that match any term of the query, best first.
+
+        Args:
+            query (str): The search query.
+            limit (int, optional): The maximum number of results. Defaults to 10.
+
+        Returns:
+            list[tuple[int, float]]: The document IDs and their scores.
+        """
+        terms = dict.fromkeys(self.tokenize(query, self.stopwords))
+        postings = [self._postings[term] for term in terms if term in self._postings]
+        if not postings or limit <= 0:
+            return []
+
+        scores = np.zeros(self.size, dtype=np.float32)
+        for doc_ids, weights in postings:
+            scores[doc_ids] += weights
+
+        candidates = np.flatnonzero(scores)
+        scores = scores[candidates] * self._boosts[candidates]
+        if len(candidates) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[best], scores[best]
+
+        # Best score first, then the first indexed
+        order = np.lexsort((candidates, -scores))
+        return [(int(candidates[i]), float(scores[i])) for i in order]
+
+    def __len__(self) -> int:
+        return self.size
+
+    @staticmethod
+    def tokenize(text: str, stopwords: set[str] = None) -> list[str]:
+        """
+        Split a text into lowercase terms without accents.
+
+        Args:
+            text (str): The text to split.
+            stopwords (set[str], optional): The terms to skip.
+
+        Returns:
+            list[str]: The terms.
+        """
+        stopwords = stopwords or ()
+        terms = [
+            # ASCII words are already folded, the others go through Utils.slugify
+            word if word.isascii() else SearchIndex._fold(word)
+            for word in SearchIndex.WORD_PATTERN.findall(text.lower())
+        ]
+        return [term for term in terms if term and term not in stopwords]
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _fold(word: str) -> str:
+        # Most words repeat across documents, fold each one only once
+        return Utils.slugify(word)
@@ -1,13 +1,43 @@
 import re
+import unicodedata
 import requests
 import json
 
 from datetime import datetime, date
+from functools import lru_cache
+from typing import Iterable
 
 from services.AppData import AppData
 
 
 class Utils:
+    # Slug characters: the accented letters as ASCII, then the bytes to keep or map
+    SLUG_ACCENTS = {
+        "a": "àáâãäå",
+        "e": "èéêë",
+        "i": "ìíîï",
+        "o": "òóôõö",
+        "u": "ùúûü",
+        "n": "ñ",
+        "c": "ç",
+    }
+    _slug_accents = str.maketrans(
+        {
+            accent: letter
+            for letter, accents in SLUG_ACCENTS.items()
+            for accent in accents
+        }
+    )
+    _slug_known_chars = frozenset(map(chr, range(128))) | frozenset(
+        "".join(SLUG_ACCENTS.values())
+    )
+    _slug_bytes = bytes.maketrans(b" ", b"-")
+    _slug_delete = bytes(
+        set(range(256)) - set(b" -abcdefghijklmnopqrstuvwxyz0123456789")
+    )
+    _slug_batch_delete = _slug_delete.replace(b"\n", b"")
+    _hyphens = re.compile(r"-{2,}")
+
     @staticmethod
     def slugify(string: str) -> str:
         """
@@ -25,31 +55,63 @@ class Utils:
         Returns:
             str: Slugified version of the input string.
         """
-        # Convert to lowercase and replace spaces with hyphens
-        slug = string.lower().replace(" ", "-")
-
-        # Replace accented characters with their ASCII equivalents
-        accents_mapping = {
-            r"[àáâãäå]": "a",
-            r"[èéêë]": "e",
-            r"[ìíîï]": "i",
-            r"[òóôõö]": "o",
-            r"[ùúûü]": "u",
-            r"[ñ]": "n",
-            r"[ç]": "c",
-        }
-        for pattern, replacement in accents_mapping.items():
-            slug = re.sub(pattern, replacement, slug)
-
-        # Remove any characters that are not alphanumeric or hyphens
-        slug = re.sub(r"[^a-z0-9-]", "", slug)
+        slug = Utils._to_slug_bytes(string.lower(), Utils._slug_delete)
 
         # Reduce consecutive hyphens to a single hyphen
-        slug = re.sub(r"-+", "-", slug)
+        if "--" in slug:
+            slug = Utils._hyphens.sub("-", slug)
 
         # Strip hyphens from the beginning and end of the string
         return slug.strip("-")
 
+    @staticmethod
+    def slugify_batch(strings: Iterable[str]) -> list[str]:
+        """
+        Convert many strings to slugs at once, the same as 'slugify' on each one.
+
+        The strings are joined by newlines and converted in a single pass, then split.
+
+        Args:
+            strings (Iterable[str]): Input strings to be slugified.
+
+        Returns:
+            list[str]: Slugified version of each input string.
+        """
+        strings = list(strings)
+        if not strings:
+            return []
+
+        # The newlines must only be the separators
+        text = "\n".join(strings)
+        if text.count("\n") != len(strings) - 1:
+            return [Utils.slugify(string) for string in strings]
+
+        text = Utils._to_slug_bytes(text.lower(), Utils._slug_batch_delete)
+        text = Utils._hyphens.sub("-", text)
+        return [slug.strip("-") for slug in text.split("\n")]
+
+    @staticmethod
+    def _to_slug_bytes(string: str, delete: bytes) -> str:
+        """
+        Map the characters of a lowercase string to the slug characters, in bulk.
+
+        Args:
+            string (str): The lowercase string.
+            delete (bytes): The ASCII characters to remove.
+
+        Returns:
+            str: The string with its spaces as hyphens, its accents as ASCII letters and
+                anything else removed.
+        """
+        if string.isascii():
+            data = string.encode("ascii")
+        elif Utils._slug_known_chars.issuperset(string):
+            # Only the known accents, each decomposes to its letter and a combining mark
+            data = unicodedata.normalize("NFD", string).encode("ascii", "ignore")
+        else:
+            data = string.translate(Utils._slug_accents).encode("ascii", "ignore")
+        return data.translate(Utils._slug_bytes, delete).decode("ascii")
+
     @staticmethod
     def is_json(data: str) -> bool:
         """
@@ -99,16 +161,18 @@ class Utils:
         """
         # Convert string to datetime object from isoformat
         if isinstance(_date, str):
-            _date = datetime.fromisoformat(_date)
+            _date = Utils._from_isoformat(_date)
 
         # Convert date to datetime object
         if isinstance(_date, date):
             _date = datetime.combine(_date, datetime.min.time())
 
         if format == "display":
-            return str(_date.strftime(AppData().get_config("datetime_display_format")))
+            return Utils._strftime(
+                _date, AppData().get_config("datetime_display_format")
+            )
         elif format == "iso_date_only":
-            return _date.strftime("%Y-%m-%d")
+            return Utils._strftime(_date, "%Y-%m-%d")
         else:
             # Return isoformat by default
             return _date.isoformat()
@@ -158,9 +222,14 @@ class Utils:
         """
         # Convert string to datetime object from isoformat
         if isinstance(_time, str):
-            _time = datetime.fromisoformat(_time)
+            _time = Utils._from_isoformat(_time)
 
-        return str(_time.strftime(AppData().get_config("time_display_format")))
+        format = AppData().get_config("time_display_format")
+
+        # Aware times of the same instant are equal, they would share a cached string
+        if _time.tzinfo is not None:
+            return str(_time.strftime(format))
+        return Utils._strftime(_time, format)
 
     @staticmethod
     def to_datetime(_date: str | date) -> datetime:
@@ -179,7 +248,7 @@ class Utils:
         try:
             # If we have a string we convert it to a datetime object
             if isinstance(_date, str):
-                _date = datetime.fromisoformat(_date)
+                _date = Utils._from_isoformat(_date)
 
             # If we have a date object we convert it to a datetime object
             if isinstance(_date, date):
@@ -187,8 +256,28 @@ class Utils:
 
         # Attempt to convert from display format
         except ValueError:
-            _date = datetime.strptime(
+            _date = Utils._strptime(
                 _date, AppData().get_config(f"datetime_display_format")
             )
 
         return _date
+
+    # --------------------------
+    # Date Caches
+    # --------------------------
+    # The same few dates are converted on every rerun, the results are immutable
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _strftime(_date: date, format: str) -> str:
+        return str(_date.strftime(format))
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _from_isoformat(_date: str) -> datetime:
+        return datetime.fromisoformat(_date)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _strptime(_date: str, format: str) -> datetime:
+        return datetime.strptime(_date, format)
@@ -20,6 +20,8 @@ class AttractionModel(BaseModel):
     review_stars: confloat(ge=-1, le=5) = Field(default=0)  # type: ignore
     description: str
     image: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     @field_validator("created_at")
     def convert_to_datetime(cls, value):
@@ -34,3 +36,10 @@ class AttractionModel(BaseModel):
         if not value:
             return AppData().get_assets_dir() + "location-placeholder.png"
         return value
+
+
+class AttractionRefModel(BaseModel):
+    """A reference from a trip to an attraction of the catalog, with the hash of its saved snapshot."""
+
+    id: str
+    hash: str
@@ -4,8 +4,7 @@ from pydantic import BaseModel, Field, field_validator
 from datetime import datetime, date
 from typing import List, Optional, Any
 
-from models.Weather import ForecastModel
-from models.Weather import ForecastModel
+from models.Weather import ForecastModel, ForecastSeries
 from models.Attraction import AttractionModel
 from models.Itinerary import DailyItineraryModel
 
@@ -29,7 +28,7 @@ class TripModel(BaseModel):
     travel_by: str = "driving"
     start_date: datetime | date | str
     end_date: datetime | date | str
-    weather: Optional[List[ForecastModel]] = None
+    weather: Optional[ForecastSeries] = None
     attractions: Optional[List[AttractionModel]] = None
     itinerary: Optional[List[DailyItineraryModel]] = None
     goals: str = ""
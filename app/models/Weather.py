@@ -1,6 +1,11 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
-from datetime import datetime, date
+import numpy as np
+
+from collections.abc import Sequence
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic_core import core_schema
+from typing import Any, Iterable, Iterator, List, Optional
+from datetime import datetime, date, timedelta
 
 from lib.Utils import Utils
 
@@ -47,3 +52,296 @@ class WeatherModel(BaseModel):
     sunset_utc: Optional[int]
     timezone_s: Optional[int]
     timestamp_dt: Optional[int]
+
+
+class ForecastSeries(Sequence):
+    """
+    A compact list of forecasts, stored as parallel typed arrays.
+
+    The city/state and weather conditions are stored once in lookup tables and referenced by
+    code, timestamps and dates are int64 and the temperatures and wind speed float32 (NaN for
+    missing values). Items are converted to ForecastModel objects on demand, and the series
+    serializes to the same JSON as a list of ForecastModel objects.
+    """
+
+    EPOCH = datetime(1970, 1, 1)
+    FLOAT_FIELDS = ("temperature", "temperature_min", "temperature_max", "wind_speed")
+    FORECAST_LIST = TypeAdapter(List[ForecastModel])
+
+    def __init__(self, forecasts: Iterable[ForecastModel | dict] = None):
+        """
+        Initialize the ForecastSeries class.
+
+        Args:
+            forecasts (Iterable[ForecastModel | dict], optional): The forecasts to store.
+
+        Raises:
+            ValidationError: If a forecast is not a valid ForecastModel.
+        """
+        # Plain data is validated by the model, ForecastModel objects are kept as they are
+        forecasts = self.FORECAST_LIST.validate_python(list(forecasts or []))
+
+        # Lookup tables: value -> code
+        places: dict[tuple[str, str], int] = {}
+        conditions: dict[str, int] = {}
+
+        timestamps, dates, place_codes, condition_codes, values = [], [], [], [], []
+        for forecast in forecasts:
+            timestamp, _date, place, condition, row = self._to_row(forecast)
+            timestamps.append(timestamp)
+            dates.append(_date)
+            place_codes.append(places.setdefault(place, len(places)))
+            condition_codes.append(conditions.setdefault(condition, len(conditions)))
+            values.append(row)
+
+        self.timestamps = np.array(timestamps, dtype=np.int64)
+        self.dates = np.array(dates, dtype=np.int64)  # Microseconds since the epoch
+        self.place_codes = np.array(place_codes, dtype=np.uint16)
+        self.condition_codes = np.array(condition_codes, dtype=np.uint16)
+        # One row per field of FLOAT_FIELDS, one column per forecast
+        self.values = np.array(values, dtype=np.float64).reshape(-1, 4).T
+        self.values = self.values.astype(np.float32)
+        self.places = list(places)
+        self.conditions = list(conditions)
+
+    # --------------------------
+    # Sequence
+    # --------------------------
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index: int | slice) -> ForecastModel | List[ForecastModel]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if not -len(self) <= index < len(self):
+            raise IndexError("ForecastSeries index out of range")
+        return self._to_models(self.to_dicts(index))[0]
+
+    def __iter__(self) -> Iterator[ForecastModel]:
+        return iter(self.to_list())
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (ForecastSeries, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ForecastSeries({len(self)} forecasts, places={self.places})"
+
+    # --------------------------
+    # Conversion
+    # --------------------------
+
+    @property
+    def city_name(self) -> str | None:
+        """The city of the forecasts, None if empty or mixed."""
+        return self.places[0][0] if len(self.places) == 1 else None
+
+    @property
+    def state_name(self) -> str | None:
+        """The state of the forecasts, None if empty or mixed."""
+        return self.places[0][1] if len(self.places) == 1 else None
+
+    def to_list(self) -> List[ForecastModel]:
+        """
+        Convert the series to a list of ForecastModel objects.
+
+        Returns:
+            List[ForecastModel]: The forecasts.
+        """
+        return self._to_models(self.to_dicts())
+
+    def to_dicts(
+        self, index: int | slice = None, json_mode: bool = False
+    ) -> List[dict]:
+        """
+        Convert the series to a list of dictionaries, as dumped by ForecastModel.
+
+        Args:
+            index (int | slice, optional): Convert only these forecasts. Defaults to all.
+            json_mode (bool, optional): Dump the dates as ISO strings. Defaults to False.
+
+        Returns:
+            List[dict]: The forecasts as dictionaries.
+        """
+        index = slice(None) if index is None else index
+        if isinstance(index, int):
+            index = slice(index, index + 1 or None)
+
+        # float32 -> shortest string -> float, so 23.27 is not dumped as 23.270000457763672
+        values = [
+            [None if value == "nan" else float(value) for value in row]
+            for row in self.values[:, index].astype(str).tolist()
+        ]
+        dates = [self._to_datetime(value) for value in self.dates[index].tolist()]
+        if json_mode:
+            dates = [value.isoformat() for value in dates]
+
+        return [
+            {
+                "timestamp": timestamp,
+                "date": dates[i],
+                "city_name": self.places[place][0],
+                "state_name": self.places[place][1],
+                "temperature": values[0][i],
+                "temperature_min": values[1][i],
+                "temperature_max": values[2][i],
+                "weather": self.conditions[condition],
+                "wind_speed": values[3][i],
+            }
+            for i, (timestamp, place, condition) in enumerate(
+                zip(
+                    self.timestamps[index].tolist(),
+                    self.place_codes[index].tolist(),
+                    self.condition_codes[index].tolist(),
+                )
+            )
+        ]
+
+    @classmethod
+    def from_trusted(cls, forecasts: List[dict]) -> "ForecastSeries":
+        """
+        Convert forecasts dumped by a series back to a series, column by column.
+
+        The forecasts must come from our own storage (e.g. a checksummed trip), so they are not
+        validated. Anything unexpected falls back to the validated conversion.
+
+        Args:
+            forecasts (List[dict]): The forecasts, as dumped by the series.
+
+        Returns:
+            ForecastSeries: The series.
+        """
+        dates = [forecast.get("date") for forecast in forecasts]
+        # Only naive ISO dates are parsed at once, the others are converted to UTC
+        if not all(type(value) is str and len(value) in (19, 26) for value in dates):
+            return cls(forecasts)
+
+        places: dict[tuple[str, str], int] = {}
+        conditions: dict[str, int] = {}
+        series = cls.__new__(cls)
+        try:
+            series.timestamps = np.array(
+                [forecast["timestamp"] for forecast in forecasts], dtype=np.int64
+            )
+            series.dates = np.array(dates, dtype="datetime64[us]").astype(np.int64)
+            series.place_codes = np.array(
+                [
+                    places.setdefault(
+                        (forecast["city_name"], forecast["state_name"]), len(places)
+                    )
+                    for forecast in forecasts
+                ],
+                dtype=np.uint16,
+            )
+            series.condition_codes = np.array(
+                [
+                    conditions.setdefault(forecast["weather"], len(conditions))
+                    for forecast in forecasts
+                ],
+                dtype=np.uint16,
+            )
+            # One row per field of FLOAT_FIELDS, None is stored as NaN
+            series.values = np.array(
+                [
+                    [forecast[field] for forecast in forecasts]
+                    for field in cls.FLOAT_FIELDS
+                ],
+                dtype=np.float64,
+            ).reshape(len(cls.FLOAT_FIELDS), -1)
+        except (KeyError, TypeError, ValueError):
+            # Let the full conversion report what is wrong with the data
+            return cls(forecasts)
+
+        series.values = series.values.astype(np.float32)
+        series.places = list(places)
+        series.conditions = list(conditions)
+        return series
+
+    @staticmethod
+    def _to_models(forecasts: List[dict]) -> List[ForecastModel]:
+        # The values were validated when the series was created
+        return [ForecastModel.model_construct(**forecast) for forecast in forecasts]
+
+    @classmethod
+    def _to_row(cls, forecast: ForecastModel) -> tuple:
+        """
+        Convert a forecast to the values stored by the series.
+
+        Args:
+            forecast (ForecastModel): The forecast.
+
+        Returns:
+            tuple: The timestamp, date (microseconds), (city, state), weather and float values.
+        """
+        return (
+            forecast.timestamp,
+            cls._to_microseconds(forecast.date),
+            (forecast.city_name, forecast.state_name),
+            forecast.weather,
+            [getattr(forecast, field) for field in cls.FLOAT_FIELDS],
+        )
+
+    @classmethod
+    def _to_microseconds(cls, value: datetime | date | str) -> int:
+        if not isinstance(value, datetime):
+            value = ForecastModel.convert_to_datetime(value)
+        if value.tzinfo is not None:
+            value = value.replace(tzinfo=None) - value.utcoffset()
+        return (value - cls.EPOCH) // timedelta(microseconds=1)
+
+    @classmethod
+    def _to_datetime(cls, microseconds: int) -> datetime:
+        return cls.EPOCH + timedelta(microseconds=microseconds)
+
+    # --------------------------
+    # Pydantic
+    # --------------------------
+
+    @classmethod
+    def validate(cls, value: Any) -> "ForecastSeries":
+        """
+        Convert a list of forecasts (ForecastModel objects or dictionaries) to a series.
+
+        Args:
+            value (Any): The value to convert.
+
+        Returns:
+            ForecastSeries: The series.
+        """
+        if isinstance(value, ForecastSeries):
+            return value
+        if not isinstance(value, (list, tuple)):
+            raise ValueError("Forecasts must be a list.")
+        return cls(value)
+
+    @staticmethod
+    def serialize(value: Any) -> List[dict]:
+        """
+        Dump a series (or a plain list of forecasts) like a list of ForecastModel objects.
+        """
+        # The dates are dumped by pydantic, like the ForecastModel dates
+        if isinstance(value, ForecastSeries):
+            return value.to_dicts()
+        return [
+            (forecast.model_dump() if isinstance(forecast, ForecastModel) else forecast)
+            for forecast in value
+        ]
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls.serialize
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> dict:
+        return handler(cls.FORECAST_LIST.core_schema)
@@ -146,7 +146,8 @@ def Cadastrar():
     with st.container(border=True):
         st.write("### 📍 2. Para Onde?")
 
-        ufs = CityStateData().get_ufs()
+        city_state_data = CityStateData()
+        ufs = city_state_data.get_ufs()
 
         col1, col2, col3 = st.columns([10, 1, 10])
         with col1:
@@ -157,7 +158,7 @@ def Cadastrar():
             with sub_col2:
                 origin_city = st.selectbox(
                     "Origem (Cidade)",
-                    CityStateData().get_cities_by_uf(origin_state),
+                    city_state_data.get_cities_by_uf(origin_state),
                     index=None,
                     placeholder="Selecione uma cidade...",
                 )
@@ -174,7 +175,7 @@ def Cadastrar():
             with sub_col2:
                 destination_city = st.selectbox(
                     "Destino (Cidade)",
-                    CityStateData().get_cities_by_uf(destination_state),
+                    city_state_data.get_cities_by_uf(destination_state),
                     index=None,
                     placeholder="Selecione uma cidade...",
                 )
@@ -185,9 +186,9 @@ def Cadastrar():
 
         # Display Google Maps directions iframe
         google_maps = GoogleMaps()
-        origin = f"{origin_city}, {CityStateData().uf_to_state(origin_state)}"
+        origin = f"{origin_city}, {city_state_data.uf_to_state(origin_state)}"
         destination = (
-            f"{destination_city}, {CityStateData().uf_to_state(destination_state)}"
+            f"{destination_city}, {city_state_data.uf_to_state(destination_state)}"
         )
         iframe_url = google_maps.get_google_maps_directions_iframe_url(
             origin, destination, mode=travel_by
@@ -9,6 +9,7 @@ from lib.LatLong import LatLong
 
 from services.Trip import Trip
 from services.AttractionsData import AttractionsData
+from services.AttractionsCatalog import AttractionsCatalog
 from services.AppData import AppData
 from services.TripData import TripData
 
@@ -101,10 +102,8 @@ def View_Stats():
         if destination not in trips_by_destination_tracker:
             trips_by_destination_tracker.append(destination)
 
-            # Add geolocation to the destination
-            lat, long = LatLong().get_coordinates(
-                city=trip_model.destination_city, state=trip_model.destination_state
-            )
+            # Add geolocation to the destination (Saved with the trip)
+            lat, long = TripData.get_coordinates(trip_model)
 
             trips_by_destination.append(
                 {
@@ -270,6 +269,7 @@ def View_Stats():
 
     # Get the attractions by city
     attractions_by_city = AttractionsData().get_attractions_by_city()
+    city_coordinates = AttractionsCatalog().get_city_coordinates()
 
     cities_attractions = []
     for city_uf in attractions_by_city.keys():
@@ -278,9 +278,11 @@ def View_Stats():
             count = 0
         count += len(attractions_by_city[city_uf])
 
-        # Add geolocation to the destination
+        # Add geolocation to the destination, geocoding only the cities not indexed
         city_uf, state = city_uf.split(", ")
-        lat, long = LatLong().get_coordinates(city=city_uf, state=state)
+        lat, long = city_coordinates.get((city_uf, state)) or LatLong().get_coordinates(
+            city=city_uf, state=state
+        )
 
         cities_attractions.append(
             {
@@ -1,3 +1,6 @@
+import threading
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Depends, Request
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -7,17 +10,42 @@ from slowapi.middleware import SlowAPIMiddleware
 from pydantic import BaseModel
 
 from models.Trip import TripModel
+from models.Attraction import AttractionModel
 
 from services.Trip import Trip
 from services.TripData import TripData
 from services.ApiKeyHandler import ApiKeyHandler
 from services.GeminiProvider import GeminiProvider
 from services.SentimentAnalysisProvider import SentimentAnalyzer
+from services.WeatherRefresher import WeatherRefresher
+from services.AttractionsData import AttractionsData
+from services.AttractionsRefresher import AttractionsRefresher
+from services.GooglePlacesAttractionsScrapper import GooglePlacesAttractionsScrapper
+from services.AppData import AppData
+from services.CityState import CityStateData
+from services.CityAutocomplete import CityAutocomplete
 
 from services.Logger import _log
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep the weather of the upcoming trips up to date
+    if AppData().get_config("weather_refresh_enabled"):
+        WeatherRefresher().start()
+    # Refresh the attractions of the popular destinations before they expire
+    if AppData().get_config("attractions_refresh_enabled"):
+        AttractionsRefresher().start()
+    # Reload the API keys on SIGHUP
+    api_key_handler.watch_signal()
+    # Replace the attractions embedded in the older trips with references
+    threading.Thread(target=TripData().migrate_attraction_refs, daemon=True).start()
+    # Swap back the coordinates of the older trips saved with latitude and longitude swapped
+    threading.Thread(target=TripData().migrate_swapped_coordinates, daemon=True).start()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 # --------------------------
 # Rate Limiting
@@ -48,13 +76,20 @@ async def create_user_trip(
     api_key: str = Depends(api_key_handler.validate_key),
 ) -> TripModel:
 
-    # Get user_id from API key
-    user_id = api_key_handler.get_user_id(api_key)
+    # Get user_id resolved from the API key
+    user_id = request.state.user_id
 
     # Add user_id to trip_data
     trip_data = trip_data.model_dump()
     trip_data["user_id"] = user_id
 
+    # Check the cities locally, before any call to the weather and places APIs
+    for field in ("origin", "destination"):
+        city, uf = _get_known_city(
+            field, trip_data[f"{field}_city"], trip_data[f"{field}_state"]
+        )
+        trip_data[f"{field}_city"], trip_data[f"{field}_state"] = city, uf
+
     try:
         trip = Trip(trip_data=trip_data)
     except ValueError as e:
@@ -63,6 +98,39 @@ async def create_user_trip(
     return trip.model
 
 
+def _get_known_city(field: str, city: str, uf: str) -> tuple[str, str]:
+    """
+    Get the stored name and UF of a trip city, or raise a 400 error with suggestions.
+
+    Args:
+        field (str): The trip field ("origin" or "destination").
+        city (str): The name of the city (Case and accent insensitive).
+        uf (str): The abbreviation (UF) or the name of the state.
+
+    Returns:
+        tuple[str, str]: The name of the city and the UF of its state.
+    """
+    city_state_data = CityStateData()
+    uf = (
+        uf.upper()
+        if city_state_data.uf_to_state(uf)
+        else city_state_data.state_to_uf(uf)
+    )
+    known_city = city_state_data.get_city(city, uf) if uf else ""
+    if known_city:
+        return known_city, uf
+
+    suggestions = ", ".join(
+        f"{suggestion['city']} - {suggestion['uf']}"
+        for suggestion in CityAutocomplete().suggest(city, limit=5)
+    )
+    detail = f"Unknown {field} city: {city} - {uf or '?'}"
+    raise HTTPException(
+        status_code=400,
+        detail=f"{detail}. Did you mean: {suggestions}?" if suggestions else detail,
+    )
+
+
 # Get a specific trip
 @app.get("/trip/{trip_id}", response_model=TripModel, tags=["trip"])
 @limiter.limit("20/minute")
@@ -71,8 +139,8 @@ async def get_user_trip(
     trip_id: str,
     api_key: str = Depends(api_key_handler.validate_key),
 ) -> TripModel:
-    # Get user_id from API key
-    user_id = api_key_handler.get_user_id(api_key)
+    # Get user_id resolved from the API key
+    user_id = request.state.user_id
 
     trip = TripData().get_user_trip(trip_id=trip_id, user_id=user_id)
 
@@ -90,8 +158,8 @@ async def get_user_trips(
     limit: int = 10,
     api_key: str = Depends(api_key_handler.validate_key),
 ) -> list[TripModel]:
-    # Get user_id from API key
-    user_id = api_key_handler.get_user_id(api_key)
+    # Get user_id resolved from the API key
+    user_id = request.state.user_id
 
     if limit < 0:
         limit = 0
@@ -112,8 +180,8 @@ async def delete_user_trip(
     trip_id: str,
     api_key: str = Depends(api_key_handler.validate_key),
 ):
-    # Get user_id from API key
-    user_id = api_key_handler.get_user_id(api_key)
+    # Get user_id resolved from the API key
+    user_id = request.state.user_id
 
     trip_model = TripData().get_user_trip(trip_id=trip_id, user_id=user_id)
     trip = Trip().from_model(trip_model)
@@ -129,6 +197,109 @@ async def delete_user_trip(
         raise HTTPException(status_code=500, detail="Failed to delete trip")
 
 
+# --------------------------
+# Weather API
+# --------------------------
+# Get the progress and metrics of the weather refresh (Admin only)
+@app.get("/weather/refresh", tags=["weather"])
+@limiter.limit("20/minute")
+async def get_weather_refresh_status(
+    request: Request,
+    api_key: str = Depends(api_key_handler.validate_admin_key),
+) -> dict:
+    return WeatherRefresher().get_status()
+
+
+# Refresh the weather of all the upcoming trips in the background (Admin only)
+@app.post("/weather/refresh", tags=["weather"])
+@limiter.limit("2/minute")
+async def refresh_weather(
+    request: Request,
+    api_key: str = Depends(api_key_handler.validate_admin_key),
+) -> dict:
+    refresher = WeatherRefresher()
+    threading.Thread(target=refresher.run, daemon=True).start()
+    return refresher.get_status()
+
+
+# --------------------------
+# Attractions API
+# --------------------------
+# Search the attractions of all cities by name, city and description
+@app.get(
+    "/attractions/search", response_model=list[AttractionModel], tags=["attractions"]
+)
+@limiter.limit("60/minute")
+async def search_attractions(
+    request: Request,
+    q: str,
+    limit: int = 10,
+    api_key: str = Depends(api_key_handler.validate_key),
+) -> list[AttractionModel]:
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Empty search query")
+
+    return AttractionsData().search(q, limit=min(max(limit, 0), 50))
+
+
+# Get the progress and metrics of the attractions refresh
+@app.get("/attractions/refresh", tags=["attractions"])
+@limiter.limit("20/minute")
+async def get_attractions_refresh_status(
+    request: Request,
+    api_key: str = Depends(api_key_handler.validate_key),
+) -> dict:
+    return AttractionsRefresher().get_status()
+
+
+# Get the disk usage and hit ratio of the attraction image cache
+@app.get("/attractions/images", tags=["attractions"])
+@limiter.limit("20/minute")
+async def get_image_cache_stats(
+    request: Request,
+    api_key: str = Depends(api_key_handler.validate_key),
+) -> dict:
+    return GooglePlacesAttractionsScrapper().get_image_cache_stats()
+
+
+# Remove the cached images not referenced by any stored attraction (Admin only)
+@app.post("/attractions/images/gc", tags=["attractions"])
+@limiter.limit("2/minute")
+async def collect_image_garbage(
+    request: Request,
+    api_key: str = Depends(api_key_handler.validate_admin_key),
+) -> dict:
+    scrapper = GooglePlacesAttractionsScrapper()
+    removed = scrapper.collect_image_garbage()
+    return {"removed": removed, **scrapper.get_image_cache_stats()}
+
+
+# --------------------------
+# Cities API
+# --------------------------
+# Prepare the response model for the city suggestions
+class CitySuggestionModel(BaseModel):
+    city: str
+    uf: str
+    state: str
+    trips: int
+
+
+# Suggest the cities that start with a text, accent insensitive and most visited first
+@app.get("/cities/suggest", response_model=list[CitySuggestionModel], tags=["cities"])
+@limiter.limit("120/minute")
+async def suggest_cities(
+    request: Request,
+    q: str,
+    limit: int = 10,
+    api_key: str = Depends(api_key_handler.validate_key),
+) -> list[CitySuggestionModel]:
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Empty search query")
+
+    return CityAutocomplete().suggest(q, limit=min(max(limit, 0), 50))
+
+
 # --------------------------
 # Trip AI API
 # --------------------------
@@ -141,8 +312,8 @@ async def generate_trip_itinerary(
     update_trip: bool = False,
     api_key: str = Depends(api_key_handler.validate_key),
 ) -> TripModel:
-    # Get user_id from API key
-    user_id = api_key_handler.get_user_id(api_key)
+    # Get user_id resolved from the API key
+    user_id = request.state.user_id
 
     trip_model = TripData().get_user_trip(trip_id=trip_id, user_id=user_id)
     trip = Trip().from_model(trip_model)
@@ -1,4 +1,3 @@
-import yaml
 import json
 import re
 
@@ -14,6 +13,8 @@ from models.Attraction import AttractionModel
 from models.Trip import TripModel
 
 from lib.Utils import Utils
+from lib.PromptTemplate import PromptTemplate
+from lib.ForecastIndex import ForecastIndex
 
 
 class AiProvider:
@@ -24,7 +25,7 @@ class AiProvider:
 
     def __init__(self):
         self.config_file = AppData().get_config("ai_config_file")
-        self.reserved_templates = [
+        self.reserved_templates = (
             "%%LOCATION%%",
             "%%WEATHER%%",
             "%%GOALS%%",
@@ -33,7 +34,7 @@ class AiProvider:
             "%%ITINERARY%%",
             "%%NO_OF_DAYS%%",
             "%%TRIP_JSON%%",
-        ]
+        )
         self.gen_itinerary_prompt = None
         self.gen_trip_summary_prompt = None
 
@@ -147,10 +148,8 @@ class AiProvider:
 
         """
         # Allow prompt to be overridden
-        prompt = (
-            base_prompt
-            if base_prompt
-            else self._load_base_prompt(template_key=template_key)
+        template = self._load_template(
+            template_key=template_key, base_prompt=base_prompt
         )
 
         # -- Prepare variables
@@ -199,7 +198,8 @@ class AiProvider:
         # %%TRAVEL_BY%%
         travel_by = trip_model.travel_by if trip_model is not None else None
 
-        # -- Replace variables
+        # -- Prepare the values (Only the ones available are replaced)
+        values = {}
 
         # Set the number of days
         if start_date is not None and end_date is not None:
@@ -209,57 +209,45 @@ class AiProvider:
             if trip_length > 4:
                 trip_length = 4
 
-            prompt = prompt.replace("%%NO_OF_DAYS%%", str(trip_length))
+            values["%%NO_OF_DAYS%%"] = str(trip_length)
 
         # Set the location
         if location is not None:
-            location = self._strip_reserved_templates(location)
-            prompt = prompt.replace("%%LOCATION%%", location)
+            values["%%LOCATION%%"] = location
 
         # Set the weather
         if forecast_list is not None:
-            weather = self._generate_weather_summary(
+            values["%%WEATHER%%"] = self._generate_weather_summary(
                 forecast_list=forecast_list,
                 start_date=start_date,
                 end_date=end_date,
                 strip_time=True,
             )
-            weather = self._strip_reserved_templates(weather)
-            prompt = prompt.replace("%%WEATHER%%", weather)
 
         # Set the goals
         if goals is not None:
-            goals = self._strip_reserved_templates(goals)
-            goals = goals.strip()
+            goals = template.escape(goals).strip()
             if not goals:
                 goals = "* Nenhum objetivo foi definido"
             else:
                 goals = "* " + goals.replace("\n", "\n* ").replace("  ", " ")
-            prompt = prompt.replace("%%GOALS%%", goals.strip())
+            values["%%GOALS%%"] = goals.strip()
 
         # Set the attractions
         if attractions is not None:
-            attractions = self._generate_attractions_summary(attractions)
-            attractions = self._strip_reserved_templates(attractions)
-            prompt = prompt.replace("%%ATTRACTIONS%%", attractions)
-
-        # Set the trip JSON
-        if trip_model is not None:
-            trip_json = self._strip_reserved_templates(trip_json)
-            prompt = prompt.replace("%%TRIP_JSON%%", trip_json)
+            values["%%ATTRACTIONS%%"] = self._generate_attractions_summary(attractions)
 
-        # Set the itinerary
+        # Set the trip JSON and the itinerary
         if trip_model is not None:
-            itinerary = self._generate_itinerary_summary(trip_model.itinerary)
-            itinerary = self._strip_reserved_templates(itinerary)
-            prompt = prompt.replace("%%ITINERARY%%", itinerary)
+            values["%%TRIP_JSON%%"] = trip_json
+            values["%%ITINERARY%%"] = self._generate_itinerary_summary(itinerary)
 
         # Set trip travel by
         if travel_by is not None:
-            travel_by = self._strip_reserved_templates(travel_by)
-            prompt = prompt.replace("%%TRAVEL_BY%%", travel_by)
+            values["%%TRAVEL_BY%%"] = travel_by
 
-        return prompt
+        # -- Replace all the variables in a single pass
+        return template.render(values)
 
     def _generate_weather_summary(
         self,
@@ -285,16 +273,15 @@ class AiProvider:
 
         days = (end_date - start_date).days
 
+        # Index the forecasts by date once, so each day is a single lookup
+        forecast_index = ForecastIndex(forecast_list)
+
         summary = ""
         for day in range(days + 1):
             day = start_date + timedelta(days=day)
 
             # Find the forecast for the current day
-            forecast = None
-            for f in forecast_list:
-                if Utils.to_date_string(f.date) == Utils.to_date_string(day):
-                    forecast = f
-                    break
+            forecast = forecast_index.get(day)
 
             # Strip the time from the date (The part after the T in the ISO format)
             day = Utils.to_date_string(day)
@@ -404,12 +391,28 @@ class AiProvider:
         Returns:
             str: The loaded base prompt.
         """
-        if self.get(template_key):
-            return self.get(template_key)
+        return self._load_template(template_key=template_key).template
+
+    def _load_template(
+        self, template_key: str = "gen_itinerary_prompt", base_prompt: str = None
+    ) -> PromptTemplate:
+        """
+        Load the compiled template, the config file is only parsed once per process.
+
+        Args:
+            template_key (str): The key of the template to load from the config file.
+            base_prompt (str): The base prompt to use (overrides the template_key template).
+
+        Returns:
+            PromptTemplate: The compiled template.
+        """
+        prompt = base_prompt or getattr(self, template_key, None)
+        if prompt:
+            return PromptTemplate.from_string(prompt, self.reserved_templates)
 
-        with open(self.config_file, "r", encoding="utf-8") as file:
-            data = yaml.safe_load(file)
-            return self.set(template_key, data[template_key])
+        return PromptTemplate.from_config(
+            self.config_file, template_key, self.reserved_templates
+        )
 
     def _override_base_prompt(
         self, prompt: str = "", template_key: str = "gen_itinerary_prompt"
@@ -433,9 +436,7 @@ class AiProvider:
         Returns:
             str: The text with the templates removed.
         """
-        for template in self.reserved_templates:
-            text = text.replace(template, "")
-        return text
+        return PromptTemplate.from_string("", self.reserved_templates).escape(text)
 
     def get(self, name):
         """
@@ -1,9 +1,19 @@
-from fastapi import HTTPException, Security
+import os
+import hmac
+import time
+import signal
+import sqlite3
+import hashlib
+import threading
+
+from contextlib import closing
+from fastapi import HTTPException, Request, Security
 from fastapi.security.api_key import APIKeyHeader
 
-from typing import Dict
+from typing import Any
 
 from services.AppData import AppData
+from services.Logger import _log
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
@@ -11,11 +21,32 @@ api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 class ApiKeyHandler:
     """
     API key handler class to manage API keys for FastAPI.
+
+    The keys of FASTAPI_KEYS and of the optional 'api_keys_file' are parsed once per process
+    into a table of SHA-256(token) -> user_id, so a key is validated with a single lookup.
+    The table is built again when FASTAPI_KEYS or the keys file change (Checked every
+    'api_keys_check_interval' seconds), or right away on SIGHUP.
+
+    The keys file is either a text file of 'token:user_id' keys (One per line or comma separated,
+    '#' starts a comment), or a SQLite database (.db, .sqlite or .sqlite3) with an
+    'api_keys(token_sha256 TEXT, user_id INTEGER)' table, storing only the token hashes.
+
+    The maintenance routes only accept the keys of the users of the 'api_admin_user_ids' config.
     """
 
+    SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+    # Key table shared by all instances
+    _keys: dict[str, Any] | None = None
+    _lock = threading.Lock()
+
     def __init__(self):
         self.header = api_key_header
-        pass
+
+        app_data = AppData()
+        self.keys_file = app_data.get_config("api_keys_file") or ""
+        check_interval = app_data.get_config("api_keys_check_interval")
+        self.check_interval = float(5 if check_interval is None else check_interval)
 
     def parse_keys(self, keys: str) -> list[dict[str, int]]:
         """
@@ -72,11 +103,14 @@ class ApiKeyHandler:
         keys = self.parse_keys(keys)
         return keys
 
-    def validate_key(self, api_key: str = Security(api_key_header)) -> str:
+    def validate_key(
+        self, request: Request, api_key: str = Security(api_key_header)
+    ) -> str:
         """
-        Validate API key
+        Validate API key, and keep its user_id in the request state.
 
         Args:
+            request (Request): The request, its 'state.user_id' is set to the key's user_id
             api_key (str): The API key to validate
 
         Returns:
@@ -85,14 +119,49 @@ class ApiKeyHandler:
         Raises:
             HTTPException: If the API key is invalid
         """
-        keys = self.get_available_keys()
-        keys = self._join_keys(keys)
-        if not keys:
+        table = self._get_key_table()
+        if not table:
             raise HTTPException(status_code=500, detail="No valid API keys available")
-        if api_key not in keys:
+        user_id = self._find_user_id(table, api_key)
+        if user_id is None:
             raise HTTPException(status_code=403, detail="Invalid API key")
+        request.state.user_id = user_id
         return api_key
 
+    def validate_admin_key(
+        self, request: Request, api_key: str = Security(api_key_header)
+    ) -> str:
+        """
+        Validate the API key of an admin user, and keep its user_id in the request state.
+
+        Args:
+            request (Request): The request, its 'state.user_id' is set to the key's user_id
+            api_key (str): The API key to validate
+
+        Returns:
+            str: The valid API key if it belongs to an admin user
+
+        Raises:
+            HTTPException: If the API key is invalid or not of an admin user
+        """
+        api_key = self.validate_key(request, api_key)
+        if request.state.user_id not in self.get_admin_user_ids():
+            raise HTTPException(status_code=403, detail="Admin API key required")
+        return api_key
+
+    def get_admin_user_ids(self) -> set[int]:
+        """
+        Get the user_ids of the admin users, from the 'api_admin_user_ids' config.
+
+        Returns:
+            set[int]: The admin user_ids (A list, or a comma separated string when overridden
+                by an environment variable).
+        """
+        user_ids = AppData().get_config("api_admin_user_ids") or []
+        if isinstance(user_ids, str):
+            user_ids = [user_id for user_id in user_ids.split(",") if user_id.strip()]
+        return {int(user_id) for user_id in user_ids}
+
     def get_user_id(self, api_key: str) -> int:
         """
         Get user_id from API key.
@@ -101,10 +170,46 @@ class ApiKeyHandler:
             api_key (str): The API key to get the user_id from
 
         Returns:
-            int: The user_id
+            int: The user_id, or None if the key is invalid
+        """
+        return self._find_user_id(self._get_key_table(), api_key)
+
+    def reload(self) -> None:
+        """
+        Build the key table again on the next validation.
+        """
+        ApiKeyHandler._keys = None
+
+    def watch_signal(self) -> bool:
+        """
+        Reload the keys on SIGHUP.
+
+        Returns:
+            bool: True if the signal handler was set, False where there is no SIGHUP
+                (Windows) or outside the main thread.
+        """
+        try:
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.reload())
+            return True
+        except (AttributeError, ValueError):
+            return False
+
+    @staticmethod
+    def hash_token(token: str) -> bytes:
+        """
+        Hash an API key token, as stored in the key table.
+
+        Args:
+            token (str): The token, without its user_id.
+
+        Returns:
+            bytes: The SHA-256 digest of the token.
         """
-        keys = self.parse_key(api_key)
-        return list(keys.values())[0]
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    # --------------------------
+    # Key Table
+    # --------------------------
 
     def _get_raw_keys(self):
         """
@@ -115,14 +220,112 @@ class ApiKeyHandler:
         """
         return AppData().get_api_key("fastapi")
 
-    def _join_keys(self, keys: list[Dict[str, int]]) -> list[str]:
+    def _find_user_id(self, table: dict[bytes, int], api_key: str) -> int | None:
         """
-        Join API keys into a list of strings
+        Find the user_id of an API key formatted as token:user_id.
+
+        The table is keyed by the token hash, so the lookup time does not depend on how much
+        of the token matches a stored one.
 
         Args:
-            keys (list): The list of dictionaries containing tokens and user_ids
+            table (dict[bytes, int]): The key table.
+            api_key (str): The API key.
 
         Returns:
-            list: A list of strings containing tokens and user_ids
+            int | None: The user_id, or None if the key is not in the table.
         """
-        return [":".join([k, str(v)]) for key in keys for k, v in key.items()]
+        if not api_key:
+            return None
+
+        token, _, user_id = api_key.partition(":")
+        stored_user_id = table.get(self.hash_token(token))
+        if stored_user_id is None or not hmac.compare_digest(
+            str(stored_user_id).encode("utf-8"), user_id.encode("utf-8")
+        ):
+            return None
+        return stored_user_id
+
+    def _get_key_table(self) -> dict[bytes, int]:
+        """
+        Get the key table, building it again if the keys changed since it was built.
+
+        Returns:
+            dict[bytes, int]: The user_id of each token hash.
+        """
+        keys = ApiKeyHandler._keys
+        now = time.monotonic()
+        if keys and keys["table"] and keys["keys_file"] == self.keys_file:
+            if now - keys["checked_at"] < self.check_interval:
+                return keys["table"]
+
+        raw_keys = self._get_raw_keys() or ""
+        if (
+            keys
+            and keys["raw_keys"] == raw_keys
+            and keys["keys_file"] == self.keys_file
+            and keys["file_version"] == self._get_file_version()
+        ):
+            keys["checked_at"] = now
+            return keys["table"]
+
+        with ApiKeyHandler._lock:
+            file_version = self._get_file_version()
+            table = {
+                self.hash_token(token): user_id
+                for key in self.parse_keys(raw_keys)
+                for token, user_id in key.items()
+            }
+            table.update(self._load_keys_file())
+
+            ApiKeyHandler._keys = {
+                "table": table,
+                "raw_keys": raw_keys,
+                "keys_file": self.keys_file,
+                "file_version": file_version,
+                "checked_at": now,
+            }
+        return table
+
+    def _get_file_version(self) -> tuple[int, int] | None:
+        """
+        Get the version of the keys file, changed by any write.
+
+        Returns:
+            tuple[int, int] | None: The modification time and size of the file, or None if there is no file.
+        """
+        if not self.keys_file:
+            return None
+        try:
+            stat = os.stat(self.keys_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_keys_file(self) -> dict[bytes, int]:
+        """
+        Load the keys of the keys file.
+
+        Returns:
+            dict[bytes, int]: The user_id of each token hash, empty if the file could not be read.
+        """
+        if not self.keys_file or not os.path.exists(self.keys_file):
+            return {}
+
+        try:
+            if self.keys_file.endswith(self.SQLITE_EXTENSIONS):
+                with closing(sqlite3.connect(self.keys_file)) as connection:
+                    rows = connection.execute(
+                        "SELECT token_sha256, user_id FROM api_keys"
+                    ).fetchall()
+                return {bytes.fromhex(digest): int(user_id) for digest, user_id in rows}
+
+            with open(self.keys_file, "r", encoding="utf-8") as f:
+                lines = [line.split("#")[0].strip() for line in f]
+            return {
+                self.hash_token(token): user_id
+                for key in self.parse_keys(",".join(lines))
+                for token, user_id in key.items()
+            }
+        except (OSError, ValueError, sqlite3.Error) as e:
+            _log(f"[ApiKeyHandler] Error loading {self.keys_file}: {e}", level="ERROR")
+            return {}
@@ -1,5 +1,10 @@
 import os
+import hmac
 import json
+import hashlib
+import secrets
+import threading
+import time
 import streamlit as st
 
 from typing import Any, Union
@@ -16,6 +21,19 @@ class AppData:
     and interacts with environment variables for secure storage of API keys.
     """
 
+    CONFIG_FILE = "app/config/cfg.json"
+    CONFIG_CHECK_INTERVAL = 1
+
+    # Parsed config shared by all instances: ((mtime, size) of the file, data, checked at)
+    _config: tuple[tuple[int, int] | None, dict, float] | None = None
+    _config_lock = threading.Lock()
+    # Serializes the compare-and-swap writes of save_if_unchanged
+    _save_lock = threading.Lock()
+
+    # Secret key of the data checksums, see _get_checksum_key
+    _checksum_key: bytes | None = None
+    _checksum_lock = threading.Lock()
+
     def __init__(self):
         """
         Initialize the AppData class.
@@ -33,14 +51,15 @@ class AppData:
         Retrieve configuration data from the config JSON file, with the option
         to override values using environment variables.
 
+        The file is parsed once per process and parsed again only when its modification
+        time or size changes (Checked at most once per second). The returned values are shared and must not be modified.
+
         Args:
             key (str): The specific key in the configuration file.
 
         Returns:
             Any: The configuration value, or None if the key does not exist.
         """
-        config_file = "app/config/cfg.json"
-
         # Allow overriding config values with environment variables
         env_key = f"__CONFIG_OVERRIDE_{key}"
 
@@ -49,12 +68,41 @@ class AppData:
             return os.getenv(env_key)
 
         # Otherwise, load from JSON config file
-        if os.path.exists(config_file):
-            with open(config_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data.get(key)
+        return self._get_config_data().get(key)
+
+    def _get_config_data(self) -> dict:
+        """
+        Get the parsed config file, parsing it again if it changed since it was loaded.
 
-        return None  # Return None if the key is not found in either place
+        The file is checked for changes at most every CONFIG_CHECK_INTERVAL seconds.
+
+        Returns:
+            dict: The config data, empty if the file does not exist.
+        """
+        config = AppData._config
+        now = time.monotonic()
+        if config and now - config[2] < AppData.CONFIG_CHECK_INTERVAL:
+            return config[1]
+
+        config_file = AppData.CONFIG_FILE
+        try:
+            stat = os.stat(config_file)
+            version = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            version = None
+
+        with AppData._config_lock:
+            config = AppData._config
+            if config and config[0] == version:
+                AppData._config = (version, config[1], now)
+                return config[1]
+
+            data = {}
+            if version and os.path.exists(config_file):
+                with open(config_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            AppData._config = (version, data, now)
+        return data
 
     def get_api_key(self, key: str) -> str:
         """
@@ -79,6 +127,7 @@ class AppData:
             "huggingface": "HUGGINGFACE_API_KEY",
             "googlegemini": "GEMINY_API_KEY",
             "openai": "OPENAI_API_KEY",
+            "datachecksum": "DATA_CHECKSUM_KEY",
         }
 
         try:
@@ -157,15 +206,7 @@ class AppData:
         file_path = f"{save_path}/{id}.json"
 
         if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                    if isinstance(data, str):
-                        data = json.loads(data)
-                except Exception as e:
-                    _log(f"Error loading data from {file_path}: {e}", level="ERROR")
-                    data = None
-            return data
+            return _self._read_file(file_path)
         return None
 
     def get_all(self, type: str, limit: int = 0) -> list:
@@ -248,6 +289,61 @@ class AppData:
         data[key] = value
         return self.save(type, id, data, replace=True)
 
+    def exists(self, type: str, id: str) -> bool:
+        """
+        Check if some data was saved, without reading it.
+
+        Args:
+            type (str): The type of data (e.g., 'trip', 'attractions').
+            id (str): The unique identifier for the data.
+
+        Returns:
+            bool: True if the file of the data exists.
+        """
+        return self._get_file_version(self._get_file_path(type, id)) is not None
+
+    def get_versioned(self, type: str, id: str) -> tuple[dict, tuple[int, int]]:
+        """
+        Retrieve data from a file, bypassing the cache, with the version of the file.
+
+        Args:
+            type (str): The type of data to retrieve (e.g., 'trip', 'attractions').
+            id (str): The unique identifier for the data.
+
+        Returns:
+            tuple[dict, tuple[int, int]]: The data and the modification time and size of the
+                file, or (None, None) if not found.
+        """
+        file_path = self._get_file_path(type, id)
+        version = self._get_file_version(file_path)
+        if version is None:
+            return None, None
+        return self._read_file(file_path), version
+
+    def save_if_unchanged(
+        self, type: str, id: str, json: Union[str, dict], version: tuple[int, int]
+    ) -> bool:
+        """
+        Replace the data of a file, only if the file was not changed since it was read.
+
+        Args:
+            type (str): The type of data being saved (e.g., 'trip', 'attractions').
+            id (str): A unique identifier for the data.
+            json (Union[str, dict]): The data to be saved, either as a JSON string or a dictionary.
+            version (tuple[int, int]): The version of the file when it was read, see get_versioned.
+
+        Returns:
+            bool: True if the data was saved, False if the file changed or could not be written.
+        """
+        file_path = self._get_file_path(type, id)
+        if not file_path or not json or version is None:
+            return False
+
+        with AppData._save_lock:
+            if self._get_file_version(file_path) != version:
+                return False
+            return self._save_file(file_path, json)
+
     def delete(self, type: str, id: str) -> bool:
         """
         Delete data from a file.
@@ -318,6 +414,29 @@ class AppData:
             _log(f"Error saving data to file: {e}", level="ERROR")
             return False
 
+    def _read_file(self, file_path: str) -> Any:
+        """
+        Read the data of a file, verifying its checksum.
+
+        Args:
+            file_path (str): The file path to read the data from.
+
+        Returns:
+            Any: The parsed JSON data, or None if it could not be read.
+        """
+        with open(file_path, "r", encoding="utf-8") as f:
+            try:
+                text = f.read()
+                data = json.loads(text)
+                if isinstance(data, str):
+                    data = json.loads(data)
+                elif isinstance(data, dict):
+                    data = self._verify_checksum(text, data)
+            except Exception as e:
+                _log(f"Error loading data from {file_path}: {e}", level="ERROR")
+                data = None
+        return data
+
     def _delete_file(self, file_path: str) -> bool:
         """
         Delete a file.
@@ -349,9 +468,46 @@ class AppData:
         return {
             "trip": f"{temp_storage_dir}/trip",
             "image_cache": f"{temp_storage_dir}/_image-cache",
+            "forecast_cache": f"{temp_storage_dir}/_forecast-cache",
+            "locks": f"{temp_storage_dir}/_locks",
+            "attractions_catalog": f"{temp_storage_dir}/_attractions-catalog",
+            "attraction_snapshots": f"{temp_storage_dir}/attraction_snapshots",
+            "migrations": f"{temp_storage_dir}/_migrations",
             "attractions": f"{permanent_storage_dir}/attractions",
         }
 
+    def _get_file_path(self, type: str, id: str) -> str | None:
+        """
+        Get the path of the file of some data.
+
+        Args:
+            type (str): The type of data (e.g., 'trip', 'attractions').
+            id (str): The unique identifier for the data.
+
+        Returns:
+            str | None: The file path, or None if the type or id is invalid.
+        """
+        id = self.sanitize_id(id) if type and id else None
+        if not id:
+            return None
+        return f"{self._get_storage_map().get(type)}/{id}.json"
+
+    def _get_file_version(self, file_path: str) -> tuple[int, int] | None:
+        """
+        Get the version of a file, changed by any write.
+
+        Args:
+            file_path (str): The file path.
+
+        Returns:
+            tuple[int, int] | None: The modification time and size of the file, or None if there is no file.
+        """
+        try:
+            stat = os.stat(file_path)
+        except (OSError, TypeError):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
     def get_assets_dir(self) -> str:
         """
         Get the directory path for storing assets.
@@ -361,6 +517,83 @@ class AppData:
         """
         return self.get_config("assets_dir")
 
+    def add_checksum(self, json: str, version: str) -> str:
+        """
+        Add a checksum to a JSON object, so it is trusted when read again by the same version.
+
+        The checksum is an HMAC-SHA256 keyed by the DATA_CHECKSUM_KEY secret, so it can not be
+        recomputed by whoever can write the data files but not read the server environment.
+
+        Args:
+            json (str): The JSON object.
+            version (str): The version of the schema of the data (e.g. a model schema hash).
+
+        Returns:
+            str: The JSON object, starting with its checksum.
+        """
+        if not json.startswith("{") or json.replace(" ", "") == "{}":
+            return json
+
+        checksum = f"{version}:{self._get_checksum(json, version)}"
+        return f'{{"_checksum":"{checksum}",' + json[1:]
+
+    def _verify_checksum(self, text: str, data: dict) -> dict:
+        """
+        Replace the checksum of a JSON object by its schema version, if the content matches.
+
+        The '_schema' key is only set for the data that was not modified since it was saved.
+
+        Args:
+            text (str): The JSON object as read from the file.
+            data (dict): The parsed JSON object.
+
+        Returns:
+            dict: The data, with the '_schema' key if the checksum is valid.
+        """
+        data.pop("_schema", None)
+        checksum = data.pop("_checksum", None)
+        if not isinstance(checksum, str):
+            return data
+
+        prefix = f'{{"_checksum":"{checksum}",'
+        version = checksum.split(":")[0]
+        if text.startswith(prefix) and hmac.compare_digest(
+            checksum,
+            f"{version}:{self._get_checksum('{' + text[len(prefix):], version)}",
+        ):
+            data["_schema"] = version
+        return data
+
+    def _get_checksum(self, json: str, version: str) -> str:
+        return hmac.new(
+            self._get_checksum_key(),
+            f"{version}{json}".encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()[:32]
+
+    def _get_checksum_key(self) -> bytes:
+        """
+        Get the secret key of the data checksums.
+
+        Without DATA_CHECKSUM_KEY, a random key is used for the life of the process, so the data
+        saved by an earlier process is validated again when read.
+
+        Returns:
+            bytes: The key.
+        """
+        if AppData._checksum_key is None:
+            with AppData._checksum_lock:
+                if AppData._checksum_key is None:
+                    key = self.get_api_key("datachecksum")
+                    if not key:
+                        _log(
+                            "[AppData] DATA_CHECKSUM_KEY is not set, using a random key for this process",
+                            level="WARNING",
+                        )
+                        key = secrets.token_hex(32)
+                    AppData._checksum_key = key.encode("utf-8")
+        return AppData._checksum_key
+
     def sanitize_id(self, id: str) -> str:
         """
         Sanitize the ID to ensure it's valid and safe to use in filenames.
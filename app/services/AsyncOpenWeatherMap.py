@@ -0,0 +1,341 @@
+import asyncio
+import random
+import weakref
+import httpx
+
+from typing import Awaitable, Callable, List
+
+from services.AppData import AppData
+from services.ForecastStore import ForecastStore
+from services.GoogleMaps import GoogleMaps
+from services.HttpClient import HttpClient
+from services.OpenWeatherMap import OpenWeatherMap
+from services.Logger import _log
+
+from models.Weather import ForecastModel, WeatherModel
+
+
+class AsyncOpenWeatherMap(OpenWeatherMap):
+    """
+    Asyncio variant of the OpenWeatherMap service, to fetch the weather of many cities at once.
+
+    The geocoding and weather requests of all the cities run concurrently, with at most
+    'weather_concurrency' requests in flight. Rate limited (429) requests halve the number of
+    requests in flight, which then grows back one at a time. Rate limited and failed (5xx)
+    requests are retried after the 'Retry-After' header or an exponential backoff, outside of
+    the limiter so the other cities keep going.
+    """
+
+    # Geocoded cities shared by all instances: (city, state) -> (lat, long)
+    _coordinates: dict[tuple[str, str], tuple[float, float]] = {}
+
+    def __init__(
+        self,
+        api_key: str = None,
+        google_maps_api_key: str = None,
+        concurrency: int = None,
+        transport: httpx.AsyncBaseTransport = None,
+    ):
+        """
+        Initialize the AsyncOpenWeatherMap class.
+
+        Args:
+            api_key (str, optional): The OpenWeatherMap API key.
+            google_maps_api_key (str, optional): The Google Maps API key, used for geocoding.
+            concurrency (int, optional): The maximum number of requests in flight,
+                defaults to the 'weather_concurrency' config.
+            transport (httpx.AsyncBaseTransport, optional): A custom transport to use (Mainly for tests).
+        """
+        super().__init__(api_key)
+        self.google_maps = GoogleMaps(api_key=google_maps_api_key)
+        self.transport = transport
+
+        # Limiter and geocoding tasks shared by the concurrent calls of this instance, per
+        # event loop, as they can not be used from another loop (e.g. another asyncio.run)
+        self._loop_state: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop,
+            tuple[RateLimiter, dict[tuple[str, str], asyncio.Task]],
+        ] = weakref.WeakKeyDictionary()
+
+        app_data = AppData()
+        self.concurrency = int(
+            concurrency or app_data.get_config("weather_concurrency") or 8
+        )
+        self.max_retries = int(app_data.get_config("http_max_retries") or 0)
+        self.backoff_factor = float(app_data.get_config("http_backoff_factor") or 0)
+
+    # --------------------------
+    # Weather Operations
+    # --------------------------
+
+    async def get_forecasts_many(
+        self, cities: list[tuple[str, str]], daily: bool = True
+    ) -> dict[tuple[str, str], List[ForecastModel] | None]:
+        """
+        Retrieves the forecast of many cities concurrently.
+
+        Args:
+            cities (list[tuple[str, str]]): The (city, state) pairs.
+            daily (bool, optional): Aggregate the forecast per day. Defaults to True.
+
+        Returns:
+            dict[tuple[str, str], List[ForecastModel] | None]: The forecasts keyed by (city, state),
+                None for the cities that failed.
+        """
+
+        async def fetch(client, limiter, city_name, state_name):
+            lat, long = await self._get_coordinates_async(
+                client, limiter, city_name, state_name
+            )
+
+            # Forecasts are shared with the sync service through the disk cache
+            store = ForecastStore()
+            data = store.get_fresh(lat, long)
+            if data is None:
+                data = await self._fetch_json_async(
+                    client, limiter, self._get_forecast_url(lat, long)
+                )
+                store.put(lat, long, data)
+
+            columns = self._to_forecast_columns(data, days=10)
+            if daily:
+                return self._aggregate_daily(columns, city_name, state_name)
+            return self._to_hourly_forecast(columns, city_name, state_name)
+
+        return await self._run_many(cities, fetch)
+
+    async def get_current_weather_many(
+        self, cities: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], WeatherModel | None]:
+        """
+        Retrieves the current weather of many cities concurrently.
+
+        Args:
+            cities (list[tuple[str, str]]): The (city, state) pairs.
+
+        Returns:
+            dict[tuple[str, str], WeatherModel | None]: The weather keyed by (city, state),
+                None for the cities that failed.
+        """
+
+        async def fetch(client, limiter, city_name, state_name):
+            lat, long = await self._get_coordinates_async(
+                client, limiter, city_name, state_name
+            )
+            data = await self._fetch_json_async(
+                client, limiter, self._get_weather_url(lat, long)
+            )
+            return self._to_weather(data)
+
+        return await self._run_many(cities, fetch)
+
+    # --------------------------
+    # Utils
+    # --------------------------
+
+    async def _run_many(
+        self,
+        cities: list[tuple[str, str]],
+        fetch: Callable[..., Awaitable],
+    ) -> dict:
+        """
+        Run the fetch function for every city concurrently, sharing one client and limiter.
+
+        Args:
+            cities (list[tuple[str, str]]): The (city, state) pairs.
+            fetch (Callable[..., Awaitable]): Called with (client, limiter, city, state).
+
+        Returns:
+            dict: The results keyed by (city, state), None for the cities that failed.
+        """
+        cities = list(dict.fromkeys((city, state) for city, state in cities))
+        limiter, _ = self._get_loop_state()
+
+        async with HttpClient.create_async_client(
+            max_connections=self.concurrency, transport=self.transport
+        ) as client:
+            results = await asyncio.gather(
+                *(fetch(client, limiter, city, state) for city, state in cities),
+                return_exceptions=True,
+            )
+
+        weather = {}
+        for city, result in zip(cities, results):
+            if isinstance(result, Exception):
+                _log(
+                    f"[AsyncOpenWeatherMap] Error fetching {city}: {result}",
+                    level="ERROR",
+                )
+                result = None
+            weather[city] = result
+        return weather
+
+    def _get_loop_state(
+        self,
+    ) -> tuple["RateLimiter", dict[tuple[str, str], asyncio.Task]]:
+        """
+        Get the limiter and the geocoding tasks of the running event loop.
+
+        Returns:
+            tuple[RateLimiter, dict[tuple[str, str], asyncio.Task]]: The limiter and the
+                geocoding task of each city being geocoded.
+        """
+        loop = asyncio.get_running_loop()
+        if loop not in self._loop_state:
+            self._loop_state[loop] = (RateLimiter(self.concurrency), {})
+        return self._loop_state[loop]
+
+    async def _get_coordinates_async(
+        self,
+        client: httpx.AsyncClient,
+        limiter: "RateLimiter",
+        city_name: str,
+        state_name: str,
+    ) -> tuple[float, float]:
+        """
+        Retrieves the coordinates of a city using the Google Maps Geocoding API.
+
+        Coordinates are cached per process and concurrent lookups of the same city share one request.
+
+        Args:
+            client (httpx.AsyncClient): The client to use.
+            limiter (RateLimiter): Limits the requests in flight.
+            city_name (str): The name of the city.
+            state_name (str): The name of the state.
+
+        Returns:
+            tuple[float, float]: The latitude and longitude.
+        """
+        key = (city_name, state_name)
+        if key in AsyncOpenWeatherMap._coordinates:
+            return AsyncOpenWeatherMap._coordinates[key]
+
+        async def geocode():
+            location = f"{city_name},{state_name}"
+            data = await self._fetch_json_async(
+                client, limiter, self.google_maps.get_geocode_url(location)
+            )
+            return self.google_maps.to_latitude_longitude(data, location)
+
+        _, geocoding = self._get_loop_state()
+        if key not in geocoding:
+            geocoding[key] = asyncio.ensure_future(geocode())
+        try:
+            coordinates = await asyncio.shield(geocoding[key])
+        finally:
+            if geocoding.get(key) and geocoding[key].done():
+                del geocoding[key]
+
+        AsyncOpenWeatherMap._coordinates[key] = coordinates
+        return coordinates
+
+    async def _fetch_json_async(
+        self, client: httpx.AsyncClient, limiter: "RateLimiter", url: str
+    ) -> dict:
+        """
+        Fetches JSON data from the URL, retrying rate limited and failed requests.
+
+        Args:
+            client (httpx.AsyncClient): The client to use.
+            limiter (RateLimiter): Limits the requests in flight.
+            url (str): The URL to fetch the JSON data from.
+
+        Returns:
+            dict: The JSON data as a dictionary.
+
+        Raises:
+            httpx.HTTPError: If the request fails after all retries.
+        """
+        attempt = 0
+        while True:
+            response = None
+            async with limiter:
+                try:
+                    response = await client.get(url)
+                except httpx.TransportError as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    _log(f"[AsyncOpenWeatherMap] Request failed, retrying: {e}")
+
+            if response is not None and response.status_code == 429:
+                limiter.throttle()
+            elif response is not None and response.status_code < 400:
+                limiter.relax()
+
+            if response is not None and (
+                response.status_code not in HttpClient.RETRY_STATUS_CODES
+                or attempt >= self.max_retries
+            ):
+                response.raise_for_status()
+                return response.json()
+
+            await asyncio.sleep(self._get_backoff(attempt, response))
+            attempt += 1
+
+    def _get_backoff(self, attempt: int, response: httpx.Response = None) -> float:
+        """
+        Calculate the time to wait before the next attempt.
+
+        Uses the 'Retry-After' header when the server sends one (Plus a jitter, so the
+        retries are spread out), otherwise an exponential backoff with full jitter.
+
+        Args:
+            attempt (int): The number of the failed attempt (Starting at 0).
+            response (httpx.Response, optional): The response of the failed attempt.
+
+        Returns:
+            float: The time to wait in seconds.
+        """
+        backoff = random.uniform(0, self.backoff_factor * (2**attempt))
+        retry_after = response.headers.get("Retry-After") if response else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after) + backoff
+        return backoff
+
+
+class RateLimiter:
+    """
+    Limits the number of requests in flight, adapting the limit to the server rate limit.
+
+    The limit is halved when a request is rate limited and grows back by one after
+    'limit' successful requests in a row (Additive increase, multiplicative decrease).
+    """
+
+    def __init__(self, max_limit: int):
+        """
+        Initialize the RateLimiter class.
+
+        Args:
+            max_limit (int): The maximum number of requests in flight.
+        """
+        self.max_limit = max(1, int(max_limit))
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def __aexit__(self, *exc_info):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def throttle(self) -> None:
+        """
+        Halve the limit after a rate limited request.
+        """
+        self.limit = max(1, self.limit // 2)
+        self._successes = 0
+
+    def relax(self) -> None:
+        """
+        Count a successful request, raising the limit after enough of them.
+        """
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_limit:
+            self.limit += 1
+            self._successes = 0
@@ -0,0 +1,615 @@
+import os
+import json
+import math
+import hashlib
+import time
+import threading
+
+from typing import Any, List
+from pydantic import TypeAdapter
+
+from lib.GeoIndex import GeoIndex
+from lib.SearchIndex import SearchIndex
+
+from services.AppData import AppData
+from services.Logger import _log
+
+from models.Attraction import AttractionModel
+
+
+class AttractionsCatalog:
+    """
+    In-memory catalog of the stored attractions, indexed by slug, city, state and id.
+
+    The attraction files are parsed once per process. Every 'attractions_catalog_check_interval'
+    seconds (Or right after a save or delete) the folder is scanned again and only the new or
+    modified files are parsed, so the queries are answered from the indexes without reading
+    the files again.
+
+    The full-text search and spatial indexes are built on their first query after each reload.
+
+    When 'attractions_catalog_snapshot' is enabled, the parsed catalog is also packed in a
+    single snapshot file, so a new process loads it at once and parses only the files that
+    changed since it was written.
+
+    The returned attractions are shared by all the callers and must not be modified.
+    """
+
+    # Loaded catalogs shared by all instances: attractions dir -> catalog
+    _catalogs: dict[str, dict[str, Any]] = {}
+    _lock = threading.Lock()
+    _index_lock = threading.Lock()
+    # Spatial indexes shared by the catalog reloads: attractions dir -> (version, index)
+    _geo_indexes: dict[str, tuple[int, tuple]] = {}
+
+    # Hash of the AttractionModel schema, the snapshots of another schema are parsed again
+    _snapshot_version: str = None
+    ATTRACTION_LIST = TypeAdapter(List[AttractionModel])
+
+    # Weight of the terms of each searched field
+    SEARCH_FIELDS = {"name": 3.0, "city_name": 1.5, "description": 1.0}
+
+    def __init__(
+        self,
+        attractions_dir: str = None,
+        snapshot_path: str = None,
+        check_interval: float = None,
+    ):
+        """
+        Initialize the AttractionsCatalog class.
+
+        Args:
+            attractions_dir (str, optional): The attractions folder, defaults to the 'attractions' storage.
+            snapshot_path (str, optional): The snapshot file, defaults to the 'attractions_catalog'
+                storage when the 'attractions_catalog_snapshot' config is enabled.
+            check_interval (float, optional): The seconds between the folder scans,
+                defaults to the 'attractions_catalog_check_interval' config.
+        """
+        app_data = AppData()
+        storage_map = app_data._get_storage_map()
+        self.attractions_dir = attractions_dir or storage_map.get("attractions")
+
+        if snapshot_path is None and app_data.get_config(
+            "attractions_catalog_snapshot"
+        ):
+            snapshot_path = os.path.join(
+                storage_map.get("attractions_catalog"), "catalog.json"
+            )
+        self.snapshot_path = snapshot_path
+
+        if check_interval is None:
+            check_interval = app_data.get_config("attractions_catalog_check_interval")
+        self.check_interval = float(2 if check_interval is None else check_interval)
+
+    # --------------------------
+    # Queries
+    # --------------------------
+
+    def get(self, slug: str) -> List[AttractionModel] | None:
+        """
+        Get the attractions of a slug.
+
+        Args:
+            slug (str): The attractions slug (e.g. 'rj_rio-de-janeiro').
+
+        Returns:
+            list[AttractionModel] | None: The attractions, or None if the slug is not stored.
+        """
+        entry = self._get_catalog()["files"].get(slug)
+        return list(entry[1]) if entry and entry[1] else None
+
+    def get_by_id(self, attraction_id: str) -> AttractionModel | None:
+        """
+        Get an attraction by its ID.
+
+        Args:
+            attraction_id (str): The attraction ID.
+
+        Returns:
+            AttractionModel | None: The attraction, or None if not found.
+        """
+        return self._get_catalog()["by_id"].get(attraction_id)
+
+    def get_by_city(self, city_name: str, state_name: str) -> List[AttractionModel]:
+        """
+        Get the attractions of a city.
+
+        Args:
+            city_name (str): The name of the city.
+            state_name (str): The name of the state.
+
+        Returns:
+            list[AttractionModel]: The attractions, empty if the city was not scraped.
+        """
+        return list(self._get_catalog()["by_city"].get((city_name, state_name), []))
+
+    def get_by_state(self, state_name: str) -> List[AttractionModel]:
+        """
+        Get the attractions of all the cities of a state.
+
+        Args:
+            state_name (str): The name of the state.
+
+        Returns:
+            list[AttractionModel]: The attractions, empty if no city of the state was scraped.
+        """
+        return list(self._get_catalog()["by_state"].get(state_name, []))
+
+    def get_all(self) -> List[AttractionModel]:
+        """
+        Get the attractions of all the stored files, ordered by slug.
+
+        Returns:
+            list[AttractionModel]: The attractions.
+        """
+        return list(self._get_catalog()["all"])
+
+    def get_cities(self) -> List[tuple[str, str]]:
+        """
+        Get the cities with attractions, ordered by name.
+
+        Returns:
+            list[tuple[str, str]]: The (city, state) pairs.
+        """
+        return list(self._get_catalog()["cities"])
+
+    def search(self, query: str, limit: int = 10) -> List[AttractionModel]:
+        """
+        Search the attractions by name, city and description, ignoring case and accents.
+
+        The attractions are ranked with BM25, boosted by their popularity (Review stars and
+        count) by up to 'attractions_search_popularity_weight'.
+
+        Args:
+            query (str): The search query.
+            limit (int, optional): The maximum number of attractions. Defaults to 10.
+
+        Returns:
+            list[AttractionModel]: The matching attractions, best first.
+        """
+        catalog = self._get_catalog()
+        with AttractionsCatalog._index_lock:
+            if catalog.get("search") is None:
+                catalog["search"] = self._new_search_index(catalog)
+        index, attractions = catalog["search"]
+        return [attractions[doc_id] for doc_id, _ in index.search(query, limit)]
+
+    def nearest(
+        self, lat: float, lon: float, k: int = 10, max_km: float = None
+    ) -> List[tuple[AttractionModel, float]]:
+        """
+        Find the attractions nearest to a location.
+
+        Args:
+            lat (float): The latitude.
+            lon (float): The longitude.
+            k (int, optional): The maximum number of attractions. Defaults to 10.
+            max_km (float, optional): The maximum distance in km. Defaults to no limit.
+
+        Returns:
+            list[tuple[AttractionModel, float]]: The attractions and their distances in km, nearest first.
+        """
+        index, attractions, _ = self._get_geo_index()
+        return [
+            (attractions[i], km) for i, km in index.nearest(lat, lon, k, max_km=max_km)
+        ]
+
+    def within_radius(
+        self, lat: float, lon: float, km: float
+    ) -> List[tuple[AttractionModel, float]]:
+        """
+        Find the attractions within a distance of a location.
+
+        Args:
+            lat (float): The latitude.
+            lon (float): The longitude.
+            km (float): The radius in km.
+
+        Returns:
+            list[tuple[AttractionModel, float]]: The attractions and their distances in km, nearest first.
+        """
+        index, attractions, _ = self._get_geo_index()
+        return [
+            (attractions[i], distance)
+            for i, distance in index.within_radius(lat, lon, km)
+        ]
+
+    def get_city_coordinates(self) -> dict[tuple[str, str], tuple[float, float]]:
+        """
+        Get the coordinates of the cities with attractions or trips.
+
+        Returns:
+            dict[tuple[str, str], tuple[float, float]]: The (latitude, longitude) by (city, state).
+        """
+        return dict(self._get_geo_index()[2])
+
+    def reload(self, force: bool = False) -> int:
+        """
+        Parse the attraction files added or modified since the last scan and drop the deleted ones.
+
+        Args:
+            force (bool, optional): Scan the folder even if it was scanned less than
+                'check_interval' seconds ago. Defaults to False.
+
+        Returns:
+            int: The number of files parsed or dropped.
+        """
+        with AttractionsCatalog._lock:
+            catalog = AttractionsCatalog._catalogs.get(self.attractions_dir)
+            if catalog is None:
+                catalog = self._new_catalog(self._load_snapshot())
+                AttractionsCatalog._catalogs[self.attractions_dir] = catalog
+            elif (
+                not force
+                and time.monotonic() - catalog["checked_at"] < self.check_interval
+            ):
+                return 0
+
+            files = dict(catalog["files"])
+            changes = 0
+            signatures = self._scan()
+            for slug in set(files) - set(signatures):
+                del files[slug]
+                changes += 1
+            for slug, signature in signatures.items():
+                if slug not in files or files[slug][0] != signature:
+                    files[slug] = (signature, self._load_file(slug))
+                    changes += 1
+
+            if changes:
+                catalog = self._new_catalog(files)
+                AttractionsCatalog._catalogs[self.attractions_dir] = catalog
+            catalog["checked_at"] = time.monotonic()
+
+        if changes:
+            _log(f"[AttractionsCatalog] Reloaded {changes} attraction files")
+            self._save_snapshot(files)
+        return changes
+
+    def invalidate(self) -> None:
+        """
+        Scan the folder again on the next query, after the attraction files were changed.
+        """
+        with AttractionsCatalog._lock:
+            catalog = AttractionsCatalog._catalogs.get(self.attractions_dir)
+            if catalog is not None:
+                catalog["checked_at"] = float("-inf")
+
+    @classmethod
+    def get_snapshot_version(cls) -> str:
+        """
+        Get the version of the snapshots, a hash of the AttractionModel JSON schema.
+
+        Returns:
+            str: The snapshot version.
+        """
+        if cls._snapshot_version is None:
+            schema = json.dumps(AttractionModel.model_json_schema(), sort_keys=True)
+            schema_hash = hashlib.sha256(schema.encode("utf-8")).hexdigest()
+            cls._snapshot_version = schema_hash[:12]
+        return cls._snapshot_version
+
+    # --------------------------
+    # Indexes
+    # --------------------------
+
+    def _get_catalog(self) -> dict[str, Any]:
+        """
+        Get the catalog of the attractions folder, reloading it when the check interval passed.
+
+        Returns:
+            dict[str, Any]: The catalog files and indexes.
+        """
+        self.reload()
+        return AttractionsCatalog._catalogs[self.attractions_dir]
+
+    def _new_catalog(self, files: dict[str, tuple]) -> dict[str, Any]:
+        """
+        Build the indexes of the parsed attraction files.
+
+        When more than one file has the attractions of a city (e.g. slugs generated by older
+        versions), the most recently saved one is used for the city and state indexes.
+
+        Args:
+            files (dict[str, tuple]): The parsed files: slug -> ((mtime_ns, size), attractions).
+
+        Returns:
+            dict[str, Any]: The catalog files and indexes.
+        """
+        by_id, by_city, by_state, all_attractions = {}, {}, {}, []
+        for slug in sorted(files):
+            all_attractions.extend(files[slug][1])
+
+        for slug, (_, attractions) in sorted(
+            files.items(), key=lambda item: item[1][0]
+        ):
+            for attraction in attractions:
+                by_id[attraction.id] = attraction
+            if attractions:
+                by_city[(attractions[0].city_name, attractions[0].state_name)] = (
+                    attractions
+                )
+
+        for (_, state_name), attractions in sorted(by_city.items()):
+            by_state.setdefault(state_name, []).extend(attractions)
+
+        return {
+            "files": files,
+            "by_id": by_id,
+            "by_city": by_city,
+            "by_state": by_state,
+            "all": all_attractions,
+            "cities": sorted(by_city),
+            "search": None,
+            "geo": None,
+            "checked_at": float("-inf"),
+        }
+
+    def _get_geo_index(
+        self,
+    ) -> tuple[GeoIndex, List[AttractionModel], dict[tuple[str, str], tuple]]:
+        """
+        Get the spatial index of the catalog, building it on the first query.
+
+        The index is kept across the reloads that do not change the indexed attractions or
+        their coordinates (e.g. the attractions scraped again), so it is built again only
+        when its version changes.
+
+        Returns:
+            tuple[GeoIndex, list[AttractionModel], dict]: The index, the indexed attractions
+                and the coordinates of the cities.
+        """
+        catalog = self._get_catalog()
+        with AttractionsCatalog._index_lock:
+            if catalog.get("geo") is None:
+                attractions = [
+                    attraction
+                    for city in catalog["cities"]
+                    for attraction in catalog["by_city"][city]
+                ]
+                version = self._get_geo_version(attractions)
+
+                cached = AttractionsCatalog._geo_indexes.get(self.attractions_dir)
+                if cached and cached[0] == version:
+                    index, _, city_coordinates = cached[1]
+                else:
+                    index, city_coordinates = self._new_geo_index(attractions)
+
+                # The indexed positions are the same, the attractions may be newer objects
+                catalog["geo"] = (index, attractions, city_coordinates)
+                AttractionsCatalog._geo_indexes[self.attractions_dir] = (
+                    version,
+                    catalog["geo"],
+                )
+        return catalog["geo"]
+
+    def _get_geo_version(self, attractions: List[AttractionModel]) -> int:
+        """
+        Get the version of the spatial index of the attractions.
+
+        Args:
+            attractions (list[AttractionModel]): The indexed attractions, in order.
+
+        Returns:
+            int: A hash of the ids, cities and coordinates of the attractions.
+        """
+        return hash(
+            tuple(
+                (
+                    attraction.id,
+                    attraction.city_name,
+                    attraction.state_name,
+                    attraction.latitude,
+                    attraction.longitude,
+                )
+                for attraction in attractions
+            )
+        )
+
+    def _new_geo_index(
+        self, attractions: List[AttractionModel]
+    ) -> tuple[GeoIndex, dict[tuple[str, str], tuple]]:
+        """
+        Build the spatial index of the attractions of each city.
+
+        Attractions without coordinates (e.g. scraped from Yelp) are placed at the center of
+        their city: the mean of its geocoded attractions, or else the coordinates saved in the
+        trips to or from the city. The trips are only read again when the index is built again.
+
+        Args:
+            attractions (list[AttractionModel]): The attractions to index, in order.
+
+        Returns:
+            tuple[GeoIndex, dict]: The index and the coordinates of the cities.
+        """
+        geocoded: dict[tuple[str, str], list[tuple[float, float]]] = {}
+        for attraction in attractions:
+            if attraction.latitude is not None and attraction.longitude is not None:
+                geocoded.setdefault(
+                    (attraction.city_name, attraction.state_name), []
+                ).append((attraction.latitude, attraction.longitude))
+
+        # Imported here, the trips import the catalog to resolve their attractions
+        from services.TripData import TripData
+
+        city_coordinates = TripData().get_city_coordinates()
+        for city, points in geocoded.items():
+            city_coordinates[city] = (
+                sum(lat for lat, _ in points) / len(points),
+                sum(lon for _, lon in points) / len(points),
+            )
+
+        index = GeoIndex(
+            (
+                (
+                    (attraction.latitude, attraction.longitude)
+                    if attraction.latitude is not None
+                    and attraction.longitude is not None
+                    else city_coordinates.get(
+                        (attraction.city_name, attraction.state_name)
+                    )
+                )
+                for attraction in attractions
+            )
+        )
+        return index, city_coordinates
+
+    def _new_search_index(
+        self, catalog: dict[str, Any]
+    ) -> tuple[SearchIndex, List[AttractionModel]]:
+        """
+        Build the full-text search index of the attractions of each city.
+
+        Args:
+            catalog (dict[str, Any]): The catalog files and indexes.
+
+        Returns:
+            tuple[SearchIndex, list[AttractionModel]]: The index and the indexed attractions.
+        """
+        app_data = AppData()
+        attractions = [
+            attraction
+            for city in catalog["cities"]
+            for attraction in catalog["by_city"][city]
+        ]
+
+        # Well rated attractions with more reviews rank higher
+        max_reviews = max((a.review_count for a in attractions), default=0)
+        priors = [
+            max(attraction.review_stars, 0)
+            / 5
+            * (math.log1p(attraction.review_count) / math.log1p(max_reviews or 1))
+            for attraction in attractions
+        ]
+
+        stopwords = []
+        stopwords_file = app_data.get_config("stopwords_file")
+        if stopwords_file and os.path.exists(stopwords_file):
+            with open(stopwords_file, "r", encoding="utf-8") as f:
+                stopwords = f.read().split()
+
+        index = SearchIndex(
+            (
+                {field: getattr(attraction, field) for field in self.SEARCH_FIELDS}
+                for attraction in attractions
+            ),
+            self.SEARCH_FIELDS,
+            stopwords=stopwords,
+            priors=priors,
+            prior_weight=float(
+                app_data.get_config("attractions_search_popularity_weight") or 0
+            ),
+        )
+        return index, attractions
+
+    # --------------------------
+    # File Operations
+    # --------------------------
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        """
+        List the attraction files.
+
+        Returns:
+            dict[str, tuple[int, int]]: The modification time (ns) and size of each file, by slug.
+        """
+        signatures = {}
+        if not os.path.isdir(self.attractions_dir):
+            return signatures
+
+        with os.scandir(self.attractions_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                signatures[entry.name[:-5]] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def _load_file(self, slug: str) -> List[AttractionModel]:
+        """
+        Parse and validate an attraction file.
+
+        Args:
+            slug (str): The attractions slug.
+
+        Returns:
+            list[AttractionModel]: The attractions, empty if the file is invalid.
+        """
+        file_path = os.path.join(self.attractions_dir, f"{slug}.json")
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, str):
+                data = json.loads(data)
+            return [AttractionModel(**item) for item in data or []]
+        except Exception as e:
+            _log(f"Error loading data from {file_path}: {e}", level="ERROR")
+            return []
+
+    def _load_snapshot(self) -> dict[str, tuple]:
+        """
+        Load the parsed attraction files from the snapshot.
+
+        The snapshot is plain JSON and its attractions are validated again, so a tampered
+        snapshot can not do more than a tampered attraction file.
+
+        Returns:
+            dict[str, tuple]: The parsed files, empty if there is no valid snapshot.
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return {}
+
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") == self.get_snapshot_version() and snapshot.get(
+                "attractions_dir"
+            ) == os.path.abspath(self.attractions_dir):
+                return {
+                    slug: (
+                        tuple(file["signature"]),
+                        self.ATTRACTION_LIST.validate_python(file["attractions"]),
+                    )
+                    for slug, file in snapshot["files"].items()
+                }
+        except Exception as e:
+            _log(f"[AttractionsCatalog] Invalid snapshot: {e}", level="ERROR")
+        return {}
+
+    def _save_snapshot(self, files: dict[str, tuple]) -> None:
+        """
+        Pack the parsed attraction files in the snapshot, written atomically.
+
+        Args:
+            files (dict[str, tuple]): The parsed files.
+        """
+        if not self.snapshot_path:
+            return
+
+        snapshot = {
+            "version": self.get_snapshot_version(),
+            "attractions_dir": os.path.abspath(self.attractions_dir),
+            "files": {
+                slug: {
+                    "signature": list(signature),
+                    "attractions": self.ATTRACTION_LIST.dump_python(
+                        attractions, mode="json"
+                    ),
+                }
+                for slug, (signature, attractions) in files.items()
+            },
+        }
+        temp_path = f"{self.snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(temp_path, self.snapshot_path)
+        except Exception as e:
+            _log(f"[AttractionsCatalog] Failed to save snapshot: {e}", level="ERROR")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
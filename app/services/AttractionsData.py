@@ -1,17 +1,27 @@
+import hashlib
+import threading
+
 from typing import List
 
 from services.AppData import AppData
+from services.AttractionsCatalog import AttractionsCatalog
+from services.Logger import _log
 from lib.Utils import Utils
 
-from models.Attraction import AttractionModel
+from models.Attraction import AttractionModel, AttractionRefModel
 
 
 class AttractionsData:
+    # Loaded attraction snapshots shared by all instances: hash -> attraction
+    _snapshots: dict[str, AttractionModel] = {}
+    _lock = threading.Lock()
+
     def __init__(self):
         """
         Initialize the AttractionsData class.
         """
         self.app_data = AppData()
+        self.catalog = None
 
     # --------------------------
     # CRUD Operations
@@ -41,7 +51,9 @@ class AttractionsData:
         json = "[" + json[:-1] + "]"
 
         # Save the updated or new data
-        return self.app_data.save("attractions", slug, json, replace=True)
+        saved = self.app_data.save("attractions", slug, json, replace=True)
+        AttractionsCatalog().invalidate()
+        return saved
 
     def get(_self, slug: str) -> List[AttractionModel]:
         """
@@ -69,7 +81,9 @@ class AttractionsData:
         Returns:
             bool: True if the file was deleted, False otherwise.
         """
-        return self.app_data.delete("attractions", slug)
+        deleted = self.app_data.delete("attractions", slug)
+        AttractionsCatalog().invalidate()
+        return deleted
 
     # --------------------------
     # Overall Attractions Data
@@ -82,14 +96,7 @@ class AttractionsData:
         Returns:
             list: A list of Attraction objects.
         """
-        all_attractions = []
-        for city_attractions in self.app_data.get_all("attractions"):
-            if not city_attractions:
-                continue
-
-            for attraction in city_attractions:
-                all_attractions.append(AttractionModel(**attraction))
-        return all_attractions
+        return AttractionsCatalog().get_all()
 
     def get_attractions_by_city(self) -> dict[str, List[AttractionModel]]:
         """
@@ -98,21 +105,11 @@ class AttractionsData:
         Returns:
             dict: A dictionary with city names as keys and a list of Attraction objects as values.
         """
-        attractions_by_city = {}
-        for city_attractions in self.app_data.get_all("attractions"):
-            if not city_attractions:
-                continue
-
-            city_name = (
-                city_attractions[0]["city_name"]
-                + ", "
-                + city_attractions[0]["state_name"]
-            )
-            attractions = []
-            for attraction in city_attractions:
-                attractions.append(AttractionModel(**attraction))
-            attractions_by_city[city_name] = attractions
-        return attractions_by_city
+        catalog = AttractionsCatalog()
+        return {
+            f"{city_name}, {state_name}": catalog.get_by_city(city_name, state_name)
+            for city_name, state_name in catalog.get_cities()
+        }
 
     def get_cities(self) -> List[str]:
         """
@@ -121,25 +118,28 @@ class AttractionsData:
         Returns:
             list: A list of city names.
         """
-        cities = []
-        for city_attractions in self.app_data.get_all("attractions"):
-            if not city_attractions:
-                continue
-
-            city_name = (
-                city_attractions[0]["city_name"]
-                + ", "
-                + city_attractions[0]["state_name"]
-            )
-            cities.append(city_name)
+        cities = [
+            f"{city_name}, {state_name}"
+            for city_name, state_name in AttractionsCatalog().get_cities()
+        ]
         # Order the cities alphabetically
         cities.sort()
 
-        # Remove duplicates
-        cities = list(dict.fromkeys(cities))
-
         return cities
 
+    def search(self, query: str, limit: int = 10) -> List[AttractionModel]:
+        """
+        Search the attractions of all cities by name, city and description.
+
+        Args:
+            query (str): The search query (Case and accent insensitive).
+            limit (int, optional): The maximum number of attractions. Defaults to 10.
+
+        Returns:
+            list: A list of Attraction objects, best match first.
+        """
+        return AttractionsCatalog().search(query, limit)
+
     def count_cities(self) -> int:
         """
         Count the total number of scanned cities.
@@ -158,10 +158,131 @@ class AttractionsData:
         """
         return len(self.get_all_attractions())
 
+    # --------------------------
+    # Attraction References
+    # --------------------------
+
+    def to_refs(
+        self, attractions: List[AttractionModel]
+    ) -> List[AttractionRefModel] | None:
+        """
+        Convert attractions to references, saving a snapshot of each one.
+
+        The snapshots are stored once per content hash and shared by all the trips, so an
+        attraction that is later re-scraped or deleted from the catalog can still be resolved.
+
+        Args:
+            attractions (list[AttractionModel]): List of Attraction objects.
+
+        Returns:
+            list[AttractionRefModel] | None: The references to the attractions, or None if a
+                snapshot could not be saved (The attractions must then be kept as they are).
+        """
+        refs = []
+        for attraction in attractions:
+            snapshot = attraction.model_dump_json()
+            snapshot_hash = self.get_snapshot_hash(snapshot)
+
+            with AttractionsData._lock:
+                saved = snapshot_hash in AttractionsData._snapshots
+            if not saved:
+                # Snapshots never change, an existing file is kept as is
+                if not self.app_data.save(
+                    "attraction_snapshots", snapshot_hash, snapshot
+                ) and not self.app_data.exists("attraction_snapshots", snapshot_hash):
+                    _log(
+                        f"Error saving the snapshot of attraction {attraction.id}",
+                        level="ERROR",
+                    )
+                    return None
+                with AttractionsData._lock:
+                    AttractionsData._snapshots[snapshot_hash] = attraction
+
+            refs.append(AttractionRefModel(id=attraction.id, hash=snapshot_hash))
+        return refs
+
+    def from_refs(self, refs: List[dict | AttractionRefModel]) -> List[AttractionModel]:
+        """
+        Resolve attraction references against the catalog, or their snapshots if the
+        attractions are no longer in the catalog.
+
+        Args:
+            refs (list[dict | AttractionRefModel]): The references to the attractions.
+
+        Returns:
+            list[AttractionModel]: The resolved attractions, skipping the unresolved ones.
+        """
+        # Kept for the next calls, e.g. when loading all the trips
+        self.catalog = self.catalog or AttractionsCatalog()
+        attractions = []
+        for ref in refs:
+            # The references are read from our own trips, they are not validated again
+            if isinstance(ref, dict):
+                ref_id, ref_hash = ref["id"], ref["hash"]
+            else:
+                ref_id, ref_hash = ref.id, ref.hash
+
+            attraction = self.catalog.get_by_id(ref_id) or self._get_snapshot(ref_hash)
+            if attraction:
+                attractions.append(attraction)
+            else:
+                _log(f"Attraction {ref_id} ({ref_hash}) not found", level="WARNING")
+        return attractions
+
+    def get_all_snapshots(self) -> List[AttractionModel]:
+        """
+        Retrieve the snapshots of all the attractions saved in trips.
+
+        Returns:
+            list[AttractionModel]: The attraction snapshots.
+        """
+        snapshots = [
+            self._get_snapshot(snapshot_hash)
+            for snapshot_hash in self.app_data.get_all_ids("attraction_snapshots")
+        ]
+        return [snapshot for snapshot in snapshots if snapshot]
+
+    def _get_snapshot(self, snapshot_hash: str) -> AttractionModel | None:
+        """
+        Load an attraction snapshot, once per process.
+
+        Args:
+            snapshot_hash (str): The snapshot hash.
+
+        Returns:
+            AttractionModel | None: The attraction, or None if the snapshot is missing.
+        """
+        with AttractionsData._lock:
+            attraction = AttractionsData._snapshots.get(snapshot_hash)
+        if attraction:
+            return attraction
+
+        snapshot = self.app_data.get("attraction_snapshots", snapshot_hash)
+        if not snapshot:
+            return None
+
+        attraction = AttractionModel(**snapshot)
+        with AttractionsData._lock:
+            AttractionsData._snapshots[snapshot_hash] = attraction
+        return attraction
+
     # --------------------------
     # Utils
     # --------------------------
 
+    @staticmethod
+    def get_snapshot_hash(snapshot: str) -> str:
+        """
+        Generate the content hash of an attraction snapshot.
+
+        Args:
+            snapshot (str): The attraction as JSON.
+
+        Returns:
+            str: The hash of the snapshot.
+        """
+        return hashlib.sha256(snapshot.encode("utf-8")).hexdigest()[:16]
+
     @staticmethod
     def slugify(city_name: str, state_name: str) -> str:
         """
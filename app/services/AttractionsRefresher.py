@@ -0,0 +1,302 @@
+import os
+import time
+import threading
+
+from collections import Counter
+from datetime import datetime
+from typing import Any
+
+from lib.RefreshLock import RefreshLock
+from lib.Utils import Utils
+
+from services.AppData import AppData
+from services.AttractionsData import AttractionsData
+from services.GooglePlacesAttractionsScrapper import GooglePlacesAttractionsScrapper
+from services.YelpAttractionsScrapper import YelpAttractionsScrapper
+from services.TripData import TripData
+from services.Logger import _log
+
+from models.Attraction import AttractionModel
+from models.Trip import TripModel
+
+
+class AttractionsRefresher:
+    """
+    Re-scrapes the attractions of the cities in the background.
+
+    Expired attractions are still served while a background thread scrapes the city again
+    (stale-while-revalidate), with a single refresh per city across threads and processes.
+    The scheduler also refreshes the most popular destinations (By trip count) before
+    their attractions expire, so their visitors never see stale data.
+    """
+
+    _thread: threading.Thread = None
+    _thread_lock = threading.Lock()
+    # Slugs being refreshed, by this process and the lock files shared with the others
+    _refresh_lock = RefreshLock(max_age=600)
+    _status: dict[str, Any] = {
+        "running": False,
+        "finished_at": None,
+        "duration_s": None,
+        "cities_total": 0,
+        "cities_refreshed": 0,
+        "cities_failed": 0,
+    }
+
+    def __init__(self):
+        """
+        Initialize the AttractionsRefresher class.
+        """
+        app_data = AppData()
+        self.max_age = int(app_data.get_config("attractions_max_age") or 8640000)
+        self.interval = int(
+            app_data.get_config("attractions_refresh_interval") or 86400
+        )
+        self.top = int(app_data.get_config("attractions_refresh_top") or 20)
+        self.ahead = int(app_data.get_config("attractions_refresh_ahead") or 604800)
+        self.locks_dir = app_data._get_storage_map().get("locks")
+        self.attractions_data = AttractionsData()
+
+    # --------------------------
+    # Scheduler
+    # --------------------------
+
+    def start(self) -> bool:
+        """
+        Start refreshing the popular destinations every 'attractions_refresh_interval' seconds (Once per process).
+
+        Returns:
+            bool: True if the scheduler was started, False if it was already running.
+        """
+        with AttractionsRefresher._thread_lock:
+            if AttractionsRefresher._thread and AttractionsRefresher._thread.is_alive():
+                return False
+
+            AttractionsRefresher._thread = threading.Thread(
+                target=self._schedule, name="AttractionsRefresher", daemon=True
+            )
+            AttractionsRefresher._thread.start()
+            return True
+
+    def _schedule(self) -> None:
+        """
+        Run the refresh forever, waiting 'interval' seconds between runs.
+        """
+        while True:
+            try:
+                self.run()
+            except Exception as e:
+                _log(f"[AttractionsRefresher] Refresh failed: {e}", level="ERROR")
+            time.sleep(self.interval)
+
+    def run(self) -> dict[str, Any]:
+        """
+        Refresh the attractions of the popular destinations that expire soon.
+
+        Returns:
+            dict[str, Any]: The metrics of the run.
+        """
+        status = AttractionsRefresher._status
+        start_time = time.perf_counter()
+        destinations = self.get_expiring_destinations(
+            self.get_popular_destinations(TripData().get_all_trips(order_by=None))
+        )
+        status.update(
+            running=True,
+            cities_total=len(destinations),
+            cities_refreshed=0,
+            cities_failed=0,
+        )
+
+        try:
+            for city_name, state_name in destinations:
+                if self._refresh_once(city_name, state_name):
+                    status["cities_refreshed"] += 1
+                else:
+                    status["cities_failed"] += 1
+        finally:
+            status.update(
+                running=False,
+                finished_at=Utils.to_date_string(datetime.now()),
+                duration_s=round(time.perf_counter() - start_time, 3),
+            )
+
+        _log(
+            f"[AttractionsRefresher] Refreshed {status['cities_refreshed']} of {len(destinations)} cities in {status['duration_s']}s"
+        )
+        return self.get_status()
+
+    def get_status(self) -> dict[str, Any]:
+        """
+        Get the metrics of the last run.
+
+        Returns:
+            dict[str, Any]: The refresh status.
+        """
+        refreshing = AttractionsRefresher._refresh_lock.get_keys()
+        return {**AttractionsRefresher._status, "refreshing": refreshing}
+
+    def get_popular_destinations(self, trips: list[TripModel]) -> list[tuple[str, str]]:
+        """
+        Get the 'attractions_refresh_top' destinations with the most trips.
+
+        Args:
+            trips (list[TripModel]): The trips to count.
+
+        Returns:
+            list[tuple[str, str]]: The (city, state) destinations, most popular first.
+        """
+        counts = Counter(
+            (trip.destination_city, trip.destination_state) for trip in trips
+        )
+        return [destination for destination, _ in counts.most_common(self.top)]
+
+    def get_expiring_destinations(
+        self, destinations: list[tuple[str, str]]
+    ) -> list[tuple[str, str]]:
+        """
+        Filter the destinations whose attractions expire in the next 'attractions_refresh_ahead' seconds.
+
+        Destinations without attractions are skipped, they are scraped when first visited.
+
+        Args:
+            destinations (list[tuple[str, str]]): The (city, state) destinations.
+
+        Returns:
+            list[tuple[str, str]]: The destinations to refresh.
+        """
+        expiring = []
+        for city_name, state_name in destinations:
+            slug = self.attractions_data.slugify(city_name, state_name)
+            attractions = self.attractions_data.get(slug)
+            if attractions and self.is_expired(attractions[0].created_at, self.ahead):
+                expiring.append((city_name, state_name))
+        return expiring
+
+    # --------------------------
+    # Refresh
+    # --------------------------
+
+    def is_expired(self, created_at: datetime, ahead: int = 0) -> bool:
+        """
+        Check if the attractions are expired, or will be in the next 'ahead' seconds.
+
+        Args:
+            created_at (datetime): The creation date of the attractions.
+            ahead (int, optional): How early to consider them expired in seconds. Defaults to 0.
+
+        Returns:
+            bool: True if the attractions are expired.
+        """
+        lifetime = datetime.now() - Utils.to_datetime(created_at)
+        return lifetime.total_seconds() + ahead > self.max_age
+
+    def refresh(
+        self, city_name: str, state_name: str, start: int = 0, limit: int = 18
+    ) -> list[AttractionModel]:
+        """
+        Scrape and save the attractions of a city.
+        Currently, it tries to fetch from Google Places and Yelp as fallback.
+
+        Args:
+            city_name (str): The name of the city.
+            state_name (str): The name of the state.
+            start (int, optional): Starting index for fetching attractions. Defaults to 0.
+            limit (int, optional): Number of attractions to fetch. Defaults to 18.
+
+        Returns:
+            list[AttractionModel]: List of AttractionModel objects.
+        """
+        # Try to fetch the attractions from Google Places first
+        attractions = GooglePlacesAttractionsScrapper().get_near_attractions(
+            city_name, state_name, start, limit
+        )
+
+        # If no attractions are found, try fetching from Yelp
+        if not attractions:
+            attractions = YelpAttractionsScrapper().get_near_attractions(
+                city_name, state_name, start, limit
+            )
+
+        # Save the attractions data
+        if attractions:
+            slug = self.attractions_data.slugify(city_name, state_name)
+            self.attractions_data.save(slug=slug, attractions=attractions)
+
+        return attractions
+
+    def refresh_in_background(self, city_name: str, state_name: str) -> bool:
+        """
+        Refresh the attractions of a city in a background thread.
+
+        Args:
+            city_name (str): The name of the city.
+            state_name (str): The name of the state.
+
+        Returns:
+            bool: True if a refresh was started, False if the city is already being refreshed.
+        """
+        slug = self.attractions_data.slugify(city_name, state_name)
+        if not self._acquire(slug):
+            return False
+
+        def refresh():
+            try:
+                self._refresh(slug, city_name, state_name)
+            finally:
+                self._release(slug)
+
+        threading.Thread(target=refresh, daemon=True).start()
+        return True
+
+    def _refresh_once(self, city_name: str, state_name: str) -> bool:
+        """
+        Refresh the attractions of a city now, unless it is already being refreshed.
+
+        Args:
+            city_name (str): The name of the city.
+            state_name (str): The name of the state.
+
+        Returns:
+            bool: True if the attractions were refreshed.
+        """
+        slug = self.attractions_data.slugify(city_name, state_name)
+        if not self._acquire(slug):
+            return False
+        try:
+            return self._refresh(slug, city_name, state_name)
+        finally:
+            self._release(slug)
+
+    def _refresh(self, slug: str, city_name: str, state_name: str) -> bool:
+        try:
+            attractions = self.refresh(city_name, state_name)
+            _log(f"[AttractionsRefresher] Refreshed {len(attractions)} in {slug}")
+            return bool(attractions)
+        except Exception as e:
+            _log(f"[AttractionsRefresher] Error refreshing {slug}: {e}", level="ERROR")
+            return False
+
+    # --------------------------
+    # Locks
+    # --------------------------
+
+    def _acquire(self, slug: str) -> bool:
+        """
+        Mark a city as being refreshed, in this process and in the lock file shared with the others.
+
+        Args:
+            slug (str): The city slug.
+
+        Returns:
+            bool: True if the city was not being refreshed.
+        """
+        return AttractionsRefresher._refresh_lock.acquire(
+            slug, self._get_lock_path(slug)
+        )
+
+    def _release(self, slug: str) -> None:
+        AttractionsRefresher._refresh_lock.release(slug, self._get_lock_path(slug))
+
+    def _get_lock_path(self, slug: str) -> str:
+        return os.path.join(self.locks_dir, f"attractions_{slug}.lock")
@@ -0,0 +1,158 @@
+import time
+import threading
+
+from collections import Counter
+from typing import Any
+
+from lib.AutocompleteIndex import AutocompleteIndex
+from lib.Utils import Utils
+
+from services.AppData import AppData
+from services.CityState import CityStateData
+from services.TripData import TripData
+from services.Logger import _log
+
+
+class CityAutocomplete:
+    """
+    Accent-insensitive autocompletion of the city names (e.g. "sao" suggests "São Paulo").
+
+    The index of the cities is built once per process. The cities are ranked by trip
+    popularity (The number of trips to each destination), recounted in the background every
+    'city_suggest_refresh_interval' seconds, so a lookup never waits for the trips to load.
+    """
+
+    # Built indexes shared by all instances: city state json file -> index
+    _indexes: dict[str, dict[str, Any]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, refresh_interval: float = None):
+        """
+        Initialize the CityAutocomplete class.
+
+        Args:
+            refresh_interval (float, optional): The seconds between the trip recounts,
+                defaults to the 'city_suggest_refresh_interval' config.
+        """
+        app_data = AppData()
+        self.json_file = app_data.get_config("city_state_json")
+
+        if refresh_interval is None:
+            refresh_interval = app_data.get_config("city_suggest_refresh_interval")
+        self.refresh_interval = float(
+            600 if refresh_interval is None else refresh_interval
+        )
+
+    def suggest(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """
+        Suggest the cities whose name, or any word of it, starts with a query.
+
+        Args:
+            query (str): The beginning of the city name (Case and accent insensitive).
+            limit (int, optional): The maximum number of cities. Defaults to 10.
+
+        Returns:
+            list[dict[str, Any]]: The city, uf, state and trips of each city, best first.
+        """
+        entry = self._get_index()
+        return [
+            {**entry["cities"][city_id], "trips": int(entry["trips"][city_id])}
+            for city_id in entry["index"].suggest(query, limit=limit)
+        ]
+
+    def refresh_popularity(self) -> int:
+        """
+        Recount the trips to each city and rank the suggestions by them.
+
+        Returns:
+            int: The number of trips counted.
+        """
+        entry = self._get_index(refresh=False)
+        trips = TripData().get_all_trips(order_by=None)
+        counts = Counter(
+            zip(
+                Utils.slugify_batch(trip.destination_city for trip in trips),
+                (trip.destination_state.upper() for trip in trips),
+            )
+        )
+        weights = [counts.get(key, 0) for key in entry["keys"]]
+
+        entry["index"].set_weights(weights)
+        entry["trips"] = weights
+        entry["refreshed_at"] = time.monotonic()
+        return len(trips)
+
+    # --------------------------
+    # Index
+    # --------------------------
+
+    def _get_index(self, refresh: bool = True) -> dict[str, Any]:
+        """
+        Get the index of the cities, recounting the trips in the background when the refresh interval passed.
+
+        Args:
+            refresh (bool, optional): Whether to start the recount. Defaults to True.
+
+        Returns:
+            dict[str, Any]: The index, the cities and their trips.
+        """
+        with CityAutocomplete._lock:
+            entry = CityAutocomplete._indexes.get(self.json_file)
+            if entry is None:
+                entry = self._new_index()
+                if entry["cities"]:
+                    CityAutocomplete._indexes[self.json_file] = entry
+
+            if (
+                refresh
+                and not entry["refreshing"]
+                and time.monotonic() - entry["refreshed_at"] >= self.refresh_interval
+            ):
+                entry["refreshing"] = True
+                threading.Thread(
+                    target=self._refresh, args=(entry,), daemon=True
+                ).start()
+        return entry
+
+    def _refresh(self, entry: dict[str, Any]) -> None:
+        try:
+            self.refresh_popularity()
+        except Exception as e:
+            _log(f"[CityAutocomplete] Popularity refresh failed: {e}", level="ERROR")
+            # Wait for the next interval before trying again
+            entry["refreshed_at"] = time.monotonic()
+        finally:
+            entry["refreshing"] = False
+
+    def _new_index(self) -> dict[str, Any]:
+        """
+        Build the index of all the cities of all the states.
+
+        Returns:
+            dict[str, Any]: The index, the cities and their trips.
+        """
+        start_time = time.perf_counter()
+        cities = [
+            {"city": city, "uf": state["sigla"], "state": state["nome"]}
+            for state in CityStateData().city_state_data.get("estados", [])
+            for city in state["cidades"]
+        ]
+        index = AutocompleteIndex([city["city"] for city in cities])
+
+        _log(
+            f"[CityAutocomplete] Indexed {len(cities)} cities in {time.perf_counter() - start_time:.3f}s"
+        )
+        return {
+            "index": index,
+            "cities": cities,
+            # Keys matching the trip destinations: (folded city, UF)
+            "keys": list(
+                zip(
+                    Utils.slugify_batch(city["city"] for city in cities),
+                    (city["uf"] for city in cities),
+                )
+            ),
+            "trips": [0] * len(cities),
+            "refreshed_at": float("-inf"),
+            "refreshing": False,
+        }
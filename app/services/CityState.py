@@ -1,5 +1,10 @@
 import json
+import threading
 
+from functools import lru_cache
+from typing import Any
+
+from lib.Utils import Utils
 from services.AppData import AppData
 
 
@@ -7,17 +12,36 @@ class CityStateData:
     """
     City and state data service.
     Provides methods to retrieve city and state data based on the data stored in a JSON file.
+
+    The file is parsed once per process and shared by all instances, with the states indexed
+    by UF and name, and the cities by state and name, so every lookup is a dict access.
+    The names are compared case and accent insensitive (e.g. "sao paulo" finds "São Paulo").
     """
 
+    # Loaded data shared by all instances: json file -> indexes
+    _loaded: dict[str, dict[str, Any]] = {}
+    _lock = threading.Lock()
+
     def __init__(self):
         # Load the JSON file with city and state data
         json_file = AppData().get_config("city_state_json")
-        try:
-            with open(json_file, "r", encoding="utf-8") as f:
-                self.city_state_data = json.load(f)
-        except FileNotFoundError:
-            print(f"CityStateData: The file '{json_file}' was not found.")
-            self.city_state_data = {}
+        with CityStateData._lock:
+            indexes = CityStateData._loaded.get(json_file)
+            if indexes is None:
+                indexes = self._new_indexes(self._load(json_file))
+                if indexes["data"]:
+                    CityStateData._loaded[json_file] = indexes
+        self._indexes = indexes
+
+    @property
+    def city_state_data(self) -> dict:
+        """The city and state data, as stored in the JSON file."""
+        return self._indexes["data"]
+
+    @city_state_data.setter
+    def city_state_data(self, data: dict):
+        # Replaces the data of this instance only
+        self._indexes = self._new_indexes(data)
 
     def get_states(self):
         """
@@ -26,7 +50,7 @@ class CityStateData:
         Returns:
             list: A list of state names (str).
         """
-        return [state["nome"] for state in self.city_state_data.get("estados", [])]
+        return list(self._indexes["states"])
 
     def get_ufs(self):
         """
@@ -35,7 +59,7 @@ class CityStateData:
         Returns:
             list: A list of state abbreviations (str).
         """
-        return [state["sigla"] for state in self.city_state_data.get("estados", [])]
+        return list(self._indexes["ufs"])
 
     def get_cities_by_state(self, state):
         """
@@ -47,10 +71,8 @@ class CityStateData:
         Returns:
             list: A list of city names (str) in the specified state.
         """
-        for s in self.city_state_data.get("estados", []):
-            if s["nome"].lower() == state.lower():
-                return s["cidades"]
-        return []
+        state = self._indexes["by_state"].get(self._fold(state))
+        return state["cidades"] if state else []
 
     def get_cities_by_uf(self, uf):
         """
@@ -62,10 +84,8 @@ class CityStateData:
         Returns:
             list: A list of city names (str) in the specified state.
         """
-        for s in self.city_state_data.get("estados", []):
-            if s["sigla"].lower() == uf.lower():
-                return s["cidades"]
-        return []
+        state = self._indexes["by_uf"].get(uf.lower())
+        return state["cidades"] if state else []
 
     def uf_to_state(self, uf):
         """
@@ -77,7 +97,111 @@ class CityStateData:
         Returns:
             str: The full name of the state, or an empty string if not found.
         """
-        for s in self.city_state_data.get("estados", []):
-            if s["sigla"].lower() == uf.lower():
-                return s["nome"]
-        return ""
+        state = self._indexes["by_uf"].get(uf.lower())
+        return state["nome"] if state else ""
+
+    def state_to_uf(self, state):
+        """
+        Retrieves the abbreviation of a state given its full name.
+
+        Args:
+            state (str): The name of the state.
+
+        Returns:
+            str: The abbreviation of the state (UF), or an empty string if not found.
+        """
+        state = self._indexes["by_state"].get(self._fold(state))
+        return state["sigla"] if state else ""
+
+    def get_city(self, city, uf):
+        """
+        Retrieves the name of a city of a state, as stored in the JSON file.
+
+        Args:
+            city (str): The name of the city (Case and accent insensitive).
+            uf (str): The abbreviation (UF) or the name of the state.
+
+        Returns:
+            str: The name of the city, or an empty string if it is not in the state.
+        """
+        state = self._indexes["by_uf"].get(uf.lower())
+        state = state or self._indexes["by_state"].get(self._fold(uf))
+        if not state:
+            return ""
+        return self._indexes["cities"][state["sigla"].lower()].get(self._fold(city), "")
+
+    def is_valid_city(self, city, uf):
+        """
+        Checks if a city belongs to a state.
+
+        Args:
+            city (str): The name of the city (Case and accent insensitive).
+            uf (str): The abbreviation (UF) or the name of the state.
+
+        Returns:
+            bool: True if the city is in the state.
+        """
+        return bool(self.get_city(city, uf))
+
+    def get_ufs_by_city(self, city):
+        """
+        Retrieves the states that have a city with a given name.
+
+        Args:
+            city (str): The name of the city (Case and accent insensitive).
+
+        Returns:
+            list: A list of state abbreviations (str).
+        """
+        return list(self._indexes["ufs_by_city"].get(self._fold(city), []))
+
+    # --------------------------
+    # Indexes
+    # --------------------------
+
+    def _load(self, json_file: str) -> dict:
+        try:
+            with open(json_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            print(f"CityStateData: The file '{json_file}' was not found.")
+            return {}
+
+    def _new_indexes(self, data: dict) -> dict[str, Any]:
+        """
+        Index the states and cities of the data.
+
+        Args:
+            data (dict): The city and state data, as stored in the JSON file.
+
+        Returns:
+            dict[str, Any]: The data and its indexes.
+        """
+        states = data.get("estados", [])
+        cities, ufs_by_city = {}, {}
+        for state in states:
+            uf = state["sigla"].lower()
+            cities[uf] = dict(
+                zip(Utils.slugify_batch(state["cidades"]), state["cidades"])
+            )
+            for city in cities[uf]:
+                ufs_by_city.setdefault(city, []).append(state["sigla"])
+
+        return {
+            "data": data,
+            "states": [state["nome"] for state in states],
+            "ufs": [state["sigla"] for state in states],
+            # The first state wins if a UF or name repeats
+            "by_uf": {state["sigla"].lower(): state for state in reversed(states)},
+            "by_state": {
+                self._fold(state["nome"]): state for state in reversed(states)
+            },
+            "cities": cities,
+            "ufs_by_city": ufs_by_city,
+        }
+
+    @staticmethod
+    @lru_cache(maxsize=16384)
+    def _fold(name: str) -> str:
+        # The same names are looked up on every rerun, fold each one only once
+        return Utils.slugify(name)
@@ -0,0 +1,249 @@
+import os
+import json
+import time
+import threading
+
+from typing import Callable
+
+from lib.RefreshLock import RefreshLock
+
+from services.AppData import AppData
+from services.Logger import _log
+
+
+class ForecastStore:
+    """
+    Disk cache for the raw OpenWeatherMap forecasts, keyed by rounded coordinates.
+
+    OpenWeatherMap updates its forecast every 3 hours, so a cached forecast expires at the
+    next 3-hour boundary (UTC) after it was fetched. Expired forecasts are still served while
+    a background thread fetches the new one (stale-while-revalidate), so readers only block
+    when there is no forecast at all or it is older than the 'forecast_cache_max_stale' config.
+
+    The cache files are written atomically, so they can be shared by the Streamlit and
+    FastAPI processes.
+    """
+
+    CYCLE_SECONDS = 3 * 3600
+
+    # Parsed cache files shared by all instances: path -> (mtime, entry)
+    _entries: dict[str, tuple[float, dict]] = {}
+    # Keys being refreshed, by this process and the lock files shared with the others
+    _refresh_lock = RefreshLock(max_age=60)
+
+    def __init__(self, cache_dir: str = None):
+        """
+        Initialize the ForecastStore class.
+
+        Args:
+            cache_dir (str, optional): The cache folder, defaults to the 'forecast_cache' storage.
+        """
+        app_data = AppData()
+        self.cache_dir = cache_dir or app_data._get_storage_map().get("forecast_cache")
+        self.precision = int(app_data.get_config("forecast_cache_precision") or 2)
+        self.max_stale = int(app_data.get_config("forecast_cache_max_stale") or 86400)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # --------------------------
+    # Cache Operations
+    # --------------------------
+
+    def get(self, lat: float, long: float, fetch: Callable[[], dict]) -> dict:
+        """
+        Get the forecast for the coordinates, fetching it only when needed.
+
+        Args:
+            lat (float): The latitude.
+            long (float): The longitude.
+            fetch (Callable[[], dict]): Fetches the forecast from the API.
+
+        Returns:
+            dict: The forecast data.
+        """
+        key = self.get_key(lat, long)
+        entry = self._read(key)
+        now = time.time()
+
+        if entry and now < entry["expires_at"]:
+            return entry["data"]
+
+        # Serve the expired forecast and refresh it in the background
+        if entry and now - entry["expires_at"] < self.max_stale:
+            self._refresh_in_background(key, fetch)
+            return entry["data"]
+
+        return self._refresh(key, fetch)
+
+    def get_fresh(self, lat: float, long: float) -> dict | None:
+        """
+        Get the cached forecast for the coordinates, only if it has not expired.
+
+        Args:
+            lat (float): The latitude.
+            long (float): The longitude.
+
+        Returns:
+            dict | None: The forecast data, or None if not cached or expired.
+        """
+        entry = self._read(self.get_key(lat, long))
+        if entry and time.time() < entry["expires_at"]:
+            return entry["data"]
+        return None
+
+    def put(self, lat: float, long: float, data: dict) -> None:
+        """
+        Save a forecast fetched now for the coordinates.
+
+        Args:
+            lat (float): The latitude.
+            long (float): The longitude.
+            data (dict): The forecast data.
+        """
+        self._save(self.get_key(lat, long), data)
+
+    def get_key(self, lat: float, long: float) -> str:
+        """
+        Get the cache key of the coordinates.
+
+        Args:
+            lat (float): The latitude.
+            long (float): The longitude.
+
+        Returns:
+            str: The cache key (e.g. '-22.97_-43.18').
+        """
+        return (
+            f"{round(float(lat), self.precision)}_{round(float(long), self.precision)}"
+        )
+
+    def get_expiration(self, fetched_at: float) -> float:
+        """
+        Get the time a forecast fetched at the given time expires (The next 3-hour boundary).
+
+        Args:
+            fetched_at (float): The fetch timestamp.
+
+        Returns:
+            float: The expiration timestamp.
+        """
+        return (int(fetched_at) // self.CYCLE_SECONDS + 1) * self.CYCLE_SECONDS
+
+    # --------------------------
+    # Refresh
+    # --------------------------
+
+    def _refresh(self, key: str, fetch: Callable[[], dict]) -> dict:
+        """
+        Fetch the forecast and save it to the cache.
+
+        Args:
+            key (str): The cache key.
+            fetch (Callable[[], dict]): Fetches the forecast from the API.
+
+        Returns:
+            dict: The forecast data.
+        """
+        data = fetch()
+        self._save(key, data)
+        return data
+
+    def _save(self, key: str, data: dict) -> None:
+        """
+        Save a forecast fetched now, expiring at the next forecast cycle.
+
+        Args:
+            key (str): The cache key.
+            data (dict): The forecast data.
+        """
+        fetched_at = time.time()
+        self._write(
+            key,
+            {
+                "fetched_at": fetched_at,
+                "expires_at": self.get_expiration(fetched_at),
+                "data": data,
+            },
+        )
+
+    def _refresh_in_background(self, key: str, fetch: Callable[[], dict]) -> None:
+        """
+        Refresh the forecast in a background thread, once per key across processes.
+
+        Args:
+            key (str): The cache key.
+            fetch (Callable[[], dict]): Fetches the forecast from the API.
+        """
+        # The lock file keeps other processes from refreshing the same forecast
+        lock_path = self._get_path(key) + ".lock"
+        if not ForecastStore._refresh_lock.acquire(key, lock_path):
+            return
+
+        def refresh():
+            try:
+                self._refresh(key, fetch)
+            except Exception as e:
+                _log(f"[ForecastStore] Error refreshing {key}: {e}", level="ERROR")
+            finally:
+                ForecastStore._refresh_lock.release(key, lock_path)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    # --------------------------
+    # File Operations
+    # --------------------------
+
+    def _read(self, key: str) -> dict | None:
+        """
+        Read a cache entry, parsing the file only when it changed on disk.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            dict | None: The cache entry, or None if not cached.
+        """
+        path = self._get_path(key)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        cached = ForecastStore._entries.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            _log(f"[ForecastStore] Error reading {path}: {e}", level="ERROR")
+            return None
+
+        ForecastStore._entries[path] = (mtime, entry)
+        return entry
+
+    def _write(self, key: str, entry: dict) -> None:
+        """
+        Write a cache entry atomically.
+
+        Args:
+            key (str): The cache key.
+            entry (dict): The cache entry.
+        """
+        path = self._get_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(temp_path, path)
+
+    def _get_path(self, key: str) -> str:
+        """
+        Get the cache file path of a key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str: The cache file path.
+        """
+        return os.path.join(self.cache_dir, f"{key}.json")
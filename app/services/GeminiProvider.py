@@ -12,6 +12,10 @@ class GeminiProvider(AiProvider):
     Extends the AiProvider class and implements the ask method to generate content using the Google Gemini API.
     """
 
+    # SDK state shared between instances, so the model is not rebuilt on every call
+    _configured_api_key = None
+    _models: dict[str, genai.GenerativeModel] = {}
+
     def __init__(self, api_key=None):
         super().__init__()  # Initialize the parent class
 
@@ -20,7 +24,12 @@ class GeminiProvider(AiProvider):
         if not self.api_key:
             raise ValueError("API key is required for Google Gemini API")
 
-        genai.configure(api_key=self.api_key)
+        # Only reconfigure the SDK when the API key changes
+        if GeminiProvider._configured_api_key != self.api_key:
+            genai.configure(api_key=self.api_key)
+            GeminiProvider._configured_api_key = self.api_key
+            GeminiProvider._models = {}
+
         self.model_name = "gemini-1.5-flash"
 
     def ask(self, prompt: str) -> dict[str, str]:
@@ -30,8 +39,7 @@ class GeminiProvider(AiProvider):
             # Count the time taken to generate the content
             start_time = time.time()
 
-            model = genai.GenerativeModel(self.model_name)
-            response = model.generate_content(prompt)
+            response = self._get_model().generate_content(prompt)
 
             # Calculate the time taken to generate the content
             end_time = time.time()
@@ -45,3 +53,16 @@ class GeminiProvider(AiProvider):
         except Exception as e:
             _log(f"{str(e)}", level="ERROR")
             return None
+
+    def _get_model(self) -> genai.GenerativeModel:
+        """
+        Get the cached GenerativeModel instance for the current model name.
+
+        Returns:
+            genai.GenerativeModel: The model instance.
+        """
+        if self.model_name not in GeminiProvider._models:
+            GeminiProvider._models[self.model_name] = genai.GenerativeModel(
+                self.model_name
+            )
+        return GeminiProvider._models[self.model_name]
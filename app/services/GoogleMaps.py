@@ -1,7 +1,8 @@
-import requests
+import httpx
 import streamlit as st
 
 from services.AppData import AppData
+from services.HttpClient import HttpClient
 from lib.Utils import Utils
 
 
@@ -38,9 +39,35 @@ class GoogleMaps:
         Raises:
             ValueError: If the location cannot be geocoded.
         """
-        url = f"https://maps.googleapis.com/maps/api/geocode/json?address={Utils().url_encode(location)},Brazil&key={self.api_key}"
-        data = self._fetch_json(url)
+        data = self._fetch_json(self.get_geocode_url(location))
+        return self.to_latitude_longitude(data, location)
 
+    def get_geocode_url(self, location: str) -> str:
+        """
+        Get the Geocoding API URL for a given location.
+
+        Args:
+            location (str): The location (e.g., city, state, or address) to geocode.
+
+        Returns:
+            str: The Geocoding API URL.
+        """
+        return f"https://maps.googleapis.com/maps/api/geocode/json?address={Utils().url_encode(location)},Brazil&key={self.api_key}"
+
+    def to_latitude_longitude(self, data: dict, location: str) -> tuple[float, float]:
+        """
+        Extract the latitude and longitude from a Geocoding API response.
+
+        Args:
+            data (dict): The Geocoding API response.
+            location (str): The geocoded location (For the error message).
+
+        Returns:
+            tuple: A tuple containing (latitude, longitude).
+
+        Raises:
+            ValueError: If the response has no results.
+        """
         # Check if the request was successful
         if data.get("status") == "OK" and len(data.get("results", [])) > 0:
             location_data = data["results"][0]["geometry"]["location"]
@@ -163,11 +190,9 @@ class GoogleMaps:
             dict: The JSON data as a dictionary.
 
         Raises:
-            requests.exceptions.RequestException: For any network-related errors.
+            ValueError: For any network-related errors.
         """
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return HttpClient().get_json(url)
+        except httpx.HTTPError as e:
             raise ValueError(f"Error fetching data from {url}: {str(e)}")
@@ -1,9 +1,12 @@
 import os
-import requests
+import httpx
 import streamlit as st
-import time
+
+from concurrent.futures import ThreadPoolExecutor
 
 from services.AppData import AppData
+from services.HttpClient import HttpClient
+from services.ImageCache import ImageCache
 from services.Logger import _log
 from models.Attraction import AttractionModel
 
@@ -33,6 +36,10 @@ class GooglePlacesAttractionsScrapper:
         os.makedirs(
             self.image_cache_dir, exist_ok=True
         )  # Ensure cache directory exists
+        self.image_cache = ImageCache(self.image_cache_dir)
+        self.image_concurrency = int(
+            AppData().get_config("image_fetch_concurrency") or 6
+        )
 
     @st.cache_resource(ttl=86400, show_spinner=False)
     def get_near_attractions(
@@ -69,49 +76,35 @@ class GooglePlacesAttractionsScrapper:
         _log(f"[GoogleMapsScrapper] Fetching attractions for: {location}")
 
         # API request
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = HttpClient().get_json(url, params=params)
 
         if "results" not in data or not data["results"]:
             _log(f"[GoogleMapsScrapper] No attractions found for {location}")
             return []
 
-        cards = []
-        for result in data["results"]:
-            image_id = result.get("photos", [{}])[0].get("photo_reference", "")
-            image_url = _self.fetch_and_cache_photo(image_id)
-            card = AttractionModel(
-                **{
-                    "name": result.get("name"),
-                    "city_name": city_name,
-                    "state_name": state_name,
-                    "url": f"https://www.google.com/maps/place/?q=place_id:{result['place_id']}",
-                    "review_count": result.get("user_ratings_total", 0),
-                    "review_stars": result.get("rating", -1),
-                    "description": result.get("formatted_address", ""),
-                    "image": image_url,
-                }
-            )
-            cards.append(card)
-
-            # Stop if we reach the limit
-            if len(cards) >= limit:
-                break
+        results = data["results"][:limit]
 
         # Handle limit with recursion
         next_page_token = data.get("next_page_token")
-        while recursive and next_page_token and len(cards) < limit:
+        while recursive and next_page_token and len(results) < limit:
             params["pagetoken"] = next_page_token
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = HttpClient().get_json(url, params=params)
             next_page_token = data.get("next_page_token")
+            results += data.get("results", [])[: limit - len(results)]
+
+        # Download the photos of all the results at once
+        images = _self.fetch_photos(
+            [
+                result.get("photos", [{}])[0].get("photo_reference", "")
+                for result in results
+            ]
+        )
 
-            for result in data["results"]:
-                image_id = result.get("photos", [{}])[0].get("photo_reference", "")
-                image_url = _self.fetch_and_cache_photo(image_id)
-                card = AttractionModel(
+        cards = []
+        for result, image in zip(results, images):
+            location = result.get("geometry", {}).get("location", {})
+            cards.append(
+                AttractionModel(
                     **{
                         "name": result.get("name"),
                         "city_name": city_name,
@@ -120,24 +113,47 @@ class GooglePlacesAttractionsScrapper:
                         "review_count": result.get("user_ratings_total", 0),
                         "review_stars": result.get("rating", -1),
                         "description": result.get("formatted_address", ""),
-                        "image": image_url,
+                        "image": image,
+                        "latitude": location.get("lat"),
+                        "longitude": location.get("lng"),
                     }
                 )
-                cards.append(card)
-                if len(cards) >= limit:
-                    break
+            )
 
         _log(
             f"[GoogleMapsScrapper] Found {len(cards)} attractions in {city_name}, {state_name}"
         )
+        _log(f"[GoogleMapsScrapper] Image cache: {_self.get_image_cache_stats()}")
 
         return cards
 
     # --------------------------
     # Utils
     # --------------------------
-    @st.cache_data(ttl=86400, show_spinner=False)
-    def fetch_and_cache_photo(_self, photo_reference: str, max_width: int = 400) -> str:
+    def fetch_photos(self, photo_references: list[str]) -> list[str]:
+        """
+        Fetches and caches the photos concurrently, with their thumbnails.
+
+        Args:
+            photo_references (list[str]): The reference IDs of the photos.
+
+        Returns:
+            list[str]: The local paths to the cached images, in the same order
+                (Empty strings for the photos not available).
+        """
+
+        def fetch(photo_reference: str) -> str:
+            image_path = self.fetch_and_cache_photo(photo_reference)
+            self.image_cache.get_thumbnail(image_path)
+            return image_path
+
+        if not photo_references:
+            return []
+
+        with ThreadPoolExecutor(max_workers=self.image_concurrency) as executor:
+            return list(executor.map(fetch, photo_references))
+
+    def fetch_and_cache_photo(self, photo_reference: str, max_width: int = 400) -> str:
         """
         Fetches and caches the photo locally using its reference.
 
@@ -151,36 +167,47 @@ class GooglePlacesAttractionsScrapper:
         if not photo_reference:
             return ""
 
-        # Path for the cached image
-        photo_id = photo_reference[:12] + "-" + str(int(time.time()))
-        image_path = os.path.join(_self.image_cache_dir, f"{photo_id}.jpg")
-        image_path = _self.normalize_path(image_path)
+        def fetch() -> bytes | None:
+            url = (
+                f"https://maps.googleapis.com/maps/api/place/photo?"
+                f"maxwidth={max_width}&photoreference={photo_reference}&key={self.api_key}"
+            )
+            try:
+                response = HttpClient().get(url)
+            except httpx.HTTPError as e:
+                _log(f"[GoogleMapsScrapper] Failed to fetch photo: {e}", level="ERROR")
+                return None
+
+            if response.status_code != 200:
+                _log(
+                    f"[GoogleMapsScrapper] Failed to fetch photo for reference: {photo_reference}"
+                )
+                return None
+            return response.content
 
-        # Check if the image is already cached
-        if os.path.exists(image_path):
-            return image_path
+        # The same photo in another size is another image
+        image_path = self.image_cache.get(f"{photo_reference}:{max_width}", fetch)
+        return self.normalize_path(image_path)
 
-        # Fetch and cache the image
-        url = (
-            f"https://maps.googleapis.com/maps/api/place/photo?"
-            f"maxwidth={max_width}&photoreference={photo_reference}&key={_self.api_key}"
-        )
-        response = requests.get(url, stream=True)
-        if response.status_code == 200:
-            try:
-                with open(image_path, "wb") as f:
-                    for chunk in response.iter_content(1024):
-                        f.write(chunk)
-                _log(f"[GoogleMapsScrapper] Cached image: {image_path}")
-                return image_path
-            except Exception as e:
-                _log(f"[GoogleMapsScrapper] Failed to cache image: {e}")
-                return ""
+    def get_image_cache_stats(self) -> dict:
+        """
+        Get the disk usage and hit ratio of the image cache.
 
-        _log(
-            f"[GoogleMapsScrapper] Failed to fetch photo for reference: {photo_reference}"
+        Returns:
+            dict: The image cache stats.
+        """
+        return self.image_cache.get_stats()
+
+    def collect_image_garbage(self) -> int:
+        """
+        Remove the cached images not referenced by any stored attraction (Scraped, snapshot or in a trip).
+
+        Returns:
+            int: The number of images removed.
+        """
+        return self.image_cache.collect_garbage(
+            self.image_cache.get_referenced_images()
         )
-        return ""
 
     def normalize_path(self, path_str: str) -> str:
         """
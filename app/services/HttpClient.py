@@ -0,0 +1,281 @@
+import time
+import random
+import threading
+import httpx
+
+from typing import Callable
+
+from services.AppData import AppData
+from services.Logger import _log
+
+
+class HttpClient:
+    """
+    Process-wide HTTP client shared by all the outbound services.
+
+    Every instance wraps the same pooled httpx.Client, so connections (and their TLS sessions)
+    are kept alive and reused between calls instead of being opened again for every request.
+    Timeouts, retries and pool sizes can be changed in the config file.
+    """
+
+    # Shared between all instances
+    _client: httpx.Client = None
+    _lock = threading.Lock()
+    _stats = {"requests": 0, "retries": 0, "tls_handshakes": 0}
+    _stats_lock = threading.Lock()
+    # Called by reset(), e.g. to drop the SDK clients wrapping the closed client
+    _reset_callbacks: list[Callable[[], None]] = []
+
+    # Status codes that are worth retrying
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(self):
+        """
+        Initialize the HttpClient class, creating the shared client on first use.
+        """
+        self.max_retries = int(AppData().get_config("http_max_retries") or 0)
+        self.backoff_factor = float(AppData().get_config("http_backoff_factor") or 0)
+
+        if HttpClient._client is None:
+            with HttpClient._lock:
+                if HttpClient._client is None:
+                    HttpClient._client = HttpClient._create_client()
+
+    # --------------------------
+    # Requests
+    # --------------------------
+
+    def get(
+        self, url: str, params: dict = None, headers: dict = None
+    ) -> httpx.Response:
+        """
+        Send a GET request using the shared connection pool.
+
+        Connection errors and retryable status codes (429, 5xx) are retried with
+        exponential backoff and full jitter.
+
+        Args:
+            url (str): The URL to request.
+            params (dict, optional): Query string parameters.
+            headers (dict, optional): Extra request headers.
+
+        Returns:
+            httpx.Response: The response of the last attempt.
+
+        Raises:
+            httpx.TransportError: If the request could not be completed after all retries.
+        """
+        attempt = 0
+        while True:
+            HttpClient._count("requests")
+            try:
+                response = HttpClient._client.get(url, params=params, headers=headers)
+                if (
+                    response.status_code not in self.RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                _log(f"[HttpClient] Request failed, retrying: {e}", level="WARNING")
+
+            HttpClient._count("retries")
+            time.sleep(self._get_backoff(attempt))
+            attempt += 1
+
+    def get_json(self, url: str, params: dict = None, headers: dict = None):
+        """
+        Send a GET request and decode the JSON response.
+
+        Args:
+            url (str): The URL to request.
+            params (dict, optional): Query string parameters.
+            headers (dict, optional): Extra request headers.
+
+        Returns:
+            Any: The decoded JSON data.
+
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status.
+        """
+        response = self.get(url, params=params, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    # --------------------------
+    # Shared Client
+    # --------------------------
+
+    @staticmethod
+    def get_client() -> httpx.Client:
+        """
+        Get the shared httpx client, so it can be handed to SDKs that accept one.
+
+        Returns:
+            httpx.Client: The shared client.
+        """
+        return HttpClient()._client
+
+    @staticmethod
+    def get_stats() -> dict:
+        """
+        Get the counters of the shared client.
+
+        The difference between requests and tls_handshakes is the number of
+        requests that reused an already open connection.
+
+        Returns:
+            dict: The number of requests, retries and TLS handshakes done so far.
+        """
+        with HttpClient._stats_lock:
+            return dict(HttpClient._stats)
+
+    @staticmethod
+    def reset(transport: httpx.BaseTransport = None) -> None:
+        """
+        Close the shared client and clear its counters, the next call will create a new one.
+
+        The callbacks registered with on_reset are called, so the clients wrapping the closed
+        one are not used anymore.
+
+        Args:
+            transport (httpx.BaseTransport, optional): A custom transport to use (Mainly for tests).
+        """
+        with HttpClient._lock:
+            if HttpClient._client is not None:
+                HttpClient._client.close()
+            HttpClient._client = None
+            with HttpClient._stats_lock:
+                HttpClient._stats = {"requests": 0, "retries": 0, "tls_handshakes": 0}
+            if transport is not None:
+                HttpClient._client = HttpClient._create_client(transport=transport)
+
+        for callback in HttpClient._reset_callbacks:
+            callback()
+
+    @staticmethod
+    def on_reset(callback: Callable[[], None]) -> None:
+        """
+        Register a function to call when the shared client is reset.
+
+        Args:
+            callback (Callable[[], None]): The function, e.g. clearing a cache of SDK clients.
+        """
+        HttpClient._reset_callbacks.append(callback)
+
+    @staticmethod
+    def create_async_client(
+        max_connections: int = None, transport: httpx.AsyncBaseTransport = None
+    ) -> httpx.AsyncClient:
+        """
+        Create an httpx.AsyncClient with the same settings as the shared client.
+
+        Async clients are bound to the event loop that uses them, so they are not shared
+        and should be closed by the caller (e.g. 'async with').
+
+        Args:
+            max_connections (int, optional): The pool size, defaults to the 'http_max_connections' config.
+            transport (httpx.AsyncBaseTransport, optional): A custom transport to use (Mainly for tests).
+
+        Returns:
+            httpx.AsyncClient: The configured client.
+        """
+        app_data = AppData()
+        max_connections = int(
+            max_connections or app_data.get_config("http_max_connections") or 20
+        )
+
+        return httpx.AsyncClient(
+            http2=HttpClient._http2_enabled(),
+            timeout=float(app_data.get_config("http_timeout") or 10),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60,
+            ),
+            follow_redirects=True,
+            transport=transport,
+        )
+
+    # --------------------------
+    # Utils
+    # --------------------------
+
+    @staticmethod
+    def _create_client(transport: httpx.BaseTransport = None) -> httpx.Client:
+        """
+        Create the pooled httpx client based on the config file.
+
+        Args:
+            transport (httpx.BaseTransport, optional): A custom transport to use.
+
+        Returns:
+            httpx.Client: The configured client.
+        """
+        app_data = AppData()
+        max_connections = int(app_data.get_config("http_max_connections") or 20)
+
+        return httpx.Client(
+            http2=HttpClient._http2_enabled(),
+            timeout=float(app_data.get_config("http_timeout") or 10),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60,
+            ),
+            follow_redirects=True,
+            event_hooks={"request": [HttpClient._trace_request]},
+            transport=transport,
+        )
+
+    @staticmethod
+    def _http2_enabled() -> bool:
+        """
+        Check if HTTP/2 is enabled in the config and supported by the environment.
+
+        Returns:
+            bool: True if HTTP/2 can be used, False otherwise.
+        """
+        http2 = str(AppData().get_config("http_http2")).lower() in ("true", "1")
+        if not http2:
+            return False
+
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            _log("[HttpClient] h2 is not installed, falling back to HTTP/1.1")
+            return False
+        return True
+
+    def _get_backoff(self, attempt: int) -> float:
+        """
+        Calculate the time to wait before the next attempt (Exponential backoff with full jitter).
+
+        Args:
+            attempt (int): The number of the failed attempt (Starting at 0).
+
+        Returns:
+            float: The time to wait in seconds.
+        """
+        return random.uniform(0, self.backoff_factor * (2**attempt))
+
+    @staticmethod
+    def _trace_request(request: httpx.Request) -> None:
+        """
+        Attach a trace callback to the request to count the new TLS handshakes.
+
+        Args:
+            request (httpx.Request): The outgoing request.
+        """
+
+        def trace(event_name, info):
+            if event_name == "connection.start_tls.complete":
+                HttpClient._count("tls_handshakes")
+
+        request.extensions["trace"] = trace
+
+    @staticmethod
+    def _count(counter: str) -> None:
+        with HttpClient._stats_lock:
+            HttpClient._stats[counter] += 1
@@ -5,6 +5,7 @@ from transformers import pipeline, AutoTokenizer
 
 from services.AiProvider import AiProvider
 from services.AppData import AppData
+from services.LocalInference import LocalInference
 from services.Logger import _log
 
 
@@ -14,7 +15,7 @@ class HuggingFaceProvider(AiProvider):
     Extends the AiProvider class and implements the ask method to generate content using the Hugging Face API.
     """
 
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, backend: str = None, model_name: str = None):
         super().__init__()  # Initialize the parent class
 
         # Set the API key, either from the environment or directly from the parameter
@@ -25,19 +26,21 @@ class HuggingFaceProvider(AiProvider):
         # Device configuration: use GPU if available, otherwise fallback to CPU
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
+        # Select the inference backend (pytorch, quantized, onnx or offload) based on the config
+        self.inference = LocalInference(backend=backend)
+        self.backend = self.inference.backend
+
         # Define model details and load tokenizer and model
-        self.model_name = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
+        self.model_name = model_name or "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self.model = self.inference.load_model(self.model_name, "text-generation")
 
         # Define the pipeline for text generation
         self.pipe = pipeline(
             task="text-generation",
-            model=self.model_name,
+            model=self.model,
             tokenizer=self.tokenizer,
-            device=(
-                0 if torch.cuda.is_available() else -1
-            ),  # Set device for the pipeline
-            torch_dtype=torch.bfloat16 if torch.cuda.is_available() else torch.float32,
+            device=self.inference.get_device(),  # Set device for the pipeline
         )
 
     def ask(self, prompt: str) -> dict[str, str]:
@@ -0,0 +1,403 @@
+import io
+import os
+import time
+import hashlib
+import threading
+
+from PIL import Image
+from typing import Callable, Iterable
+
+from services.AppData import AppData
+from services.AttractionsData import AttractionsData
+from services.TripData import TripData
+from services.Logger import _log
+
+
+class ImageCache:
+    """
+    Disk cache for the attraction images, keyed by the hash of their full reference.
+
+    The cache is bounded by the 'image_cache_max_bytes' config: when it grows past the limit,
+    the least recently used images (Oldest modification time, touched on every hit) are
+    evicted. Images are written to a temporary file and moved in place, so concurrent writers
+    (threads or processes) never expose a partial image and the last writer wins.
+
+    Thumbnails are stored alongside their original image ('<key>-<width>w.webp') and share
+    its key, so they are kept and collected with it. The images still referenced by a saved
+    attraction, attraction snapshot or trip are never evicted.
+    """
+
+    # Keep evicting until the cache is below this fraction of the limit
+    LOW_WATERMARK = 0.9
+    # Number of download locks, shared by the keys with the same remainder
+    LOCK_STRIPES = 64
+    # Seconds the referenced images are kept for the evictions
+    REFERENCES_MAX_AGE = 300
+
+    # Estimated size of each cache folder, shared by all instances: cache_dir -> bytes
+    _usage: dict[str, int] = {}
+    # Striped locks, so concurrent requests for the same image download it once
+    _key_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+    # Keys of the referenced images of each cache folder: cache_dir -> (keys, loaded at)
+    _referenced: dict[str, tuple[set[str], float]] = {}
+    _hits = 0
+    _misses = 0
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        cache_dir: str = None,
+        max_bytes: int = None,
+        referenced: Callable[[], Iterable[str]] = None,
+    ):
+        """
+        Initialize the ImageCache class.
+
+        Args:
+            cache_dir (str, optional): The cache folder, defaults to the 'image_cache' storage.
+            max_bytes (int, optional): The cache size limit, defaults to the 'image_cache_max_bytes' config.
+            referenced (Callable[[], Iterable[str]], optional): Gets the paths of the images
+                that must not be evicted, defaults to get_referenced_images.
+        """
+        app_data = AppData()
+        self.cache_dir = cache_dir or app_data._get_storage_map().get("image_cache")
+        self.max_bytes = int(
+            max_bytes or app_data.get_config("image_cache_max_bytes") or 209715200
+        )
+        self.thumbnail_width = int(app_data.get_config("image_thumbnail_width") or 320)
+        self.referenced = referenced or self.get_referenced_images
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # --------------------------
+    # Cache Operations
+    # --------------------------
+
+    def get(
+        self, reference: str, fetch: Callable[[], bytes | None], extension: str = "jpg"
+    ) -> str:
+        """
+        Get the cached image of a reference, fetching it only when it is not cached.
+
+        Args:
+            reference (str): The image reference (e.g. the photo reference and its size).
+            fetch (Callable[[], bytes | None]): Fetches the image content, None if not available.
+            extension (str, optional): The image file extension. Defaults to "jpg".
+
+        Returns:
+            str: The path of the cached image, or an empty string if not available.
+        """
+        key = self.get_key(reference)
+        path = self.get_path(key, extension)
+
+        key_lock = ImageCache._key_locks[int(key[:8], 16) % self.LOCK_STRIPES]
+        with key_lock:
+            if self._touch(path):
+                self._count(hit=True)
+                return path
+
+            self._count(hit=False)
+            content = fetch()
+            if not content:
+                return ""
+
+            try:
+                self._write(path, content)
+            except OSError as e:
+                _log(f"[ImageCache] Failed to cache image: {e}", level="ERROR")
+                return ""
+
+        self._add_usage(len(content))
+        return path
+
+    def get_thumbnail(self, image_path: str, width: int = None) -> str:
+        """
+        Get the WebP thumbnail of a cached image, creating it when needed.
+
+        Args:
+            image_path (str): The path of the cached image.
+            width (int, optional): The thumbnail width, defaults to the 'image_thumbnail_width' config.
+
+        Returns:
+            str: The thumbnail path, or the image path if it is not a cached image
+                (e.g. an URL) or the thumbnail could not be created.
+        """
+        if not image_path or not self._is_cached(image_path):
+            return image_path
+
+        width = int(width or self.thumbnail_width)
+        base_path = os.path.splitext(image_path)[0]
+        thumbnail_path = f"{base_path}-{width}w.webp"
+        if self._touch(thumbnail_path):
+            return thumbnail_path
+
+        try:
+            with Image.open(image_path) as image:
+                # Only shrink, keeping the aspect ratio
+                image.thumbnail((width, width * 4))
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGB")
+                content = io.BytesIO()
+                image.save(content, format="WEBP", quality=80, method=4)
+            self._write(thumbnail_path, content.getvalue())
+        except OSError as e:
+            _log(f"[ImageCache] Failed to create thumbnail: {e}", level="ERROR")
+            return image_path
+
+        self._add_usage(content.tell())
+        return thumbnail_path
+
+    def get_key(self, reference: str) -> str:
+        """
+        Get the cache key of a reference.
+
+        Args:
+            reference (str): The image reference.
+
+        Returns:
+            str: The cache key (The SHA-256 hex digest of the reference).
+        """
+        return hashlib.sha256(reference.encode("utf-8")).hexdigest()
+
+    def get_path(self, key: str, extension: str = "jpg") -> str:
+        """
+        Get the cache file path of a key.
+
+        Args:
+            key (str): The cache key.
+            extension (str, optional): The image file extension. Defaults to "jpg".
+
+        Returns:
+            str: The cache file path, with forward slashes.
+        """
+        return os.path.join(self.cache_dir, f"{key}.{extension}").replace("\\", "/")
+
+    def get_stats(self) -> dict:
+        """
+        Get the disk usage of the cache and the hit ratio of this process.
+
+        Returns:
+            dict: The number of files, bytes used, size limit, hits, misses and hit ratio.
+        """
+        files = self._scan()
+        total_bytes = sum(size for _, _, size in files)
+        with ImageCache._lock:
+            ImageCache._usage[self.cache_dir] = total_bytes
+            hits, misses = ImageCache._hits, ImageCache._misses
+
+        return {
+            "files": len(files),
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+        }
+
+    # --------------------------
+    # Eviction
+    # --------------------------
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used images until the cache is below its limit.
+
+        The referenced images are kept, even if the cache stays over its limit.
+
+        Returns:
+            int: The number of images removed.
+        """
+        files = sorted(self._scan(), key=lambda file: file[1])
+        total_bytes = sum(size for _, _, size in files)
+        target_bytes = self.max_bytes * self.LOW_WATERMARK
+
+        removed = 0
+        if total_bytes > self.max_bytes:
+            referenced = self._get_referenced_keys()
+            for path, _, size in files:
+                if total_bytes <= target_bytes:
+                    break
+                if self._get_file_key(path) in referenced:
+                    continue
+                if self._remove(path):
+                    removed += 1
+                total_bytes -= size
+            _log(f"[ImageCache] Evicted {removed} images ({total_bytes} bytes left)")
+
+        with ImageCache._lock:
+            ImageCache._usage[self.cache_dir] = total_bytes
+        return removed
+
+    def collect_garbage(self, referenced: Iterable[str], min_age: int = 3600) -> int:
+        """
+        Remove the cached images that are not referenced anymore.
+
+        Images used or written in the last 'min_age' seconds are kept, so the images of an
+        attraction being scraped are not removed before the attraction is saved.
+
+        Args:
+            referenced (Iterable[str]): The paths (or file names) of the images still in use,
+                their thumbnails are kept too.
+            min_age (int, optional): The minimum age in seconds of the removed images. Defaults to 3600.
+
+        Returns:
+            int: The number of images removed.
+        """
+        referenced = {self._get_file_key(str(path)) for path in referenced if path}
+        max_mtime = time.time() - min_age
+
+        removed = 0
+        for path, mtime, size in self._scan():
+            if self._get_file_key(path) in referenced or mtime > max_mtime:
+                continue
+            if self._remove(path):
+                removed += 1
+                self._add_usage(-size, evict=False)
+
+        _log(f"[ImageCache] Removed {removed} unreferenced images")
+        return removed
+
+    def get_referenced_images(self) -> list[str]:
+        """
+        Get the images of the saved attractions, attraction snapshots and trips.
+
+        Returns:
+            list[str]: The image paths (Or URLs, for the images not cached).
+        """
+        attractions_data = AttractionsData()
+        attractions = attractions_data.get_all_attractions()
+        attractions += attractions_data.get_all_snapshots()
+        for trip in TripData().get_all_trips(order_by=None):
+            attractions += trip.attractions or []
+        return [str(attraction.image) for attraction in attractions if attraction.image]
+
+    def _get_referenced_keys(self) -> set[str]:
+        """
+        Get the keys of the referenced images, loaded again every REFERENCES_MAX_AGE seconds.
+
+        Returns:
+            set[str]: The cache keys.
+        """
+        now = time.monotonic()
+        with ImageCache._lock:
+            keys, loaded_at = ImageCache._referenced.get(self.cache_dir, (None, 0))
+        if keys is not None and now - loaded_at < self.REFERENCES_MAX_AGE:
+            return keys
+
+        keys = {self._get_file_key(path) for path in self.referenced()}
+        with ImageCache._lock:
+            ImageCache._referenced[self.cache_dir] = (keys, now)
+        return keys
+
+    # --------------------------
+    # File Operations
+    # --------------------------
+
+    def _touch(self, path: str) -> bool:
+        """
+        Mark a cached image as recently used.
+
+        Args:
+            path (str): The cache file path.
+
+        Returns:
+            bool: True if the image is cached.
+        """
+        try:
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    def _write(self, path: str, content: bytes) -> None:
+        """
+        Write an image atomically.
+
+        Args:
+            path (str): The cache file path.
+            content (bytes): The image content.
+        """
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _is_cached(self, path: str) -> bool:
+        """
+        Check if a path is an image of this cache.
+
+        Args:
+            path (str): The path to check.
+
+        Returns:
+            bool: True if the path is in the cache folder and exists.
+        """
+        cache_dir = os.path.abspath(self.cache_dir)
+        return os.path.dirname(os.path.abspath(path)) == cache_dir and os.path.isfile(
+            path
+        )
+
+    def _get_file_key(self, path: str) -> str:
+        """
+        Get the cache key of an image or thumbnail path ('<key>.jpg', '<key>-320w.webp').
+
+        Args:
+            path (str): The image path.
+
+        Returns:
+            str: The cache key.
+        """
+        return os.path.basename(path).split(".", 1)[0].split("-", 1)[0]
+
+    def _remove(self, path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False  # Already removed by another writer
+
+    def _scan(self) -> list[tuple[str, float, int]]:
+        """
+        List the cached images.
+
+        Returns:
+            list[tuple[str, float, int]]: The path, modification time and size of each image.
+        """
+        files = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((entry.path, stat.st_mtime, stat.st_size))
+        return files
+
+    def _add_usage(self, size: int, evict: bool = True) -> None:
+        """
+        Update the estimated size of the cache, evicting images when it is over the limit.
+
+        Args:
+            size (int): The bytes added (or removed, if negative).
+            evict (bool, optional): Evict images if over the limit. Defaults to True.
+        """
+        with ImageCache._lock:
+            usage = ImageCache._usage.get(self.cache_dir)
+            if usage is not None:
+                usage = ImageCache._usage[self.cache_dir] = usage + size
+
+        # The first write of the process measures the folder
+        if usage is None or (evict and usage > self.max_bytes):
+            self.evict()
+
+    def _count(self, hit: bool) -> None:
+        with ImageCache._lock:
+            if hit:
+                ImageCache._hits += 1
+            else:
+                ImageCache._misses += 1
@@ -0,0 +1,345 @@
+import os
+import threading
+import torch
+
+from typing import TYPE_CHECKING, Union
+from transformers import (
+    AutoConfig,
+    AutoModelForCausalLM,
+    AutoModelForSequenceClassification,
+    PreTrainedModel,
+)
+
+from services.AppData import AppData
+from services.Logger import _log
+from lib.Utils import Utils
+
+if TYPE_CHECKING:
+    from optimum.onnxruntime import ORTModel
+
+# A PyTorch model, or the ONNX Runtime model of the 'onnx' backend (Both run in a pipeline)
+InferenceModel = Union[PreTrainedModel, "ORTModel"]
+
+
+class LocalInference:
+    """
+    Loads the local Hugging Face models used by the AI providers with the configured backend.
+
+    Backends:
+        - pytorch: The original float32 (or bfloat16 on GPU) PyTorch model (Default).
+        - quantized: PyTorch model with dynamic int8 quantization of the Linear layers (CPU only).
+        - onnx: ONNX Runtime export of the model (Requires optimum[onnxruntime]).
+        - offload: bfloat16 PyTorch model limited to a RAM budget, the layers that do not fit
+          are memory-mapped from the safetensors files or the offload folder and streamed from disk.
+        - auto: pytorch on GPU, offload when a RAM budget is set, otherwise onnx if available,
+          falling back to quantized.
+
+    The quantized and onnx backends (And auto on CPU) change the model outputs, so they are
+    opt-in until their accuracy and label parity with pytorch are checked with
+    app/benchmarks/bench_local_inference.py.
+
+    Converted models are cached on disk and loaded models are shared by the whole process.
+    """
+
+    BACKENDS = ("pytorch", "quantized", "onnx", "offload")
+    TASKS = {
+        "sentiment-analysis": AutoModelForSequenceClassification,
+        "text-generation": AutoModelForCausalLM,
+    }
+
+    # Loaded models shared by all instances: (model_name, task, backend) -> model
+    _models: dict[tuple[str, str, str], InferenceModel] = {}
+    _lock = threading.Lock()
+    _threads_configured = False
+
+    def __init__(self, backend: str = None):
+        """
+        Initialize the LocalInference class.
+
+        Args:
+            backend (str, optional): The backend to use, defaults to the 'ai_inference_backend' config.
+        """
+        app_data = AppData()
+        self.cache_dir = app_data.get_config("ai_model_cache_dir")
+        self.threads = int(app_data.get_config("ai_inference_threads") or 0)
+        self.offload_dir = app_data.get_config("ai_offload_dir")
+        self.max_cpu_memory = app_data.get_config("ai_max_cpu_memory") or None
+        self.backend = self._resolve_backend(
+            backend or app_data.get_config("ai_inference_backend") or "pytorch"
+        )
+        self._configure_threads()
+
+    # --------------------------
+    # Model Loading
+    # --------------------------
+
+    def load_model(self, model_name: str, task: str) -> InferenceModel:
+        """
+        Load a model for the task using the selected backend.
+
+        Args:
+            model_name (str): The Hugging Face model name.
+            task (str): The pipeline task ('sentiment-analysis' or 'text-generation').
+
+        Returns:
+            InferenceModel: The loaded model, ready to be used in a pipeline.
+        """
+        if task not in self.TASKS:
+            raise ValueError(f"Unsupported task: {task}")
+
+        key = (model_name, task, self.backend)
+        if key not in LocalInference._models:
+            with LocalInference._lock:
+                if key not in LocalInference._models:
+                    LocalInference._models[key] = self._load(model_name, task)
+        return LocalInference._models[key]
+
+    def get_device(self) -> int | None:
+        """
+        Get the pipeline device for the selected backend.
+
+        Returns:
+            int | None: 0 for the first GPU, -1 for CPU, None when accelerate places the layers.
+        """
+        if self.backend == "offload":
+            return None
+        return 0 if self.backend == "pytorch" and torch.cuda.is_available() else -1
+
+    # --------------------------
+    # Backends
+    # --------------------------
+
+    def _load(self, model_name: str, task: str) -> InferenceModel:
+        """
+        Load the model from the cache, converting it first if needed.
+
+        Args:
+            model_name (str): The Hugging Face model name.
+            task (str): The pipeline task.
+
+        Returns:
+            InferenceModel: The loaded model.
+        """
+        _log(f"[LocalInference] Loading {model_name} ({self.backend})...")
+
+        if self.backend == "onnx":
+            return self._load_onnx(model_name, task)
+        if self.backend == "quantized":
+            return self._load_quantized(model_name, task)
+        if self.backend == "offload":
+            return self._load_offloaded(model_name, task)
+
+        return self.TASKS[task].from_pretrained(
+            model_name,
+            torch_dtype=torch.bfloat16 if torch.cuda.is_available() else torch.float32,
+        )
+
+    def _load_quantized(self, model_name: str, task: str) -> PreTrainedModel:
+        """
+        Load the dynamic int8 quantized version of the model.
+
+        Args:
+            model_name (str): The Hugging Face model name.
+            task (str): The pipeline task.
+
+        Returns:
+            PreTrainedModel: The quantized model.
+        """
+        cache_dir = self._get_cache_path(model_name, "int8")
+        cache_path = os.path.join(cache_dir, "state_dict.pt")
+        if os.path.exists(cache_path):
+            # Only the weights are cached, so loading them never runs pickled code
+            model = self._quantize(
+                self.TASKS[task].from_config(
+                    AutoConfig.from_pretrained(cache_dir), torch_dtype=torch.float32
+                )
+            )
+            model.load_state_dict(torch.load(cache_path, weights_only=True))
+            return model
+
+        model = self._quantize(
+            self.TASKS[task].from_pretrained(model_name, torch_dtype=torch.float32)
+        )
+
+        # Write to a temporary file first, so a failed save never leaves a broken cache
+        os.makedirs(cache_dir, exist_ok=True)
+        model.config.save_pretrained(cache_dir)
+        torch.save(model.state_dict(), cache_path + ".tmp")
+        os.replace(cache_path + ".tmp", cache_path)
+        _log(f"[LocalInference] Cached quantized model: {cache_path}")
+        return model
+
+    def _quantize(self, model: PreTrainedModel) -> PreTrainedModel:
+        """
+        Apply the dynamic int8 quantization to the Linear layers of a float32 model.
+
+        torch.ao.quantization is deprecated in favor of torchao, and may be removed by a
+        future PyTorch release.
+
+        Args:
+            model (PreTrainedModel): The float32 model.
+
+        Returns:
+            PreTrainedModel: The quantized model, in evaluation mode.
+        """
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        model.eval()
+        return model
+
+    def _load_onnx(self, model_name: str, task: str) -> "ORTModel":
+        """
+        Load the ONNX Runtime version of the model, exporting it on the first run.
+
+        Args:
+            model_name (str): The Hugging Face model name.
+            task (str): The pipeline task.
+
+        Returns:
+            ORTModel: The ONNX Runtime model.
+        """
+        import onnxruntime
+        from optimum.onnxruntime import (
+            ORTModelForCausalLM,
+            ORTModelForSequenceClassification,
+        )
+
+        model_class = (
+            ORTModelForSequenceClassification
+            if task == "sentiment-analysis"
+            else ORTModelForCausalLM
+        )
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = self._get_thread_count()
+
+        cache_path = self._get_cache_path(model_name, "onnx")
+        if os.path.exists(os.path.join(cache_path, "config.json")):
+            return model_class.from_pretrained(
+                cache_path, session_options=session_options
+            )
+
+        model = model_class.from_pretrained(
+            model_name, export=True, session_options=session_options
+        )
+        model.save_pretrained(cache_path)
+        _log(f"[LocalInference] Cached ONNX model: {cache_path}")
+        return model
+
+    def _load_offloaded(self, model_name: str, task: str) -> PreTrainedModel:
+        """
+        Load the model within the RAM budget, offloading the remaining layers to disk.
+
+        Safetensors checkpoints are memory-mapped, so the offloaded weights are read straight
+        from them. Other checkpoints are written once to the offload folder, next to the
+        index.json that maps each weight to its dtype and shape.
+
+        Args:
+            model_name (str): The Hugging Face model name.
+            task (str): The pipeline task.
+
+        Returns:
+            PreTrainedModel: The model dispatched by accelerate.
+        """
+        max_memory = {"cpu": self.max_cpu_memory} if self.max_cpu_memory else None
+        if max_memory and torch.cuda.is_available():
+            max_memory[0] = torch.cuda.mem_get_info()[0]
+
+        model = self.TASKS[task].from_pretrained(
+            model_name,
+            torch_dtype=torch.bfloat16,
+            device_map="auto",
+            max_memory=max_memory,
+            offload_folder=os.path.join(self.offload_dir, Utils.slugify(model_name)),
+        )
+        model.eval()
+
+        offloaded = sum(
+            1
+            for device in getattr(model, "hf_device_map", {}).values()
+            if device == "disk"
+        )
+        _log(
+            f"[LocalInference] {model_name} loaded with {offloaded} modules offloaded to disk "
+            f"(RAM budget: {self.max_cpu_memory or 'auto'})"
+        )
+        return model
+
+    # --------------------------
+    # Utils
+    # --------------------------
+
+    def _resolve_backend(self, backend: str) -> str:
+        """
+        Resolve the 'auto' backend and check that the selected backend is available.
+
+        Args:
+            backend (str): The requested backend.
+
+        Returns:
+            str: The backend that will be used.
+        """
+        backend = str(backend).lower()
+        if backend not in self.BACKENDS and backend != "auto":
+            raise ValueError(f"Unknown inference backend: {backend}")
+
+        # GPUs run the original model
+        if torch.cuda.is_available() and backend == "auto":
+            return "pytorch"
+
+        # A RAM budget means the model may not fit in memory
+        if self.max_cpu_memory and backend == "auto":
+            return "offload"
+
+        if backend in ("auto", "onnx"):
+            try:
+                import onnxruntime  # noqa: F401
+                import optimum.onnxruntime  # noqa: F401
+
+                return "onnx"
+            except ImportError:
+                if backend == "onnx":
+                    _log(
+                        "[LocalInference] optimum[onnxruntime] is not installed, using the quantized backend",
+                        level="WARNING",
+                    )
+                return "quantized"
+
+        return backend
+
+    def _configure_threads(self) -> None:
+        """
+        Set the number of CPU threads used by PyTorch (Once per process).
+        """
+        if LocalInference._threads_configured:
+            return
+
+        torch.set_num_threads(self._get_thread_count())
+        LocalInference._threads_configured = True
+
+    def _get_thread_count(self) -> int:
+        """
+        Get the number of threads to use, defaults to the CPUs available to the process.
+
+        Returns:
+            int: The number of threads.
+        """
+        if self.threads > 0:
+            return self.threads
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    def _get_cache_path(self, model_name: str, variant: str) -> str:
+        """
+        Get the cache folder of a converted model.
+
+        Args:
+            model_name (str): The Hugging Face model name.
+            variant (str): The conversion variant (e.g. 'int8', 'onnx').
+
+        Returns:
+            str: The cache folder path.
+        """
+        return os.path.join(self.cache_dir, f"{Utils.slugify(model_name)}-{variant}")
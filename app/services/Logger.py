@@ -1,8 +1,14 @@
 import os
-import logging
+import sys
 import json
+import queue
+import atexit
+import random
+import logging
+import threading
 
-from logging.handlers import RotatingFileHandler
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 
 class SimpleLogger:
@@ -14,6 +20,13 @@ class SimpleLogger:
     objects in the log messages. Log settings can be customized, and the
     log directory is retrieved from a configuration file.
 
+    The messages are put in a queue and written as JSON lines by a background listener
+    thread (Once per process), so the callers never wait for the file. A message below the
+    level of its module ('log_level', or 'log_levels' per module) is dropped before its
+    object is serialized. The objects of the others are serialized by the caller, as they are
+    when logged, and written by the listener. Only a 'log_debug_sample_rate' fraction of the
+    DEBUG messages is kept.
+
     Attributes:
         logger (logging.Logger): The main logger object used for logging messages.
 
@@ -28,10 +41,23 @@ class SimpleLogger:
             Log an error message.
         log_debug(message: str, obj: Any = None):
             Log a debug message.
+        set_level(level: str, module: str = None):
+            Set the level of the messages to log, of all or one module.
+        set_debug_sample_rate(rate: float):
+            Set the fraction of the DEBUG messages to log.
         get_log_dir() -> Optional[str]:
             Retrieve the log folder path from the configuration file.
     """
 
+    LOGGER_NAME = "SimpleLogger"
+
+    # Pipeline shared by all instances: the listener writing the queued records
+    _listener: QueueListener | None = None
+    _lock = threading.Lock()
+    # Module name -> logger, each with the level of its module
+    _loggers: dict[str, logging.Logger] = {}
+    _debug_sample_rate = 1.0
+
     def __init__(
         self,
         log_filename="app.log",
@@ -50,34 +76,12 @@ class SimpleLogger:
             ValueError: If the log directory is not found in the configuration file.
         """
 
-        # Get the log folder from the config file
-        log_folder = self.get_log_dir()
-
-        if not log_folder:
-            raise ValueError("Log directory not found in config file")
-
-        # Create the log folder if it does not exist
-        if not os.path.exists(log_folder):
-            os.makedirs(log_folder)
-
-        # Define the full log file path
-        log_path = os.path.join(log_folder, log_filename)
-
-        # Set up logging with file rotation
-        self.logger = logging.getLogger("SimpleLogger")
-        self.logger.setLevel(logging.DEBUG)
-
-        # Create a rotating file handler
-        handler = RotatingFileHandler(
-            log_path, maxBytes=max_size, backupCount=backup_count, encoding="utf-8"
-        )
+        self.logger = logging.getLogger(SimpleLogger.LOGGER_NAME)
 
-        # Define the log format
-        formatter = logging.Formatter("[%(asctime)s][%(levelname)s] %(message)s")
-        handler.setFormatter(formatter)
-
-        # Add the handler to the logger
-        self.logger.addHandler(handler)
+        # Start the pipeline once, all the instances share it
+        with SimpleLogger._lock:
+            if SimpleLogger._listener is None:
+                self._start(log_filename, max_size, backup_count)
 
     # --------------------------
     # Log functions
@@ -145,34 +149,123 @@ class SimpleLogger:
         """
         Log a message containing an object.
 
+        The object is serialized right away, only if the level of the calling module is enabled.
+
         Args:
             level (str): The log level (e.g., "INFO", "WARNING", "ERROR", "DEBUG").
             message (str): The log message.
             obj (Any): An optional object to include in the log message.
         """
-        # Convert the object to a string if it exists, using JSON if possible
-        if obj is not None:
-            try:
-                obj_str = json.dumps(
-                    obj, default=str
-                )  # Use default=str to handle non-serializable objects
-            except TypeError:
-                obj_str = repr(obj)  # Fallback to repr if JSON serialization fails
-            message = f"{message} | Object: {obj_str}"
-
-        # Remove any newlines from the message
-        if type(message) == str:
-            message = message.replace("\n", "\\n")
-
-        # Log the message at the specified level
-        if level == logging.INFO:
-            self.logger.info(message)
-        elif level == logging.WARNING:
-            self.logger.warning(message)
-        elif level == logging.ERROR:
-            self.logger.error(message)
-        elif level == logging.DEBUG:
-            self.logger.debug(message)
+        logger = self._get_module_logger()
+        if not logger.isEnabledFor(level):
+            return
+
+        # Keep only a sample of the high-volume debug messages
+        rate = SimpleLogger._debug_sample_rate
+        if level == logging.DEBUG and rate < 1 and random.random() >= rate:
+            return
+
+        # Serialized now, the object may change before the listener writes it
+        extra = {} if obj is None else {"obj_json": JsonFormatter.dump_object(obj)}
+
+        # Skip the logging caller lookup, the module is already known
+        record = logger.makeRecord(
+            logger.name, level, "", 0, message, (), None, extra=extra
+        )
+        logger.handle(record)
+
+    def set_level(self, level: str, module: str = None):
+        """
+        Set the level of the messages to log.
+
+        Args:
+            level (str): The log level (e.g., "INFO", "WARNING", "ERROR", "DEBUG").
+            module (str, optional): The module name (e.g., "services.AiProvider", or "services" for
+                all of them). Defaults to all the modules without a level of their own.
+        """
+        name = (
+            f"{SimpleLogger.LOGGER_NAME}.{module}"
+            if module
+            else SimpleLogger.LOGGER_NAME
+        )
+        logging.getLogger(name).setLevel(str(level).upper())
+
+    def set_debug_sample_rate(self, rate: float):
+        """
+        Set the fraction of the DEBUG messages to log.
+
+        Args:
+            rate (float): From 0 (None) to 1 (All).
+        """
+        SimpleLogger._debug_sample_rate = min(max(float(rate), 0.0), 1.0)
+
+    # --------------------------
+    # Pipeline
+    # --------------------------
+
+    def _start(self, log_filename: str, max_size: int, backup_count: int):
+        """
+        Start the listener writing the queued messages to the rotating log file.
+
+        Raises:
+            ValueError: If the log directory is not found in the configuration file.
+        """
+        # Get the log folder from the config file
+        log_folder = self.get_log_dir()
+
+        if not log_folder:
+            raise ValueError("Log directory not found in config file")
+
+        # Create the log folder if it does not exist
+        if not os.path.exists(log_folder):
+            os.makedirs(log_folder)
+
+        # Define the full log file path
+        log_path = os.path.join(log_folder, log_filename)
+
+        # Create a rotating file handler, written from the listener thread only
+        handler = RotatingFileHandler(
+            log_path, maxBytes=max_size, backupCount=backup_count, encoding="utf-8"
+        )
+        handler.setFormatter(JsonFormatter())
+
+        # The callers only put the records in the queue
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(LazyQueueHandler(log_queue))
+
+        # Set the levels and sampling from the config
+        self.set_level(self._get_config("log_level") or "INFO")
+        log_levels = self._get_config("log_levels") or {}
+        if isinstance(log_levels, str):
+            log_levels = json.loads(log_levels)
+        for module, level in log_levels.items():
+            self.set_level(level, module=module)
+        rate = self._get_config("log_debug_sample_rate")
+        self.set_debug_sample_rate(1 if rate is None else rate)
+
+        # Write the queued records on exit
+        listener = QueueListener(log_queue, handler)
+        listener.start()
+        atexit.register(listener.stop)
+        SimpleLogger._listener = listener
+
+    def _get_module_logger(self) -> logging.Logger:
+        """
+        Get the logger of the module that called the log functions.
+
+        Returns:
+            logging.Logger: The logger, child of the main logger.
+        """
+        frame = sys._getframe(1)
+        while frame and frame.f_code.co_filename == __file__:
+            frame = frame.f_back
+        module = frame.f_globals.get("__name__", "") if frame else ""
+
+        logger = SimpleLogger._loggers.get(module)
+        if logger is None:
+            logger = logging.getLogger(f"{SimpleLogger.LOGGER_NAME}.{module}")
+            SimpleLogger._loggers[module] = logger
+        return logger
 
     # --------------------------
     # System Utils
@@ -187,23 +280,83 @@ class SimpleLogger:
         Returns:
             Optional[str]: The log folder path, or None if not found.
         """
-        key = "log_dir"
-        config_file = "app/config/cfg.json"
+        return self._get_config("log_dir")
+
+    def _get_config(self, key: str):
+        # Imported here, AppData logs through this module
+        from services.AppData import AppData
 
-        # Allow overriding config values with environment variables
-        env_key = f"__CONFIG_OVERRIDE_{key}"
+        return AppData().get_config(key)
 
-        # Check if the key exists in environment variables
-        if env_key in os.environ:
-            return os.getenv(env_key)
 
-        # Otherwise, load from JSON config file
-        if os.path.exists(config_file):
-            with open(config_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data.get(key)
+# ----------------------------
+# Pipeline Handler and Formatter
+# ----------------------------
+class LazyQueueHandler(QueueHandler):
+    """
+    A queue handler that leaves the formatting of the records to the listener.
+    """
+
+    def prepare(self, record):
+        # The traceback is formatted now, its frames may change
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
-        return None
+
+class JsonFormatter(logging.Formatter):
+    """
+    A formatter of the records as JSON lines, with their module and object.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "module": record.name.removeprefix(f"{SimpleLogger.LOGGER_NAME}."),
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+
+        # The object as serialized by the caller, or as it is now for the other records
+        obj_json = getattr(record, "obj_json", None)
+        if obj_json is None and getattr(record, "obj", None) is not None:
+            obj_json = self.dump_object(record.obj)
+
+        line = json.dumps(entry, ensure_ascii=False)
+        if obj_json is None:
+            return line
+        return f'{line[:-1]}, "obj": {obj_json}}}'
+
+    @classmethod
+    def dump_object(cls, obj) -> str:
+        """
+        Serialize an object logged with a message as JSON.
+
+        Args:
+            obj (Any): The object.
+
+        Returns:
+            str: The JSON of the object, or of its repr if it can not be serialized.
+        """
+        try:
+            if hasattr(obj, "model_dump_json"):
+                return obj.model_dump_json()
+            return json.dumps(obj, ensure_ascii=False, default=cls._to_json)
+        except (TypeError, ValueError):
+            # Fallback to repr if JSON serialization fails
+            return json.dumps(repr(obj), ensure_ascii=False)
+
+    @staticmethod
+    def _to_json(value):
+        # Models as their fields, anything else as a string
+        if hasattr(value, "model_dump"):
+            return value.model_dump(mode="json")
+        return str(value)
 
 
 # ----------------------------
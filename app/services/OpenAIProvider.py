@@ -3,6 +3,7 @@ import openai
 
 from services.AiProvider import AiProvider
 from services.AppData import AppData
+from services.HttpClient import HttpClient
 from services.Logger import _log
 
 
@@ -12,6 +13,9 @@ class OpenAIProvider(AiProvider):
     Extends the AiProvider class and implements the ask method to generate content using the OpenAI API.
     """
 
+    # SDK clients shared between instances, keyed by API key
+    _clients: dict[str, openai.OpenAI] = {}
+
     def __init__(self, api_key=None):
         super().__init__()  # Initialize the parent class
 
@@ -20,7 +24,7 @@ class OpenAIProvider(AiProvider):
         if not self.api_key:
             raise ValueError("API key is required for OpenAI API")
 
-        openai.api_key = self.api_key
+        self.client = self._get_client(self.api_key)
         self.model_name = "gpt-4o-mini"
         self.max_tokens = 1500
 
@@ -32,7 +36,7 @@ class OpenAIProvider(AiProvider):
             start_time = time.time()
 
             # Call OpenAI's API for text generation
-            response = openai.chat.completions.create(
+            response = self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant."},
@@ -65,3 +69,24 @@ class OpenAIProvider(AiProvider):
             max_tokens (int): The maximum number of tokens.
         """
         self.max_tokens = max_tokens
+
+    @staticmethod
+    def _get_client(api_key: str) -> openai.OpenAI:
+        """
+        Get the cached OpenAI client for the API key, using the shared HTTP connection pool.
+
+        Args:
+            api_key (str): The OpenAI API key.
+
+        Returns:
+            openai.OpenAI: The OpenAI client.
+        """
+        if api_key not in OpenAIProvider._clients:
+            OpenAIProvider._clients[api_key] = openai.OpenAI(
+                api_key=api_key, http_client=HttpClient.get_client()
+            )
+        return OpenAIProvider._clients[api_key]
+
+
+# The cached clients use the shared HTTP client, closed by HttpClient.reset()
+HttpClient.on_reset(OpenAIProvider._clients.clear)
@@ -1,14 +1,19 @@
-import requests
+import numpy as np
 import streamlit as st
-from datetime import datetime, timedelta
+from datetime import date, datetime, timezone
 
 from services.AppData import AppData
+from services.ForecastStore import ForecastStore
+from services.HttpClient import HttpClient
 from lib.LatLong import LatLong
 from lib.Utils import Utils
 from typing import List
 
 from models.Weather import ForecastModel, WeatherModel
 
+SECONDS_PER_DAY = 86400
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
 
 class OpenWeatherMap:
     def __init__(self, api_key=None):
@@ -62,127 +67,39 @@ class OpenWeatherMap:
         Args:
             city_name (str): The name of the city.
             state_name (str): The name of the state.
-            days (int, optional): The number of days to retrieve the forecast for. Defaults to 5.
+            days (int, optional): The number of days to retrieve the forecast for. Defaults to 10.
 
         Returns:
             List[ForecastModel]: A list of forecast data for each hour.
         """
-        lat, long = _self.get_coordinates(city_name, state_name)
-        data = _self._fetch_json(
-            url=f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={long}&units=metric&lang=pt_br&appid={_self.api_key}"
+        columns = _self._to_forecast_columns(
+            _self._get_forecast_data(city_name, state_name), days=days
         )
-
-        forecast_list = data["list"]
-        hourly_forecast = {}
-        current_date = datetime.now().date()
-
-        for forecast in forecast_list:
-            forecast_timestamp = int(forecast["dt"])
-            forecast_datetime = datetime.fromtimestamp(forecast_timestamp)
-            forecast_date = forecast_datetime.date()
-            forecast_date_str = _self._format_date(
-                forecast_timestamp
-            )  # International datetime
-
-            # Check if we are still within the selected days
-            if forecast_date > current_date + timedelta(days=int(days)):
-                break
-
-            # Check if the forecast is for the current day
-            if forecast_date_str not in hourly_forecast:
-                hourly_forecast[forecast_date_str] = []
-
-            hourly_forecast[forecast_date_str] = {
-                "timestamp": forecast_timestamp,
-                "date": forecast_date_str,
-                "city_name": city_name,
-                "state_name": state_name,
-                "temperature": forecast["main"]["temp"],
-                "weather": forecast["weather"][0]["description"],
-                "wind_speed": forecast["wind"]["speed"],
-            }
-
-        return _self._to_forecast_list(hourly_forecast)
+        return _self._to_hourly_forecast(columns, city_name, state_name)
 
     def get_forecast_for_next_5_days(
-        _self, city_name: str, state_name: str
+        _self, city_name: str, state_name: str, fresh: bool = False
     ) -> List[ForecastModel]:
         """
-        Retrieves the daily weather forecast for the next 'days' days by aggregating hourly forecast data.
+        Retrieves the daily weather forecast for the next days by aggregating hourly forecast data.
 
         Args:
             city_name (str): The name of the city.
             state_name (str): The name of the state.
-            days (int, optional): The number of days to retrieve the forecast for. Defaults to 5.
+            fresh (bool, optional): Fetch the forecast from the API even if it is cached,
+                updating the cache. Defaults to False.
 
         Returns:
             List[ForecastModel]: A list of forecast data for each day.
         """
-        # Reuse the hourly forecast function to get all the hourly data
-        hourly_forecast = _self.get_hourly_forecast(city_name, state_name)
-
-        # Dictionary to hold the aggregated daily data
-        daily_forecast = {}
-
-        # Iterate over each forecast entry in hourly_forecast
-        for forecast in hourly_forecast:
-
-            # Convert the forecast object to a dictionary
-            forecast = forecast.model_dump()
-
-            # Extract the date part from the "date" field
-            # We expect isoformat dates in the format 'YYYY-MM-DDTHH:MM:SS'
-            forecast["date"] = Utils.to_date_string(str(forecast["date"]))
-            date_str = forecast["date"].split("T")[0]  # Ignore the time part
-
-            # Initialize daily forecast data if this is the first entry for this day
-            if date_str not in daily_forecast:
-
-                daily_forecast[date_str] = {
-                    "date": date_str,
-                    "timestamp": forecast["timestamp"],
-                    "city_name": city_name,
-                    "state_name": state_name,
-                    "temperature_min": float("inf"),
-                    "temperature_max": float("-inf"),
-                    "weather_descriptions": [],
-                    "wind_speeds": [],
-                }
-
-            # Update temperature_min and temperature_max for the day
-            daily_forecast[date_str]["temperature_min"] = min(
-                daily_forecast[date_str]["temperature_min"], forecast["temperature"]
-            )
-            daily_forecast[date_str]["temperature_max"] = max(
-                daily_forecast[date_str]["temperature_max"], forecast["temperature"]
-            )
-
-            # Append weather description and wind speed for later aggregation
-            daily_forecast[date_str]["weather_descriptions"].append(forecast["weather"])
-            daily_forecast[date_str]["wind_speeds"].append(forecast["wind_speed"])
-
-        # Finalize daily forecast by aggregating wind speeds and finding the most common weather description
-        for date_str, daily_data in daily_forecast.items():
-            # Get the most common weather description for the day
-            daily_data["weather"] = max(
-                set(daily_data["weather_descriptions"]),
-                key=daily_data["weather_descriptions"].count,
-            )
-
-            # Calculate average wind speed for the day
-            daily_data["wind_speed"] = sum(daily_data["wind_speeds"]) / len(
-                daily_data["wind_speeds"]
-            )
-
-            # Remove the temporary fields
-            del daily_data["weather_descriptions"]
-            del daily_data["wind_speeds"]
-
-        return _self._to_forecast_list(daily_forecast)
+        columns = _self._to_forecast_columns(
+            _self._get_forecast_data(city_name, state_name, fresh=fresh), days=10
+        )
+        return _self._aggregate_daily(columns, city_name, state_name)
 
     def get_forecast_between_dates(
         _self, city_name: str, state_name: str, start_date: str, end_date: str
-    ):
+    ) -> List[ForecastModel]:
         """
         Retrieves the weather forecast between specified start and end dates by aggregating hourly forecast data.
 
@@ -193,75 +110,18 @@ class OpenWeatherMap:
             end_date (str): The end date in the format 'YYYY-MM-DD'.
 
         Returns:
-            Dict[str, Dict[str, Union[int, str, float]]]: A dictionary containing the forecast data for each day
-                between the specified dates.
+            List[ForecastModel]: A list of forecast data for each day between the specified dates.
         """
-        # Fetch hourly forecast data
-        hourly_forecast = _self.get_hourly_forecast(city_name, state_name)
-
-        # Dictionary to hold the aggregated daily data
-        daily_forecast = {}
-
-        # Convert start_date and end_date to datetime objects
-        start_date = datetime.strptime(start_date, "%Y-%m-%d")
-        end_date = datetime.strptime(end_date, "%Y-%m-%d")
-
-        # Iterate over each forecast entry in hourly_forecast
-        for forecast in hourly_forecast:
-
-            # Convert the forecast object to a dictionary
-            forecast = forecast.model_dump()
-
-            # Extract the date part from the "date" field (YYYY-MM-DD)
-            date_str = forecast["date"].split("T")[0]
-            forecast_date = datetime.strptime(date_str, "%Y-%m-%d")
-
-            # Check if the forecast date is within the specified range
-            if start_date <= forecast_date <= end_date:
-                if date_str not in daily_forecast:
-                    daily_forecast[date_str] = {
-                        "date": date_str,
-                        "timestamp": forecast["timestamp"],
-                        "city_name": city_name,
-                        "state_name": state_name,
-                        "temperature_min": float("inf"),
-                        "temperature_max": float("-inf"),
-                        "weather_descriptions": [],
-                        "wind_speeds": [],
-                    }
-
-                # Update temperature_min and temperature_max for the day
-                daily_forecast[date_str]["temperature_min"] = min(
-                    daily_forecast[date_str]["temperature_min"], forecast["temperature"]
-                )
-                daily_forecast[date_str]["temperature_max"] = max(
-                    daily_forecast[date_str]["temperature_max"], forecast["temperature"]
-                )
-
-                # Append weather description and wind speed for later aggregation
-                daily_forecast[date_str]["weather_descriptions"].append(
-                    forecast["weather"]
-                )
-                daily_forecast[date_str]["wind_speeds"].append(forecast["wind_speed"])
-
-        # Finalize daily forecast by aggregating wind speeds and finding the most common weather description
-        for date_str, daily_data in daily_forecast.items():
-            # Get the most common weather description for the day
-            daily_data["weather"] = max(
-                set(daily_data["weather_descriptions"]),
-                key=daily_data["weather_descriptions"].count,
-            )
-
-            # Calculate average wind speed for the day
-            daily_data["wind_speed"] = sum(daily_data["wind_speeds"]) / len(
-                daily_data["wind_speeds"]
-            )
-
-            # Remove the temporary fields
-            del daily_data["weather_descriptions"]
-            del daily_data["wind_speeds"]
-
-        return _self._to_forecast_list(daily_forecast)
+        columns = _self._to_forecast_columns(
+            _self._get_forecast_data(city_name, state_name), days=10
+        )
+        return _self._aggregate_daily(
+            columns,
+            city_name,
+            state_name,
+            start_date=datetime.strptime(start_date, "%Y-%m-%d").date(),
+            end_date=datetime.strptime(end_date, "%Y-%m-%d").date(),
+        )
 
     def get_current_weather(_self, city_name: str, state_name: str):
         """
@@ -276,9 +136,7 @@ class OpenWeatherMap:
 
         """
         lat, long = _self.get_coordinates(city_name, state_name)
-        data = _self._fetch_json(
-            url=f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={long}&lang=pt_br&appid={_self.api_key}"
-        )
+        data = _self._fetch_json(url=_self._get_weather_url(lat, long))
         return _self._to_weather(data)
 
     # --------------------------
@@ -320,43 +178,161 @@ class OpenWeatherMap:
 
         return weather
 
-    def _to_forecast_list(self, data: dict) -> List[ForecastModel]:
+    def _to_forecast_columns(
+        self, data: dict, days: int = None
+    ) -> dict[str, np.ndarray]:
+        """
+        Converts the raw '/forecast' list into columnar arrays.
+
+        Local times use the city timezone returned by the API (Or the server timezone if missing).
+
+        Args:
+            data (dict): The parsed data retrieved from the OpenWeatherMap '/forecast' API.
+            days (int, optional): Only keep the forecasts up to this many days from today.
+
+        Returns:
+            dict[str, np.ndarray]: The 'timestamp', 'local_timestamp', 'day' (days since epoch),
+                'temperature', 'wind_speed' and 'weather' columns, sorted by timestamp.
+        """
+        forecast_list = data.get("list", [])
+        count = len(forecast_list)
+
+        utc_offset = data.get("city", {}).get("timezone")
+        if utc_offset is None:
+            utc_offset = datetime.now().astimezone().utcoffset().total_seconds()
+        utc_offset = int(utc_offset)
+
+        timestamps = np.fromiter(
+            (int(forecast["dt"]) for forecast in forecast_list), np.int64, count
+        )
+        columns = {
+            "timestamp": timestamps,
+            "local_timestamp": timestamps + utc_offset,
+            "day": (timestamps + utc_offset) // SECONDS_PER_DAY,
+            "temperature": np.fromiter(
+                (forecast["main"]["temp"] for forecast in forecast_list),
+                np.float64,
+                count,
+            ),
+            "wind_speed": np.fromiter(
+                (forecast["wind"]["speed"] for forecast in forecast_list),
+                np.float64,
+                count,
+            ),
+            "weather": np.array(
+                [forecast["weather"][0]["description"] for forecast in forecast_list],
+                dtype=object,
+            ),
+        }
+
+        mask = np.argsort(timestamps, kind="stable")
+        if days is not None:
+            today = (int(datetime.now().timestamp()) + utc_offset) // SECONDS_PER_DAY
+            mask = mask[columns["day"][mask] <= today + int(days)]
+
+        return {name: column[mask] for name, column in columns.items()}
+
+    def _to_hourly_forecast(
+        self, columns: dict[str, np.ndarray], city_name: str, state_name: str
+    ) -> List[ForecastModel]:
         """
-        Flattens the forecast data from the OpenWeatherMap API response.
+        Converts the forecast columns into one forecast per entry.
 
         Args:
-            data (dict): The parsed data retrieved from the OpenWeatherMap API.
+            columns (dict[str, np.ndarray]): The columns from _to_forecast_columns.
+            city_name (str): The name of the city.
+            state_name (str): The name of the state.
 
         Returns:
-            List[ForecastModel]: A list of ForecastModel objects containing the flattened forecast data.
+            List[ForecastModel]: A list of forecast data for each hour.
+        """
+        return [
+            ForecastModel(
+                timestamp=int(timestamp),
+                date=self._format_date(int(local_timestamp)),
+                city_name=city_name,
+                state_name=state_name,
+                temperature=float(temperature),
+                temperature_min=None,
+                temperature_max=None,
+                weather=weather,
+                wind_speed=float(wind_speed),
+            )
+            for timestamp, local_timestamp, temperature, weather, wind_speed in zip(
+                columns["timestamp"],
+                columns["local_timestamp"],
+                columns["temperature"],
+                columns["weather"],
+                columns["wind_speed"],
+            )
+        ]
+
+    def _aggregate_daily(
+        self,
+        columns: dict[str, np.ndarray],
+        city_name: str,
+        state_name: str,
+        start_date: date = None,
+        end_date: date = None,
+    ) -> List[ForecastModel]:
+        """
+        Aggregates the forecast columns into one forecast per local day in a single vectorized pass.
+
+        Each day gets the min/max temperature, the mean wind speed and the most common weather
+        description (Ties go to the first description in alphabetical order).
+
+        Args:
+            columns (dict[str, np.ndarray]): The columns from _to_forecast_columns.
+            city_name (str): The name of the city.
+            state_name (str): The name of the state.
+            start_date (date, optional): Only keep the days from this date.
+            end_date (date, optional): Only keep the days up to this date.
 
+        Returns:
+            List[ForecastModel]: A list of forecast data for each day.
         """
-        forecast_list = []
-        for timestamp, entry in data.items():
-            forecast_list.append(
-                ForecastModel(
-                    timestamp=int(entry["timestamp"]),
-                    date=entry["date"],
-                    city_name=entry["city_name"],
-                    state_name=entry["state_name"],
-                    temperature=(
-                        float(entry["temperature"]) if "temperature" in entry else None
-                    ),
-                    temperature_min=(
-                        float(entry["temperature_min"])
-                        if "temperature_min" in entry
-                        else None
-                    ),
-                    temperature_max=(
-                        float(entry["temperature_max"])
-                        if "temperature_max" in entry
-                        else None
-                    ),
-                    weather=entry["weather"],
-                    wind_speed=entry["wind_speed"],
-                )
+        days = columns["day"]
+        mask = np.ones(len(days), dtype=bool)
+        if start_date:
+            mask &= days >= start_date.toordinal() - EPOCH_ORDINAL
+        if end_date:
+            mask &= days <= end_date.toordinal() - EPOCH_ORDINAL
+        if not mask.any():
+            return []
+        columns = {name: column[mask] for name, column in columns.items()}
+
+        # The columns are sorted by time, so each day is a contiguous segment
+        unique_days, starts, day_index = np.unique(
+            columns["day"], return_index=True, return_inverse=True
+        )
+        sizes = np.diff(np.append(starts, len(columns["day"])))
+
+        temperature_min = np.minimum.reduceat(columns["temperature"], starts)
+        temperature_max = np.maximum.reduceat(columns["temperature"], starts)
+        wind_speed = np.add.reduceat(columns["wind_speed"], starts) / sizes
+
+        # Count the descriptions per day to find the most common one
+        descriptions, description_index = np.unique(
+            columns["weather"].astype(str), return_inverse=True
+        )
+        counts = np.zeros((len(unique_days), len(descriptions)), dtype=np.int64)
+        np.add.at(counts, (day_index, description_index), 1)
+        weather = descriptions[counts.argmax(axis=1)]
+
+        return [
+            ForecastModel(
+                timestamp=int(columns["timestamp"][starts[i]]),
+                date=date.fromordinal(EPOCH_ORDINAL + int(day)).isoformat(),
+                city_name=city_name,
+                state_name=state_name,
+                temperature=None,
+                temperature_min=float(temperature_min[i]),
+                temperature_max=float(temperature_max[i]),
+                weather=str(weather[i]),
+                wind_speed=float(wind_speed[i]),
             )
-        return forecast_list
+            for i, day in enumerate(unique_days)
+        ]
 
     # --------------------------
     # Utils
@@ -374,18 +350,70 @@ class OpenWeatherMap:
             dict: The JSON data as a dictionary.
 
         """
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
+        return HttpClient().get_json(url)
+
+    def _get_forecast_data(
+        _self, city_name: str, state_name: str, fresh: bool = False
+    ) -> dict:
+        """
+        Retrieves the raw '/forecast' data for a given city and state.
+
+        Args:
+            city_name (str): The name of the city.
+            state_name (str): The name of the state.
+            fresh (bool, optional): Fetch the forecast from the API even if it is cached
+                (The cache may serve an expired forecast while it refreshes it). Defaults to False.
+
+        Returns:
+            dict: The parsed '/forecast' data.
+        """
+        lat, long = _self.get_coordinates(city_name, state_name)
+        url = _self._get_forecast_url(lat, long)
+
+        # Forecasts are cached on disk until the next model run
+        store = ForecastStore()
+        if fresh:
+            data = HttpClient().get_json(url)
+            store.put(lat, long, data)
+            return data
+        return store.get(lat, long, lambda: HttpClient().get_json(url))
+
+    def _get_forecast_url(self, lat: float, long: float) -> str:
+        """
+        Gets the '/forecast' API URL for the coordinates.
+
+        Args:
+            lat (float): The latitude.
+            long (float): The longitude.
+
+        Returns:
+            str: The API URL.
+        """
+        return f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={long}&units=metric&lang=pt_br&appid={self.api_key}"
+
+    def _get_weather_url(self, lat: float, long: float) -> str:
+        """
+        Gets the '/weather' API URL for the coordinates.
+
+        Args:
+            lat (float): The latitude.
+            long (float): The longitude.
+
+        Returns:
+            str: The API URL.
+        """
+        return f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={long}&lang=pt_br&appid={self.api_key}"
 
-    def _format_date(self, timestamp: int):
+    def _format_date(self, local_timestamp: int):
         """
-        Formats a timestamp into a string representation of date and time.
+        Formats a local timestamp (Already shifted by the UTC offset) into an ISO date and time.
 
         Parameters:
-            timestamp (int): The timestamp to be formatted.
+            local_timestamp (int): The timestamp to be formatted.
 
         Returns:
             str: The formatted date and time string.
         """
-        return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%dT%H:%M:%S")
+        return datetime.fromtimestamp(local_timestamp, tz=timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%S"
+        )
@@ -1,9 +1,8 @@
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-import torch
+from transformers import pipeline, AutoTokenizer
 import time
 
 from services.AiProvider import AiProvider
-from services.AppData import AppData
+from services.LocalInference import LocalInference
 from services.Logger import _log
 
 
@@ -14,25 +13,24 @@ class SentimentAnalyzer(AiProvider):
     using the "pysentimiento/bertweet-pt-sentiment" model.
     """
 
-    def __init__(self):
+    def __init__(self, backend: str = None):
         super().__init__()  # Initialize the parent class
 
-        # Device configuration: use GPU if available, otherwise fallback to CPU
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        # Select the inference backend (pytorch, quantized or onnx) based on the config
+        self.inference = LocalInference(backend=backend)
+        self.backend = self.inference.backend
 
         # Define model details and load the sentiment analysis pipeline
         self.model_name = "pysentimiento/bertweet-pt-sentiment"
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        self.model = self.inference.load_model(self.model_name, "sentiment-analysis")
 
         # Define the pipeline for sentiment analysis
         self.pipe = pipeline(
             task="sentiment-analysis",
             model=self.model,
             tokenizer=self.tokenizer,
-            device=(
-                0 if torch.cuda.is_available() else -1
-            ),  # Set device for the pipeline
+            device=self.inference.get_device(),  # Set device for the pipeline
         )
 
     def ask(self, prompt: str) -> dict[str, str]:
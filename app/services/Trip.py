@@ -9,13 +9,13 @@ from datetime import datetime
 
 from lib.LatLong import LatLong
 from lib.Utils import Utils
+from lib.ForecastIndex import ForecastIndex
 
 from services.TripData import TripData
 from services.OpenWeatherMap import OpenWeatherMap
 from services.OpenAIProvider import OpenAIProvider
 from services.Logger import _log
 
-from models.Weather import ForecastModel
 from models.Trip import TripModel
 
 
@@ -85,25 +85,12 @@ class Trip:
 
         # Only store weather that are within the trip dates
         if "weather" in trip_data:
-            weather = []
-            for forecast in trip_data["weather"]:
-                # Convert to ForecastModel object if not already
-                if type(forecast) != ForecastModel:
-                    forecast = ForecastModel(**forecast)
-
-                # Convert the date string to a datetime object
-                if isinstance(forecast.date, str):
-                    forecast.date = Utils.to_datetime(forecast.date)
-
-                # Check if the forecast date is within the trip dates
-                if (
-                    trip_data.get("start_date")
-                    <= forecast.date
-                    <= trip_data.get("end_date")
-                ):
-                    # Convert the date back to a string
-                    forecast.date = str(forecast.date)
-                    weather.append(forecast)
+            weather = ForecastIndex(trip_data["weather"]).between(
+                trip_data.get("start_date"), trip_data.get("end_date")
+            )
+            for forecast in weather:
+                # Store the date as a string
+                forecast.date = str(Utils.to_datetime(forecast.date))
             trip_data["weather"] = weather
 
         self.model = TripModel(**trip_data)
@@ -126,7 +113,8 @@ class Trip:
         if trip_data.get("origin_city") != self.get("origin_city") or trip_data.get(
             "origin_state"
         ) != self.get("origin_state"):
-            updated_data["origin_longitude"], updated_data["origin_latitude"] = (
+            # Geocoded as (lat, long)
+            updated_data["origin_latitude"], updated_data["origin_longitude"] = (
                 self._get_coordinates(
                     trip_data.get("origin_city", self.get("origin_city")),
                     trip_data.get("origin_state", self.get("origin_state")),
@@ -137,8 +125,8 @@ class Trip:
             "destination_city"
         ) or trip_data.get("destination_state") != self.get("destination_state"):
             (
-                updated_data["destination_longitude"],
                 updated_data["destination_latitude"],
+                updated_data["destination_longitude"],
             ) = self._get_coordinates(
                 trip_data.get("destination_city", self.get("destination_city")),
                 trip_data.get("destination_state", self.get("destination_state")),
@@ -488,7 +476,9 @@ class Trip:
     def _get_or_load_coordinates(self, trip_data, lon_key, lat_key, city, state):
         if lon_key in trip_data and lat_key in trip_data:
             return trip_data[lon_key], trip_data[lat_key]
-        return self._get_coordinates(city, state)
+        # Geocoded as (lat, long), returned as (long, lat) like the saved keys
+        lat, long = self._get_coordinates(city, state)
+        return long, lat
 
     @staticmethod
     def _get_travel_by_options():
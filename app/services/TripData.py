@@ -1,10 +1,20 @@
+import json
+import math
+import hashlib
+
 from pydantic import ValidationError
+from typing import Callable
+from datetime import datetime
 
+from lib.GeoIndex import GeoIndex
+from lib.LatLong import LatLong
 from lib.Utils import Utils
 from services.Logger import _log
 from services.AppData import AppData
+from services.AttractionsData import AttractionsData
 
 from models.Trip import TripModel
+from models.Weather import ForecastSeries
 
 
 class TripData:
@@ -12,8 +22,17 @@ class TripData:
     TripData service class to handle trip data operations for app.
     """
 
+    # Times a trip is read and changed again by patch() when it is modified meanwhile
+    PATCH_ATTEMPTS = 3
+    # Degrees between the saved and geocoded coordinates of the same city
+    COORDINATES_TOLERANCE = 0.01
+
+    # Hash of the TripModel schema, the trips saved with another schema are not trusted
+    _schema_version: str = None
+
     def __init__(self):
         self.app_data = AppData()
+        self.attractions_data = AttractionsData()
 
     def save(self, trip_id, trip_data: TripModel) -> bool:
         """
@@ -42,9 +61,38 @@ class TripData:
 
         # Save the new or entire trip data
         return self.app_data.save(
-            "trip", trip_id, trip_data.model_dump_json(), replace=True
+            "trip", trip_id, self._to_json(trip_data), replace=True
         )
 
+    def patch(self, trip_id: str, patch_trip: Callable[[TripModel], bool]) -> bool:
+        """
+        Change some fields of a saved trip, keeping the changes saved meanwhile to the others.
+
+        The trip is read again from its file right before the change, and written only if the
+        file was not modified since that read. Otherwise it is read and changed again.
+
+        Args:
+            trip_id (str): Trip ID.
+            patch_trip (Callable[[TripModel], bool]): Changes the trip in place, returns
+                False if there is nothing to change.
+
+        Returns:
+            bool: True if the trip was changed and saved, False otherwise.
+        """
+        for _ in range(self.PATCH_ATTEMPTS):
+            trip_data, version = self.app_data.get_versioned("trip", trip_id)
+            trip = self._to_trip_model(trip_data)
+            if not trip or not patch_trip(trip):
+                return False
+
+            if self.app_data.save_if_unchanged(
+                "trip", trip_id, self._to_saved_json(trip), version
+            ):
+                return True
+
+        _log(f"Trip {trip_id} kept changing, it was not patched", level="WARNING")
+        return False
+
     def update(self, trip_id, key="", value="") -> bool:
         """
         Update specific fields of an existing trip.
@@ -86,7 +134,7 @@ class TripData:
 
         # Save the updated data
         return self.app_data.save(
-            "trip", trip_id, trip_data.model_dump_json(), replace=True
+            "trip", trip_id, self._to_json(trip_data), replace=True
         )
 
     def get(_self, trip_id: str) -> TripModel:
@@ -210,6 +258,141 @@ class TripData:
 
         return trips
 
+    def get_trips_near(
+        self, lat: float, lon: float, km: float = 50, limit: int = 0
+    ) -> list[TripModel]:
+        """
+        Retrieve the trips with a destination within a distance of a location.
+
+        Args:
+            lat (float): The latitude.
+            lon (float): The longitude.
+            km (float): The radius in km.
+            limit (int): The maximum number of trips to retrieve.
+
+        Returns:
+            list: A list of TripModel objects, nearest destination first.
+        """
+        trips = self.get_all_trips(order_by=None)
+        index = GeoIndex(self.get_coordinates(trip) for trip in trips)
+        trips = [trips[i] for i, _ in index.within_radius(lat, lon, km)]
+        return trips[:limit] if limit else trips
+
+    def get_city_coordinates(self) -> dict[tuple[str, str], tuple[float, float]]:
+        """
+        Retrieve the coordinates of the origins and destinations of all trips.
+
+        Returns:
+            dict: The (latitude, longitude) by (city, state).
+        """
+        coordinates = {}
+        for trip in self.get_all_trips(order_by=None):
+            for place in ("origin", "destination"):
+                city = (trip[f"{place}_city"], trip[f"{place}_state"])
+                coordinates.setdefault(city, self.get_coordinates(trip, place))
+        return coordinates
+
+    def migrate_attraction_refs(self) -> int:
+        """
+        Replace the attractions embedded in the trips saved by older versions with references.
+
+        Runs once: when every trip is migrated, the migration is marked as done and later calls
+        return right away. Each trip is read again right before it is migrated and written only
+        if it was not changed meanwhile, so only its attractions are changed.
+
+        Returns:
+            int: The number of trips migrated.
+        """
+        if self.app_data.exists("migrations", "attraction_refs"):
+            return 0
+
+        migrated, failed = 0, 0
+        for trip_id in self.app_data.get_all_ids("trip"):
+            trip_data, version = self.app_data.get_versioned("trip", trip_id)
+            # Trips without embedded attractions are already migrated
+            if not trip_data or not trip_data.get("attractions"):
+                continue
+
+            trip = self._to_trip_model(trip_data)
+            if not trip:
+                continue
+
+            trip_json = self._to_saved_json(trip)
+            if '"attraction_refs"' not in trip_json:
+                # A snapshot could not be saved, the trip is tried again on the next start
+                failed += 1
+            # A trip changed meanwhile was saved with references already
+            elif self.app_data.save_if_unchanged("trip", trip_id, trip_json, version):
+                migrated += 1
+
+        if not failed:
+            self.app_data.save(
+                "migrations",
+                "attraction_refs",
+                json.dumps({"migrated_at": Utils.to_date_string(datetime.now())}),
+            )
+        _log(
+            f"Migrated the attractions of {migrated} trips to references ({failed} failed)"
+        )
+        return migrated
+
+    def migrate_swapped_coordinates(self) -> int:
+        """
+        Swap back the coordinates of the trips saved by older versions with the latitude and longitude swapped.
+
+        The cities of each trip are geocoded again, and only the coordinates that match them once
+        swapped are changed. Runs once: when every trip was checked, the migration is marked as
+        done and later calls return right away. The trips are changed with patch(), so the
+        changes saved meanwhile to the other fields are kept.
+
+        Returns:
+            int: The number of trips migrated.
+        """
+        if self.app_data.exists("migrations", "trip_coordinates"):
+            return 0
+
+        geocoded: dict[tuple[str, str], tuple[float, float] | None] = {}
+        failed: set[str] = set()
+
+        def swap_coordinates(trip: TripModel) -> bool:
+            swapped = False
+            for place in ("origin", "destination"):
+                city = (trip[f"{place}_city"], trip[f"{place}_state"])
+                if city not in geocoded:
+                    try:
+                        geocoded[city] = LatLong().get_coordinates(*city)
+                    except Exception as e:
+                        _log(f"Error geocoding {city}: {e}", level="ERROR")
+                        geocoded[city] = None
+                if geocoded[city] is None:
+                    # Tried again on the next start
+                    failed.add(trip.id)
+                    continue
+
+                lat, lon = trip[f"{place}_latitude"], trip[f"{place}_longitude"]
+                if not self._is_near((lat, lon), geocoded[city]) and self._is_near(
+                    (lon, lat), geocoded[city]
+                ):
+                    setattr(trip, f"{place}_latitude", lon)
+                    setattr(trip, f"{place}_longitude", lat)
+                    swapped = True
+            return swapped
+
+        migrated = sum(
+            1
+            for trip_id in self.app_data.get_all_ids("trip")
+            if self.patch(trip_id, swap_coordinates)
+        )
+
+        if not failed:
+            self.app_data.save(
+                "migrations",
+                "trip_coordinates",
+                json.dumps({"migrated_at": Utils.to_date_string(datetime.now())}),
+            )
+        _log(f"Swapped back the coordinates of {migrated} trips ({len(failed)} failed)")
+        return migrated
+
     def count_all(self) -> int:
         """
         Retrieve the total number of trips.
@@ -223,6 +406,95 @@ class TripData:
     # Utils
     # --------------------------
 
+    @staticmethod
+    def get_coordinates(
+        trip: TripModel, place: str = "destination"
+    ) -> tuple[float, float]:
+        """
+        Get the coordinates of the origin or destination of a trip.
+
+        Args:
+            trip (TripModel): The trip.
+            place (str): "origin" or "destination".
+
+        Returns:
+            tuple[float, float]: The latitude and longitude.
+        """
+        return trip[f"{place}_latitude"], trip[f"{place}_longitude"]
+
+    def _is_near(self, point: tuple[float, float], other: tuple[float, float]) -> bool:
+        """
+        Check if two coordinates are the same place, within COORDINATES_TOLERANCE degrees.
+
+        Args:
+            point (tuple[float, float]): The latitude and longitude.
+            other (tuple[float, float]): The other latitude and longitude.
+
+        Returns:
+            bool: True if both coordinates are within the tolerance.
+        """
+        return all(
+            math.isclose(a, b, abs_tol=self.COORDINATES_TOLERANCE)
+            for a, b in zip(point, other)
+        )
+
+    @classmethod
+    def get_schema_version(cls) -> str:
+        """
+        Get the version of the TripModel schema, a hash of its JSON schema.
+
+        Returns:
+            str: The schema version.
+        """
+        if cls._schema_version is None:
+            schema = json.dumps(TripModel.model_json_schema(), sort_keys=True)
+            schema_hash = hashlib.sha256(schema.encode("utf-8")).hexdigest()
+            cls._schema_version = schema_hash[:12]
+        return cls._schema_version
+
+    def _to_json(self, trip_data: TripModel) -> str:
+        """
+        Convert a TripModel object to JSON, with references to its attractions.
+
+        Args:
+            trip_data (TripModel): The trip data.
+
+        Returns:
+            str: The trip data as JSON.
+        """
+        refs = []
+        if trip_data.attractions:
+            refs = self.attractions_data.to_refs(trip_data.attractions)
+
+        if refs is None:
+            # The snapshots could not be saved, the attractions stay embedded
+            data = trip_data.model_dump(mode="json")
+        else:
+            data = trip_data.model_dump(mode="json", exclude={"attractions"})
+            data["attractions"] = None
+            if refs:
+                data["attraction_refs"] = [ref.model_dump() for ref in refs]
+        return self.app_data.add_checksum(
+            json.dumps(data, ensure_ascii=False, separators=(",", ":")),
+            self.get_schema_version(),
+        )
+
+    def _to_saved_json(self, trip_data: TripModel) -> str:
+        """
+        Convert a TripModel object to JSON, with its dates as saved by save().
+
+        Args:
+            trip_data (TripModel): The trip data, its dates are converted to strings.
+
+        Returns:
+            str: The trip data as JSON.
+        """
+        # Convert dates to string format
+        trip_data.start_date = Utils().to_date_string(trip_data.start_date)
+        trip_data.end_date = Utils().to_date_string(trip_data.end_date)
+        trip_data.created_at = Utils().to_date_string(trip_data.created_at)
+        return self._to_json(trip_data)
+
     def _to_trip_model(self, trip_data: dict) -> TripModel:
         """
         Convert a dictionary to a TripModel object.
@@ -250,6 +522,20 @@ class TripData:
                 # Update the model to include the created_at field
                 trip_data["created_at"] = trip_data["start_date"]
 
+            # The trips saved by this schema version were validated before being saved,
+            # so their forecasts are converted at once instead of one by one
+            trusted = trip_data.pop("_schema", None) == self.get_schema_version()
+            if trusted and isinstance(trip_data.get("weather"), list):
+                trip_data["weather"] = ForecastSeries.from_trusted(trip_data["weather"])
+
+            # The attractions are saved as references to the catalog
+            # Trips saved by older versions embed the attractions instead
+            attraction_refs = trip_data.pop("attraction_refs", None)
+            if attraction_refs:
+                trip_data["attractions"] = self.attractions_data.from_refs(
+                    attraction_refs
+                )
+
             return TripModel(**trip_data)
         except ValidationError as e:
             _log(f"Error validating trip data: {e}", level="ERROR")
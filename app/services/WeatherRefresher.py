@@ -0,0 +1,285 @@
+import time
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any
+
+from lib.ForecastIndex import ForecastIndex
+from lib.Utils import Utils
+
+from services.AppData import AppData
+from services.OpenWeatherMap import OpenWeatherMap
+from services.TripData import TripData
+from services.Logger import _log
+
+from models.Trip import TripModel
+from models.Weather import ForecastModel, ForecastSeries
+
+
+class WeatherRefresher:
+    """
+    Refreshes the weather of all the upcoming trips in the background.
+
+    Trips whose dates overlap the forecast horizon are grouped by destination, so each city
+    is fetched once, with at most 'weather_refresh_concurrency' requests at a time. Only the
+    weather of the changed trips is then written, over their latest saved version.
+
+    The scheduler and the metrics of the last run are shared by the whole process.
+    """
+
+    _thread: threading.Thread = None
+    _thread_lock = threading.Lock()
+    _run_lock = threading.Lock()
+    _status: dict[str, Any] = {
+        "running": False,
+        "started_at": None,
+        "finished_at": None,
+        "duration_s": None,
+        "cities_total": 0,
+        "cities_done": 0,
+        "cities_failed": 0,
+        "trips_total": 0,
+        "trips_updated": 0,
+        "errors": [],
+    }
+
+    def __init__(self):
+        """
+        Initialize the WeatherRefresher class.
+        """
+        app_data = AppData()
+        self.horizon_days = int(
+            app_data.get_config("weather_refresh_horizon_days") or 5
+        )
+        self.concurrency = int(app_data.get_config("weather_refresh_concurrency") or 4)
+        self.interval = int(app_data.get_config("weather_refresh_interval") or 10800)
+        self.trip_data = TripData()
+
+    # --------------------------
+    # Scheduler
+    # --------------------------
+
+    def start(self) -> bool:
+        """
+        Start refreshing the trips every 'weather_refresh_interval' seconds (Once per process).
+
+        Returns:
+            bool: True if the scheduler was started, False if it was already running.
+        """
+        with WeatherRefresher._thread_lock:
+            if WeatherRefresher._thread and WeatherRefresher._thread.is_alive():
+                return False
+
+            WeatherRefresher._thread = threading.Thread(
+                target=self._schedule, name="WeatherRefresher", daemon=True
+            )
+            WeatherRefresher._thread.start()
+            return True
+
+    def _schedule(self) -> None:
+        """
+        Run the refresh forever, waiting 'interval' seconds between runs.
+        """
+        while True:
+            try:
+                self.run()
+            except Exception as e:
+                _log(f"[WeatherRefresher] Refresh failed: {e}", level="ERROR")
+            time.sleep(self.interval)
+
+    # --------------------------
+    # Refresh
+    # --------------------------
+
+    def run(self) -> dict[str, Any]:
+        """
+        Refresh the weather of all the upcoming trips.
+
+        Returns:
+            dict[str, Any]: The metrics of the run, or of the run in progress if one is already running.
+        """
+        # Only one refresh at a time
+        if not WeatherRefresher._run_lock.acquire(blocking=False):
+            return self.get_status()
+
+        status = WeatherRefresher._status
+        start_time = time.perf_counter()
+        status.update(running=True)
+
+        try:
+            trips = self.get_upcoming_trips(self.trip_data.get_all_trips(order_by=None))
+            destinations = self._group_by_destination(trips)
+            self._refresh(trips, destinations, status)
+        finally:
+            status.update(
+                running=False,
+                finished_at=Utils.to_date_string(datetime.now()),
+                duration_s=round(time.perf_counter() - start_time, 3),
+            )
+            WeatherRefresher._run_lock.release()
+
+        _log(
+            f"[WeatherRefresher] Updated {status['trips_updated']} trips in {status['duration_s']}s"
+        )
+        return self.get_status()
+
+    def _refresh(
+        self,
+        trips: list[TripModel],
+        destinations: dict[tuple[str, str], list[TripModel]],
+        status: dict[str, Any],
+    ) -> None:
+        """
+        Fetch the forecasts of the destinations and save the trips whose weather changed.
+
+        Args:
+            trips (list[TripModel]): The upcoming trips.
+            destinations (dict[tuple[str, str], list[TripModel]]): The trips keyed by destination.
+            status (dict[str, Any]): The status to report the progress to.
+        """
+        status.update(
+            started_at=Utils.to_date_string(datetime.now()),
+            finished_at=None,
+            duration_s=None,
+            cities_total=len(destinations),
+            cities_done=0,
+            cities_failed=0,
+            trips_total=len(trips),
+            trips_updated=0,
+            errors=[],
+        )
+        _log(
+            f"[WeatherRefresher] Refreshing {len(trips)} trips in {len(destinations)} cities..."
+        )
+
+        forecasts = self._fetch_forecasts(list(destinations.keys()))
+
+        # The users may have changed the trips during the fetches, so only the weather of
+        # their latest saved version is replaced
+        for destination, destination_trips in destinations.items():
+            if destination not in forecasts:
+                continue
+            forecast_index = ForecastIndex(forecasts[destination])
+            for trip in destination_trips:
+                if self._patch_weather(trip, forecast_index) and self.trip_data.patch(
+                    trip.id, lambda latest: self._patch_weather(latest, forecast_index)
+                ):
+                    status["trips_updated"] += 1
+
+    def get_upcoming_trips(self, trips: list[TripModel]) -> list[TripModel]:
+        """
+        Filter the trips whose dates overlap the forecast horizon.
+
+        Args:
+            trips (list[TripModel]): The trips to filter.
+
+        Returns:
+            list[TripModel]: The upcoming trips.
+        """
+        today = datetime.now().date()
+        horizon = today + timedelta(days=self.horizon_days)
+        return [
+            trip
+            for trip in trips
+            if ForecastIndex.to_date(trip.start_date) <= horizon
+            and ForecastIndex.to_date(trip.end_date) >= today
+        ]
+
+    def get_status(self) -> dict[str, Any]:
+        """
+        Get the progress and the metrics of the last run.
+
+        Returns:
+            dict[str, Any]: The refresh status.
+        """
+        status = WeatherRefresher._status
+        return {**status, "errors": list(status["errors"])}
+
+    # --------------------------
+    # Utils
+    # --------------------------
+
+    def _fetch_forecasts(
+        self, destinations: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], list[ForecastModel]]:
+        """
+        Fetch the daily forecasts of the destinations concurrently.
+
+        Args:
+            destinations (list[tuple[str, str]]): The (city, state) destinations.
+
+        Returns:
+            dict[tuple[str, str], list[ForecastModel]]: The forecasts of the destinations that did not fail.
+        """
+        status = WeatherRefresher._status
+        forecasts = {}
+        if not destinations:
+            return forecasts
+
+        open_weather_map = OpenWeatherMap()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                # Fresh forecasts, the cache may still serve the expired ones
+                executor.submit(
+                    open_weather_map.get_forecast_for_next_5_days,
+                    city,
+                    state,
+                    fresh=True,
+                ): (city, state)
+                for city, state in destinations
+            }
+            for future in as_completed(futures):
+                destination = futures[future]
+                try:
+                    forecasts[destination] = future.result()
+                except Exception as e:
+                    status["cities_failed"] += 1
+                    status["errors"].append(f"{destination[0]}, {destination[1]}: {e}")
+                    _log(
+                        f"[WeatherRefresher] Error fetching {destination}: {e}",
+                        level="ERROR",
+                    )
+                status["cities_done"] += 1
+
+        return forecasts
+
+    def _group_by_destination(
+        self, trips: list[TripModel]
+    ) -> dict[tuple[str, str], list[TripModel]]:
+        """
+        Group the trips by destination.
+
+        Args:
+            trips (list[TripModel]): The trips to group.
+
+        Returns:
+            dict[tuple[str, str], list[TripModel]]: The trips keyed by (city, state).
+        """
+        destinations = {}
+        for trip in trips:
+            destination = (trip.destination_city, trip.destination_state)
+            destinations.setdefault(destination, []).append(trip)
+        return destinations
+
+    def _patch_weather(self, trip: TripModel, forecast_index: ForecastIndex) -> bool:
+        """
+        Replace the trip weather with the forecasts within the trip dates.
+
+        Args:
+            trip (TripModel): The trip to patch.
+            forecast_index (ForecastIndex): The destination forecasts.
+
+        Returns:
+            bool: True if the weather changed.
+        """
+        weather = [
+            forecast.model_copy(update={"date": Utils.to_datetime(forecast.date)})
+            for forecast in forecast_index.between(trip.start_date, trip.end_date)
+        ]
+        current = [forecast.model_dump() for forecast in trip.weather or []]
+        if not weather or current == [forecast.model_dump() for forecast in weather]:
+            return False
+
+        trip.weather = ForecastSeries(weather)
+        return True
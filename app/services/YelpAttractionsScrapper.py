@@ -1,8 +1,13 @@
-import requests
-import bs4
+import re
+import httpx
+import lxml.html
 import streamlit as st
 
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree
+
 from services.AppData import AppData
+from services.HttpClient import HttpClient
 from services.Logger import SimpleLogger
 from lib.Utils import Utils
 
@@ -10,8 +15,13 @@ from models.Attraction import AttractionModel
 
 
 class YelpAttractionsScrapper:
+    # Compiled once, the search pages have ~10 cards each
+    XPATH_CARDS = etree.XPath('//li//div[@data-testid="serp-ia-card"]')
+    XPATH_ANCHOR = etree.XPath('.//a[starts-with(@href, "/biz/")][.//img]')
+    XPATH_REVIEWS = etree.XPath('.//span[contains(text(), " reviews)")]')
+
     def __init__(self):
-        return None
+        self.concurrency = int(AppData().get_config("yelp_concurrency") or 4)
 
     @st.cache_data(ttl=86400, show_spinner=False)
     def get_near_attractions(
@@ -29,78 +39,103 @@ class YelpAttractionsScrapper:
             city_name (str): The name of the city.
             state_name (str): The name of the state.
             start (int, optional): The starting index of the attractions to retrieve. Defaults to 0 (Yelp outputs 10 cards for each page).
-            limit (int, optional): The maximum number of attractions to retrieve. Defaults to 50.
-            recursive (bool, optional): Whether to recursively fetch more attractions if the limit is not reached. Defaults to True.
+            limit (int, optional): The maximum number of attractions to retrieve. Defaults to 18.
+            recursive (bool, optional): Whether to fetch the next pages if the limit is not reached. Defaults to True.
 
         Returns:
             list[Attraction]: A list of Attraction objects.
         """
+        # Yelp outputs 10 cards for each page, fetch all the pages we need at once
+        pages = range(start, start + limit, 10) if recursive else [start]
         search_query = Utils.url_encode(f"{city_name}, {state_name}")
-        url = f"https://www.yelp.com.br/search?hl=pt_BR&find_desc=&find_loc={search_query}&start={start}"
-        html = _self._fetch_html(url)
+        urls = [
+            f"https://www.yelp.com.br/search?hl=pt_BR&find_desc=&find_loc={search_query}&start={page}"
+            for page in pages
+        ]
+
+        with ThreadPoolExecutor(max_workers=_self.concurrency) as executor:
+            futures = [executor.submit(_self._fetch_html, url) for url in urls]
+
+            cards = []
+            for i, future in enumerate(futures):
+                try:
+                    html = future.result()
+                except httpx.HTTPError as e:
+                    # Without the first page there is nothing to return
+                    if i == 0:
+                        raise
+                    SimpleLogger().log_error(f"Error fetching {urls[i]}: {e}")
+                    break
+
+                # Stop at the first page without cards (The end of the results)
+                page_cards = _self._parse_attractions(html, city_name, state_name)
+                if not page_cards:
+                    break
+                cards.extend(page_cards)
+
+            for future in futures:
+                future.cancel()
+
+        cards = cards[:limit]
+        SimpleLogger().log_info(
+            f"Found {len(cards)} attractions in {city_name}, {state_name}"
+        )
+
+        # Return the cards
+        return cards
+
+    def _parse_attractions(
+        self, html: str, city_name: str, state_name: str
+    ) -> list[AttractionModel]:
+        """
+        Extracts the attractions of a search page.
+
+        Args:
+            html (str): The HTML content of the search page.
+            city_name (str): The name of the city.
+            state_name (str): The name of the state.
 
-        soup = bs4.BeautifulSoup(html, "html.parser")
-        attractions = soup.select('li div[data-testid="serp-ia-card"]')
-        if not attractions:
-            return {}
+        Returns:
+            list[AttractionModel]: The attractions of the page.
+        """
+        if not html:
+            return []
 
         cards = []
-        for attraction in attractions:
-            anchor = attraction.select_one('a[href^="/biz/"]:has(img)')
-            # Review are inside a font element with text (x reviews)
-            reviews = attraction.select("span")
-            review_text = ""
+        for attraction in self.XPATH_CARDS(lxml.html.fromstring(html)):
+            anchor = next(iter(self.XPATH_ANCHOR(attraction)), None)
+            if anchor is None:
+                continue
+            image = anchor.find(".//img")
+
+            # Review are inside a span element with text (x reviews), after the stars
+            review_count = 0
             review_stars = -1
-            for review in reviews:
-                if " reviews)" in review.text:
-                    review_text = review.text.replace(" reviews)", "").replace("(", "")
-                    review_count = int(review_text)
-                    review_stars = 0
-                    review_stars = float(review.previous_sibling.text)
-                    if review_stars > 5 or review_stars < 0:
-                        review_stars = -1
+            for review in self.XPATH_REVIEWS(attraction):
+                review_count = int(re.sub(r"\D", "", review.text_content()) or 0)
+                stars = review.getprevious()
+                try:
+                    review_stars = float(stars.text_content().replace(",", "."))
+                except (AttributeError, ValueError):
+                    review_stars = -1
+                if review_stars > 5 or review_stars < 0:
+                    review_stars = -1
 
             # Create an Attraction object
             card = AttractionModel(
                 **{
-                    "name": anchor.select_one("img")["alt"],
+                    "name": image.get("alt", ""),
                     "city_name": city_name,
                     "state_name": state_name,
-                    "url": f"https://www.yelp.com{anchor['href']}",
+                    "url": f"https://www.yelp.com{anchor.get('href')}",
                     "review_count": review_count,
                     "review_stars": review_stars,
                     "description": "",
-                    "image": anchor.select_one("img")["src"],
+                    "image": image.get("src", ""),
                 }
             )
-
             cards.append(card)
 
-            # We used this in case the limit is less than what the page has
-            if len(cards) >= limit:
-                break
-
-        SimpleLogger().log_info(
-            f"Found {len(cards)} attractions in {city_name}, {state_name}"
-        )
-
-        # Handle limit, by calling the function recursively to get more cards
-        while recursive and len(cards) < limit:
-            _limit = limit - len(cards)
-            _start = start + 10
-            _cards = _self.get_near_attractions(
-                city_name=city_name,
-                state_name=state_name,
-                start=_start,
-                limit=_limit,
-                recursive=False,
-            )
-            if _cards:
-                cards.extend(_cards)
-            else:
-                break
-
-        # Return the cards
         return cards
 
     # --------------------------
@@ -118,7 +153,7 @@ class YelpAttractionsScrapper:
             str: The HTML content of the response.
 
         Raises:
-            requests.HTTPError: If there is an HTTP error during the request.
+            httpx.HTTPError: If there is an HTTP error during the request.
         """
 
         # Apply hardcoded proxy for now
@@ -134,7 +169,7 @@ class YelpAttractionsScrapper:
 
         url = proxy_prefix + url
 
-        response = requests.get(url)
+        response = HttpClient().get(url)
         response.raise_for_status()
 
         return response.text
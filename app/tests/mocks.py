@@ -26,12 +26,12 @@ def mock_trip_dict() -> dict:
         "title": "Teste",
         "origin_city": "\u00c1guas de Santa B\u00e1rbara",
         "origin_state": "SP",
-        "origin_longitude": -22.8812164,
-        "origin_latitude": -49.2397734,
+        "origin_latitude": -22.8812164,
+        "origin_longitude": -49.2397734,
         "destination_city": "Arraial do Cabo",
         "destination_state": "RJ",
-        "destination_longitude": -22.9667613,
-        "destination_latitude": -42.0277716,
+        "destination_latitude": -22.9667613,
+        "destination_longitude": -42.0277716,
         "travel_by": "driving",
         "start_date": start_date,
         "end_date": end_date,
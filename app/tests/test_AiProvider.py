@@ -1,6 +1,11 @@
 from lib.Utils import Utils
 
+import os
 import pytest
+import torch
+
+from unittest.mock import patch
+from transformers import AutoModelForSequenceClassification, BertConfig
 
 from services.AiProvider import AiProvider
 from services.Logger import _log
@@ -8,6 +13,7 @@ from services.HuggingFaceProvider import HuggingFaceProvider
 from services.GeminiProvider import GeminiProvider
 from services.OpenAIProvider import OpenAIProvider
 from services.SentimentAnalysisProvider import SentimentAnalyzer
+from services.LocalInference import LocalInference
 
 from tests.mocks import (
     mock_ai_gen_itinerary_request,
@@ -135,6 +141,17 @@ def test_full_trip_template_replace():
     assert "end_date" in final_prompt
 
 
+def test_template_values_are_not_expanded():
+    ai_provider = AiProvider()
+    ai_provider.prepare(location="Rio %%WEATHER%%", goals="Praia")
+
+    final_prompt = ai_provider._generate_prompt_from_template(
+        base_prompt="%%LOCATION%% | %%GOALS%% | %%WEATHER%%"
+    )
+
+    assert final_prompt == "Rio  | * Praia | %%WEATHER%%"
+
+
 def test_generate_final_prompt():
     ai_provider = AiProvider()
     itinerary_request = mock_ai_gen_itinerary_request()
@@ -339,6 +356,46 @@ def test_openai_generate_trip_summary():
     assert trip_summary != ""
 
 
+# --------------------------
+# LocalInference Tests
+# --------------------------
+def test_local_inference_default_backend():
+    # The int8 and ONNX backends are opt-in, they change the model outputs
+    assert LocalInference().backend == "pytorch"
+    with patch.dict(os.environ, {"__CONFIG_OVERRIDE_ai_inference_backend": ""}):
+        assert LocalInference().backend == "pytorch"
+
+
+def test_local_inference_quantized_cache(tmp_path):
+    config = BertConfig(
+        vocab_size=100,
+        hidden_size=32,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=64,
+    )
+    model_class = AutoModelForSequenceClassification
+
+    with patch.dict(
+        os.environ, {"__CONFIG_OVERRIDE_ai_model_cache_dir": str(tmp_path)}
+    ), patch.object(
+        model_class,
+        "from_pretrained",
+        side_effect=lambda *args, **kwargs: model_class.from_config(config),
+    ) as from_pretrained:
+        inference = LocalInference(backend="quantized")
+        quantized = inference._load_quantized("tiny-bert", "sentiment-analysis")
+
+        # The cached model is rebuilt from its config and weights only
+        with patch("torch.load", wraps=torch.load) as load:
+            cached = inference._load_quantized("tiny-bert", "sentiment-analysis")
+        assert from_pretrained.call_count == 1
+        assert load.call_args.kwargs["weights_only"] is True
+
+    input_ids = torch.randint(0, 100, (1, 8))
+    assert torch.equal(quantized(input_ids).logits, cached(input_ids).logits)
+
+
 # --------------------------
 # Sentiment Analysis Tests
 # --------------------------
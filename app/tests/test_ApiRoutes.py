@@ -1,3 +1,6 @@
+import sqlite3
+
+from contextlib import closing
 from fastapi.testclient import TestClient
 from fastapi import status
 from unittest.mock import patch
@@ -6,7 +9,7 @@ from routers.api import app, ApiKeyHandler
 from services.TripData import TripData
 from services.Trip import Trip
 
-from tests.mocks import mock_trip_dict
+from tests.mocks import mock_trip_dict, mock_attraction
 
 # Create a test client for the FastAPI app
 client = TestClient(app)
@@ -29,6 +32,68 @@ def test_no_api_key():
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
+@patch("routers.api.ApiKeyHandler._get_raw_keys")
+def test_api_key_table(mock__get_raw_keys):
+    mock__get_raw_keys.return_value = demo_key
+    api_key_handler = ApiKeyHandler()
+    api_key_handler.check_interval = 0
+
+    assert api_key_handler.get_user_id(demo_key) == user_id
+    assert api_key_handler.get_user_id(demo_key[:-1] + "1") is None
+    assert api_key_handler.get_user_id("A" * 32 + ":0") is None
+    assert api_key_handler.get_user_id(None) is None
+
+    # Built again when the keys change
+    other_key = "0123456789ABCDEFGHIJKLMNOPQRSTUV:7"
+    mock__get_raw_keys.return_value = f"{demo_key},{other_key}"
+    assert api_key_handler.get_user_id(other_key) == 7
+
+
+@patch("routers.api.ApiKeyHandler._get_raw_keys")
+def test_api_keys_file(mock__get_raw_keys, tmpdir):
+    mock__get_raw_keys.return_value = demo_key
+    api_key_handler = ApiKeyHandler()
+    api_key_handler.check_interval = 0
+    text_key = "0123456789ABCDEFGHIJKLMNOPQRSTUV:7"
+    sqlite_key = "ZYXWVUTSRQPONMLKJIHGFEDCBA987654:8"
+
+    # Text file
+    keys_file = tmpdir.join("keys.txt")
+    keys_file.write(f"# Keys\n{text_key}\ninvalid\n")
+    api_key_handler.keys_file = str(keys_file)
+    assert api_key_handler.get_user_id(text_key) == 7
+    assert api_key_handler.get_user_id(demo_key) == user_id
+
+    # SQLite database, storing the token hashes
+    keys_file = str(tmpdir.join("keys.db"))
+    with closing(sqlite3.connect(keys_file)) as connection:
+        connection.execute(
+            "CREATE TABLE api_keys (token_sha256 TEXT PRIMARY KEY, user_id INTEGER)"
+        )
+        token_sha256 = ApiKeyHandler.hash_token(sqlite_key.split(":")[0]).hex()
+        connection.execute("INSERT INTO api_keys VALUES (?, 8)", (token_sha256,))
+        connection.commit()
+    api_key_handler.keys_file = keys_file
+    assert api_key_handler.get_user_id(sqlite_key) == 8
+    assert api_key_handler.get_user_id(text_key) is None
+
+    api_key_handler.reload()
+
+
+@patch("services.TripData.TripData.get_user_trips")
+@patch("routers.api.ApiKeyHandler._get_raw_keys")
+def test_api_key_request_user(mock__get_raw_keys, mock_trip_data_get_user_trips):
+    # The user_id of the key is kept in the request state
+    other_key = "0123456789ABCDEFGHIJKLMNOPQRSTUV:7"
+    mock__get_raw_keys.return_value = f"{demo_key},{other_key}"
+    mock_trip_data_get_user_trips.return_value = []
+    ApiKeyHandler().reload()
+
+    response = client.get("/trips", headers={"X-API-Key": other_key})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    mock_trip_data_get_user_trips.assert_called_once_with(user_id=7, limit=10)
+
+
 # --------------------------
 # Trip API
 # --------------------------
@@ -113,3 +178,93 @@ def test_sentiment_analysis(mock__get_raw_keys):
     )
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["sentiment"] == "POSITIVE"
+
+
+# --------------------------
+# Weather API
+# --------------------------
+@patch("routers.api.WeatherRefresher")
+@patch("routers.api.ApiKeyHandler._get_raw_keys")
+def test_refresh_weather_admin(mock__get_raw_keys, mock_refresher):
+    mock__get_raw_keys.return_value = demo_key
+    mock_refresher.return_value.get_status.return_value = {"running": True}
+
+    # Only the admin users can start a refresh or see its status
+    for method in (client.post, client.get):
+        response = method("/weather/refresh", headers=headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    mock_refresher.assert_not_called()
+
+    with patch.dict("os.environ", {"__CONFIG_OVERRIDE_api_admin_user_ids": "0"}):
+        response = client.post("/weather/refresh", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"running": True}
+
+
+# --------------------------
+# Attractions API
+# --------------------------
+@patch("services.AttractionsData.AttractionsData.search")
+@patch("routers.api.ApiKeyHandler._get_raw_keys")
+def test_search_attractions(mock__get_raw_keys, mock_search):
+    mock__get_raw_keys.return_value = demo_key
+    mock_search.return_value = [mock_attraction()]
+
+    response = client.get("/attractions/search?q=praia&limit=500", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()[0]["name"] == mock_attraction().name
+    mock_search.assert_called_once_with("praia", limit=50)
+
+    response = client.get("/attractions/search?q=%20", headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@patch("routers.api.GooglePlacesAttractionsScrapper")
+@patch("routers.api.ApiKeyHandler._get_raw_keys")
+def test_collect_image_garbage_admin(mock__get_raw_keys, mock_scrapper):
+    mock__get_raw_keys.return_value = demo_key
+    mock_scrapper.return_value.collect_image_garbage.return_value = 3
+    mock_scrapper.return_value.get_image_cache_stats.return_value = {"files": 1}
+
+    # Only the admin users can remove images
+    response = client.post("/attractions/images/gc", headers=headers)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    mock_scrapper.return_value.collect_image_garbage.assert_not_called()
+
+    with patch.dict("os.environ", {"__CONFIG_OVERRIDE_api_admin_user_ids": "0"}):
+        response = client.post("/attractions/images/gc", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"removed": 3, "files": 1}
+
+
+# --------------------------
+# Cities API
+# --------------------------
+@patch("routers.api.ApiKeyHandler._get_raw_keys")
+def test_suggest_cities(mock__get_raw_keys):
+    mock__get_raw_keys.return_value = demo_key
+
+    with patch("services.CityAutocomplete.CityAutocomplete.suggest") as mock_suggest:
+        mock_suggest.return_value = [
+            {"city": "São Paulo", "uf": "SP", "state": "São Paulo", "trips": 2}
+        ]
+        response = client.get("/cities/suggest?q=sao&limit=500", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[0]["city"] == "São Paulo"
+        mock_suggest.assert_called_once_with("sao", limit=50)
+
+    response = client.get("/cities/suggest?q=%20", headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@patch("services.Trip.Trip.__init__")
+@patch("routers.api.ApiKeyHandler._get_raw_keys")
+def test_create_user_trip_unknown_city(mock__get_raw_keys, mock_trip_init):
+    mock__get_raw_keys.return_value = demo_key
+
+    # Rejected before any network call, with suggestions
+    trip_dict = {**mock_trip_dict(), "destination_city": "Arraial do Cabu"}
+    response = client.post("/trip", headers=headers, json=trip_dict)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "Arraial do Cabo - RJ" in response.json()["detail"]
+    mock_trip_init.assert_not_called()
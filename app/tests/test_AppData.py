@@ -8,7 +8,10 @@ from services.AppData import AppData
 
 @pytest.fixture
 def app_data():
-    return AppData()
+    # The config file is parsed once per process, parse the mocked files instead
+    AppData._config = None
+    yield AppData()
+    AppData._config = None
 
 
 # --------------------------
@@ -83,6 +86,26 @@ def test_get_config_no_override(app_data, tmpdir):
             assert result == "./data/02_processed/"
 
 
+def test_get_config_reload(app_data, tmpdir):
+    config_file = tmpdir.join("cfg.json")
+    config_file.write(json.dumps({"weather_concurrency": 8}))
+
+    with mock.patch.multiple(
+        AppData, CONFIG_FILE=str(config_file), CONFIG_CHECK_INTERVAL=0
+    ):
+        # Parsed once, then served from memory while the file is unchanged
+        with mock.patch("json.load", wraps=json.load) as mock_json_load:
+            assert app_data.get_config("weather_concurrency") == 8
+            assert AppData().get_config("weather_concurrency") == 8
+            assert mock_json_load.call_count == 1
+
+        # Parsed again when the file changes
+        config_file.write(json.dumps({"weather_concurrency": 16}))
+        stat = os.stat(config_file)
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert app_data.get_config("weather_concurrency") == 16
+
+
 def test_get_api_key_found(app_data):
     with mock.patch.dict(os.environ, {"GOOGLEMAPS_API_KEY": "test_api_key"}):
         result = app_data.get_api_key("googlemaps")
@@ -212,6 +235,39 @@ def test_delete_data_success(app_data, tmpdir):
             assert result is True
 
 
+def test_get_data_checksum(app_data, tmpdir):
+    save_path = tmpdir.join("trip")
+    save_path.mkdir()
+    data = json.dumps({"destination": "Paris", "duration": 7})
+    save_path.join("checksum_valid.json").write(app_data.add_checksum(data, "v1"))
+    save_path.join("checksum_modified.json").write(
+        app_data.add_checksum(data, "v1").replace("7", "8")
+    )
+    save_path.join("checksum_forged.json").write(
+        json.dumps({"_schema": "v1", "destination": "Paris"})
+    )
+
+    with mock.patch.object(
+        app_data, "_get_storage_map", return_value={"trip": str(save_path)}
+    ):
+        # Only the data saved with a valid checksum has its schema version
+        assert app_data.get("trip", "checksum_valid") == {
+            "_schema": "v1",
+            "destination": "Paris",
+            "duration": 7,
+        }
+        assert app_data.get("trip", "checksum_modified") == {
+            "destination": "Paris",
+            "duration": 8,
+        }
+        assert app_data.get("trip", "checksum_forged") == {"destination": "Paris"}
+
+        # A checksum made with another secret key is not trusted
+        text = save_path.join("checksum_valid.json").read()
+        with mock.patch.object(AppData, "_checksum_key", b"another key"):
+            assert "_schema" not in app_data._verify_checksum(text, json.loads(text))
+
+
 def test_sanitize_id_success(app_data):
     raw_id = "My Trip 2023!"
     sanitized_id = app_data.sanitize_id(raw_id)
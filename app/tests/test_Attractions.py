@@ -1,19 +1,27 @@
+import os
+import time
+import io
+import httpx
 import datetime
 import json
 import pytest
 
+from PIL import Image
 from unittest.mock import patch
 
 from lib.Utils import Utils
+from services.AttractionsCatalog import AttractionsCatalog
 from services.AttractionsData import AttractionsData
+from services.AttractionsRefresher import AttractionsRefresher
+from services.HttpClient import HttpClient
+from services.ImageCache import ImageCache
 from services.Logger import _log
 from services.YelpAttractionsScrapper import YelpAttractionsScrapper
 from app.services.GooglePlacesAttractionsScrapper import GooglePlacesAttractionsScrapper
 
 from models.Attraction import AttractionModel
 
-from tests.mocks import mock_attraction, mock_attractions
-
+from tests.mocks import mock_attraction, mock_attractions, mock_trip_model
 
 # --------------------------
 # CRUD Tests
@@ -96,6 +104,221 @@ def test_YelpScrapper_get_near_attractions():
     assert type(results[0]) == AttractionModel
 
 
+YELP_FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "yelp_search.html")
+
+
+# Test parsing a saved Yelp search page
+def test_YelpScrapper_parse_attractions():
+    with open(YELP_FIXTURE, encoding="utf-8") as f:
+        html = f.read()
+
+    cards = YelpAttractionsScrapper()._parse_attractions(html, "São Paulo", "SP")
+
+    assert len(cards) == 10
+    assert cards[0].name == "Parque Ibirapuera"
+    assert str(cards[0].url).startswith("https://www.yelp.com/biz/parque-ibirapuera")
+    assert str(cards[0].image).endswith("/348s.jpg")
+    assert (cards[0].review_count, cards[0].review_stars) == (433, 4.7)
+    # A card without reviews
+    assert (cards[6].review_count, cards[6].review_stars) == (0, -1)
+
+
+# Test fetching the result pages concurrently, until the first empty page
+def test_YelpScrapper_get_near_attractions_pages():
+    with open(YELP_FIXTURE, encoding="utf-8") as f:
+        html = f.read()
+    pages = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        # The Yelp URL is not encoded in the proxy URL, its 'start' is a proxy param
+        start = int(request.url.params["start"])
+        pages.append(start)
+        return httpx.Response(200, text=html if start < 20 else "<html></html>")
+
+    HttpClient.reset(transport=httpx.MockTransport(handler))
+    try:
+        results = YelpAttractionsScrapper().get_near_attractions(
+            city_name="Cidade Teste", state_name="SP", limit=35
+        )
+    finally:
+        HttpClient.reset()
+
+    assert sorted(pages) == [0, 10, 20, 30]
+    assert len(results) == 20
+    assert type(results[0]) == AttractionModel
+
+
+# --------------------------
+# AttractionsCatalog Tests
+# --------------------------
+
+
+def save_attractions_file(folder, slug, city_name, state_name, names, points=None):
+    attractions = []
+    for i, name in enumerate(names):
+        attraction = mock_attraction()
+        attraction.id, attraction.name = f"{slug}-{name}", name
+        attraction.city_name, attraction.state_name = city_name, state_name
+        if points:
+            attraction.latitude, attraction.longitude = points[i]
+        attractions.append(json.loads(attraction.model_dump_json()))
+    with open(folder / f"{slug}.json", "w", encoding="utf-8") as f:
+        json.dump(attractions, f)
+
+
+# Test the indexes and the incremental reload of the catalog
+def test_AttractionsCatalog_reload(tmp_path):
+    save_attractions_file(tmp_path, "rj_paraty", "Paraty", "RJ", ["a", "b"])
+    save_attractions_file(tmp_path, "rj_niteroi", "Niterói", "RJ", ["c"])
+    save_attractions_file(tmp_path, "sp_santos", "Santos", "SP", ["d"])
+    catalog = AttractionsCatalog(str(tmp_path), snapshot_path="", check_interval=0)
+
+    assert catalog.reload() == 3
+    assert [a.name for a in catalog.get("rj_paraty")] == ["a", "b"]
+    assert catalog.get("rj_unknown") is None
+    assert catalog.get_by_id("sp_santos-d").city_name == "Santos"
+    assert len(catalog.get_by_city("Paraty", "RJ")) == 2
+    assert len(catalog.get_by_state("RJ")) == 3
+    assert catalog.get_cities() == [
+        ("Niterói", "RJ"),
+        ("Paraty", "RJ"),
+        ("Santos", "SP"),
+    ]
+    assert len(catalog.get_all()) == 4
+
+    # Only the modified and deleted files are reloaded
+    save_attractions_file(tmp_path, "sp_santos", "Santos", "SP", ["d", "e"])
+    os.remove(tmp_path / "rj_niteroi.json")
+    with patch.object(
+        AttractionsCatalog, "_load_file", wraps=catalog._load_file
+    ) as load_file:
+        assert catalog.reload() == 2
+        load_file.assert_called_once_with("sp_santos")
+
+    assert catalog.get_by_id("rj_niteroi-c") is None
+    assert len(catalog.get_by_city("Santos", "SP")) == 2
+    assert catalog.reload() == 0
+
+
+# Test that a new process loads the catalog from the snapshot without parsing the files
+def test_AttractionsCatalog_snapshot(tmp_path):
+    folder = tmp_path / "attractions"
+    folder.mkdir()
+    save_attractions_file(folder, "rj_paraty", "Paraty", "RJ", ["a", "b"])
+    snapshot_path = str(tmp_path / "catalog.json")
+    catalog = AttractionsCatalog(str(folder), snapshot_path, check_interval=0)
+    assert catalog.reload() == 1
+
+    AttractionsCatalog._catalogs.pop(str(folder))
+    with patch.object(AttractionsCatalog, "_load_file") as load_file:
+        attractions = catalog.get("rj_paraty")
+        load_file.assert_not_called()
+
+    assert [a.name for a in attractions] == ["a", "b"]
+    assert str(attractions[0].url) == str(mock_attraction().url)
+
+    # A snapshot of another AttractionModel schema is not loaded
+    AttractionsCatalog._catalogs.pop(str(folder))
+    with patch.object(
+        AttractionsCatalog, "_snapshot_version", "other-schema"
+    ), patch.object(
+        AttractionsCatalog, "_load_file", wraps=catalog._load_file
+    ) as load_file:
+        assert [a.name for a in catalog.get("rj_paraty")] == ["a", "b"]
+        load_file.assert_called_once_with("rj_paraty")
+
+    # A snapshot with invalid attractions is not loaded either
+    with open(snapshot_path, "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    snapshot["version"] = AttractionsCatalog.get_snapshot_version()
+    snapshot["files"]["rj_paraty"]["attractions"] = [{"name": ["not", "a", "name"]}]
+    with open(snapshot_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+
+    AttractionsCatalog._catalogs.pop(str(folder))
+    with patch.object(
+        AttractionsCatalog, "_load_file", wraps=catalog._load_file
+    ) as load_file:
+        assert [a.name for a in catalog.get("rj_paraty")] == ["a", "b"]
+        load_file.assert_called_once_with("rj_paraty")
+
+
+# Test the accent insensitive search, ranked by relevance and popularity
+def test_AttractionsCatalog_search(tmp_path):
+    save_attractions_file(tmp_path, "ba_salvador", "Salvador", "BA", ["Farol da Barra"])
+    save_attractions_file(
+        tmp_path,
+        "ba_mata-de-sao-joao",
+        "Mata de São João",
+        "BA",
+        ["Praia do Forte", "Projeto Tamar"],
+    )
+    catalog = AttractionsCatalog(str(tmp_path), snapshot_path="", check_interval=0)
+
+    assert [a.name for a in catalog.search("praia forte")] == ["Praia do Forte"]
+    assert len(catalog.search("SAO JOAO")) == 2
+    assert [a.name for a in catalog.search("são joão", limit=1)] == ["Praia do Forte"]
+    assert catalog.search("de da do") == []
+    assert catalog.search("montanha") == []
+
+    # The search index is rebuilt after a reload
+    save_attractions_file(tmp_path, "ba_salvador", "Salvador", "BA", ["Praia da Barra"])
+    assert [a.name for a in catalog.search("praia")] == [
+        "Praia da Barra",
+        "Praia do Forte",
+    ]
+
+
+# Test the nearest attractions, placing the ones without coordinates at their city
+@patch("services.TripData.TripData.get_city_coordinates")
+def test_AttractionsCatalog_nearest(get_city_coordinates, tmp_path):
+    get_city_coordinates.return_value = {("Cabo Frio", "RJ"): (-22.879, -42.019)}
+    save_attractions_file(
+        tmp_path,
+        "rj_arraial-do-cabo",
+        "Arraial do Cabo",
+        "RJ",
+        ["Praia do Forno", "Pontal do Atalaia"],
+        points=[(-22.9697, -42.0165), (-22.9891, -41.9903)],
+    )
+    save_attractions_file(tmp_path, "rj_cabo-frio", "Cabo Frio", "RJ", ["Forte"])
+    save_attractions_file(tmp_path, "rj_paraty", "Paraty", "RJ", ["Centro"])
+    catalog = AttractionsCatalog(str(tmp_path), snapshot_path="", check_interval=0)
+
+    nearest = catalog.nearest(-22.966, -42.027, k=2)
+    assert [a.name for a, _ in nearest] == ["Praia do Forno", "Pontal do Atalaia"]
+    assert nearest[0][1] == pytest.approx(1.1, abs=0.1)
+
+    # Paraty has no coordinates, so it is not indexed
+    assert [a.name for a, _ in catalog.within_radius(-22.966, -42.027, 15)] == [
+        "Praia do Forno",
+        "Pontal do Atalaia",
+        "Forte",
+    ]
+    assert catalog.get_city_coordinates()[("Arraial do Cabo", "RJ")] == pytest.approx(
+        (-22.9794, -42.0034)
+    )
+
+    # Saved again with the same places, the attractions are reloaded but not indexed again
+    path = tmp_path / "rj_cabo-frio.json"
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    with patch.object(
+        AttractionsCatalog, "_new_geo_index", wraps=catalog._new_geo_index
+    ) as new_geo_index:
+        assert catalog.reload() == 1
+        assert (
+            catalog.within_radius(-22.879, -42.019, 1)[0][0]
+            is catalog.get("rj_cabo-frio")[0]
+        )
+        new_geo_index.assert_not_called()
+
+        save_attractions_file(
+            tmp_path, "rj_buzios", "Búzios", "RJ", ["Orla"], points=[(-22.75, -41.88)]
+        )
+        assert [a.name for a, _ in catalog.nearest(-22.75, -41.88, k=1)] == ["Orla"]
+        new_geo_index.assert_called_once()
+
+
 # ---------------------------------------------
 # Google Maps Attractions Integration Tests
 # ---------------------------------------------
@@ -118,3 +341,178 @@ def test_GoogleMapsScrapper_get_near_attractions():
     # Assert
     assert len(results) == limit
     assert type(results[0]) == AttractionModel
+
+
+# --------------------------
+# ImageCache Tests
+# --------------------------
+
+
+def test_image_cache(tmp_path):
+    referenced = []
+    image_cache = ImageCache(
+        str(tmp_path), max_bytes=2500, referenced=lambda: referenced
+    )
+    fetched = []
+
+    def fetch(reference):
+        def _fetch():
+            fetched.append(reference)
+            return reference.encode() * 1000
+
+        return _fetch
+
+    # The same reference is fetched once and keyed by its full hash
+    path_a = image_cache.get("photo-reference-a:400", fetch("a"))
+    assert image_cache.get("photo-reference-a:400", fetch("a")) == path_a
+    assert image_cache.get("photo-reference-a:800", fetch("b")) != path_a
+    assert fetched == ["a", "b"]
+    assert os.path.basename(path_a).startswith(
+        image_cache.get_key("photo-reference-a:400")
+    )
+
+    # The least recently used image is evicted when the cache is over its limit
+    os.utime(path_a, (time.time() - 60, time.time() - 60))
+    path_c = image_cache.get("photo-reference-c:400", fetch("c"))
+    assert not os.path.exists(path_a)
+    assert os.path.exists(path_c)
+
+    stats = image_cache.get_stats()
+    assert stats["files"] == 2 and stats["bytes"] == 2000
+
+    # Referenced images are not evicted, even the least recently used ones
+    referenced.append(path_c)
+    ImageCache._referenced.pop(str(tmp_path), None)
+    os.utime(path_c, (time.time() - 60, time.time() - 60))
+    path_d = image_cache.get("photo-reference-d:400", fetch("d"))
+    assert os.path.exists(path_c)
+    assert not os.path.exists(
+        image_cache.get_path(image_cache.get_key("photo-reference-a:800"))
+    )
+    assert os.path.exists(path_d)
+
+    # Unreferenced images are removed
+    assert image_cache.collect_garbage([path_c], min_age=0) == 1
+    assert os.listdir(tmp_path) == [os.path.basename(path_c)]
+    assert image_cache.get("photo-reference-x:400", lambda: None) == ""
+
+
+def mock_jpeg(width: int = 800, height: int = 600) -> bytes:
+    content = io.BytesIO()
+    Image.new("RGB", (width, height), (30, 120, 200)).save(content, format="JPEG")
+    return content.getvalue()
+
+
+def test_image_cache_thumbnail(tmp_path):
+    image_cache = ImageCache(str(tmp_path))
+    image_path = image_cache.get("photo-reference:800", mock_jpeg)
+
+    thumbnail_path = image_cache.get_thumbnail(image_path, width=320)
+    assert thumbnail_path.endswith("-320w.webp")
+    with Image.open(thumbnail_path) as thumbnail:
+        assert thumbnail.format == "WEBP" and thumbnail.size == (320, 240)
+
+    # Thumbnails are kept and collected with their image
+    assert image_cache.collect_garbage([image_path], min_age=0) == 0
+    assert image_cache.collect_garbage([], min_age=0) == 2
+
+    # Not cached images are served as they are
+    url = "https://s3-media0.fl.yelpcdn.com/bphoto/348s.jpg"
+    assert image_cache.get_thumbnail(url) == url
+
+
+def test_GoogleMapsScrapper_fetch_photos(tmp_path):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.params["photoreference"])
+        return httpx.Response(200, content=mock_jpeg())
+
+    HttpClient.reset(transport=httpx.MockTransport(handler))
+    try:
+        scrapper = GooglePlacesAttractionsScrapper(
+            api_key="test", image_cache_dir=str(tmp_path)
+        )
+        images = scrapper.fetch_photos(
+            ["reference-a", "", "reference-b", "reference-a"]
+        )
+    finally:
+        HttpClient.reset()
+
+    assert images[1] == "" and images[0] == images[3] != images[2]
+    assert sorted(requests) == ["reference-a", "reference-b"]
+    assert len(list(tmp_path.glob("*.webp"))) == 2
+
+
+# --------------------------
+# AttractionsRefresher Tests
+# --------------------------
+
+
+# Test that concurrent refreshes of the same city run once
+def test_AttractionsRefresher_refresh_in_background(tmp_path, monkeypatch):
+    monkeypatch.setenv("__CONFIG_OVERRIDE_temp_storage_dir", str(tmp_path))
+    calls = []
+
+    def refresh(self, city_name, state_name, start=0, limit=18):
+        calls.append((city_name, state_name))
+        time.sleep(0.2)
+        return mock_attractions()
+
+    with patch.object(AttractionsRefresher, "refresh", refresh):
+        refresher = AttractionsRefresher()
+        assert refresher.refresh_in_background("São Paulo", "SP")
+        assert not refresher.refresh_in_background("São Paulo", "SP")
+        assert refresher.get_status()["refreshing"] == ["sp_sao-paulo"]
+
+        deadline = time.time() + 5
+        while refresher.get_status()["refreshing"] and time.time() < deadline:
+            time.sleep(0.05)
+
+        # Once finished, the city can be refreshed again
+        assert refresher._refresh_once("São Paulo", "SP")
+
+    assert calls == [("São Paulo", "SP")] * 2
+    assert not os.listdir(refresher.locks_dir)
+
+
+# Test that a lock file left by another process skips the refresh
+def test_AttractionsRefresher_lock_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("__CONFIG_OVERRIDE_temp_storage_dir", str(tmp_path))
+    refresher = AttractionsRefresher()
+    os.makedirs(refresher.locks_dir, exist_ok=True)
+    lock_path = refresher._get_lock_path("sp_sao-paulo")
+    open(lock_path, "w").close()
+
+    with patch.object(AttractionsRefresher, "refresh") as refresh:
+        assert not refresher._refresh_once("São Paulo", "SP")
+
+        # Stale locks are taken over
+        os.utime(lock_path, (time.time() - 3600, time.time() - 3600))
+        refresh.return_value = mock_attractions()
+        assert refresher._refresh_once("São Paulo", "SP")
+        refresh.assert_called_once()
+
+
+def test_AttractionsRefresher_popular_destinations():
+    refresher = AttractionsRefresher()
+    refresher.top = 2
+    trips = []
+    for city, state, count in (
+        ("Rio", "RJ", 1),
+        ("Curitiba", "PR", 3),
+        ("Natal", "RN", 2),
+    ):
+        for _ in range(count):
+            trip = mock_trip_model()
+            trip.destination_city, trip.destination_state = city, state
+            trips.append(trip)
+
+    assert refresher.get_popular_destinations(trips) == [
+        ("Curitiba", "PR"),
+        ("Natal", "RN"),
+    ]
+
+    created_at = datetime.datetime.now() - datetime.timedelta(days=99)
+    assert not refresher.is_expired(created_at)
+    assert refresher.is_expired(created_at, ahead=86400 * 2)
@@ -1,8 +1,11 @@
 import json
 from unittest.mock import patch, mock_open
+from lib.AutocompleteIndex import AutocompleteIndex
+from services.AppData import AppData
 from services.CityState import CityStateData
+from services.CityAutocomplete import CityAutocomplete
 
-from tests.mocks import mock_city_state_json_data
+from tests.mocks import mock_city_state_json_data, mock_trip_model
 
 
 # --------------------------
@@ -20,7 +23,12 @@ def test_init(mock_open, mock_get_config):
         mock_city_state_json_data()
     )
 
+    # The files are loaded once per process
+    AppData._config = None
+    CityStateData._loaded.clear()
     city_state_data = CityStateData()
+    CityStateData._loaded.clear()
+    AppData._config = None
 
     assert city_state_data.city_state_data == mock_city_state_json_data()
 
@@ -98,3 +106,80 @@ def test_uf_to_state_not_found():
 
     state = city_state_data.uf_to_state("BA")  # Non-existing UF
     assert state == ""
+
+
+def test_city_lookups():
+    city_state_data = CityStateData()
+    city_state_data.city_state_data = mock_city_state_json_data()
+
+    # Case and accent insensitive
+    assert city_state_data.get_cities_by_state("sao paulo") == [
+        "São Paulo",
+        "Campinas",
+        "Santos",
+    ]
+    assert city_state_data.uf_to_state("rj") == "Rio de Janeiro"
+    assert city_state_data.state_to_uf("RIO DE JANEIRO") == "RJ"
+    assert city_state_data.get_city("niteroi", "RJ") == "Niterói"
+    assert city_state_data.get_city("niteroi", "Rio de Janeiro") == "Niterói"
+    assert city_state_data.is_valid_city("São Paulo", "SP")
+    assert not city_state_data.is_valid_city("Niterói", "SP")
+    assert city_state_data.get_ufs_by_city("sao paulo") == ["SP"]
+    assert city_state_data.get_ufs_by_city("Salvador") == []
+
+
+def test_city_state_data_shared():
+    # Loaded once per process, an instance can still replace its own data
+    assert CityStateData()._indexes is CityStateData()._indexes
+    assert "BA" in CityStateData().get_ufs()
+
+    city_state_data = CityStateData()
+    city_state_data.city_state_data = mock_city_state_json_data()
+    assert "BA" not in city_state_data.get_ufs()
+    assert "BA" in CityStateData().get_ufs()
+
+
+# --------------------------
+# City Autocomplete Tests
+# --------------------------
+
+
+def test_autocomplete_index():
+    index = AutocompleteIndex(
+        ["São Paulo", "São Paulo do Potengi", "Paulo Afonso", "Santos", "Niterói"],
+        weights=[0, 0, 0, 0, 0],
+    )
+
+    # Case and accent insensitive, by any word, the names starting with the query first
+    assert index.suggest("sao") == [0, 1]
+    assert index.suggest("PAULO") == [2, 0, 1]
+    assert index.suggest("niteroi") == [4]
+    assert index.suggest("sao paulo d") == [1]
+    assert index.suggest("sao", limit=1) == [0]
+    assert index.suggest("") == []
+
+    # One typo away, only when nothing matches
+    assert index.suggest("snatos") == [3]
+    assert index.suggest("nitroi") == [4]
+    assert index.suggest("xyz") == []
+
+    # The heaviest names first
+    index.set_weights([0, 5, 0, 0, 0])
+    assert index.suggest("sao") == [1, 0]
+
+
+@patch("services.CityAutocomplete.TripData.get_all_trips")
+def test_city_autocomplete(mock_get_all_trips):
+    mock_get_all_trips.return_value = [mock_trip_model()]
+    city_autocomplete = CityAutocomplete(refresh_interval=3600)
+    assert city_autocomplete.refresh_popularity() == 1
+
+    suggestions = city_autocomplete.suggest("arraial", limit=3)
+    assert suggestions[0] == {
+        "city": "Arraial do Cabo",
+        "uf": "RJ",
+        "state": "Rio de Janeiro",
+        "trips": 1,
+    }
+    assert all(suggestion["trips"] == 0 for suggestion in suggestions[1:])
+    assert city_autocomplete.suggest("sao paulo")[0]["city"] == "São Paulo"
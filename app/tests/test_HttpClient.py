@@ -0,0 +1,77 @@
+import httpx
+import pytest
+import threading
+
+from unittest.mock import patch
+
+from services.HttpClient import HttpClient
+from services.OpenAIProvider import OpenAIProvider
+
+
+@pytest.fixture(autouse=True)
+def reset_client():
+    yield
+    HttpClient.reset()
+
+
+# --------------------------
+# HttpClient Tests
+# --------------------------
+
+
+def test_shared_client():
+    assert HttpClient.get_client() is HttpClient.get_client()
+
+
+@patch("services.HttpClient.time.sleep")
+def test_retry_on_server_error(mock_sleep):
+    responses = iter([503, 502, 200])
+
+    def handler(request):
+        return httpx.Response(next(responses), json={"ok": True})
+
+    HttpClient.reset(transport=httpx.MockTransport(handler))
+    data = HttpClient().get_json("https://example.com/api")
+
+    assert data == {"ok": True}
+    assert HttpClient.get_stats()["requests"] == 3
+    assert HttpClient.get_stats()["retries"] == 2
+
+
+@patch("services.HttpClient.time.sleep")
+def test_retry_gives_up(mock_sleep):
+    def handler(request):
+        return httpx.Response(503)
+
+    HttpClient.reset(transport=httpx.MockTransport(handler))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        HttpClient().get_json("https://example.com/api")
+
+    assert HttpClient.get_stats()["retries"] == HttpClient().max_retries
+
+
+def test_stats_threads():
+    HttpClient.reset(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+    def send_requests():
+        for _ in range(50):
+            HttpClient().get("https://example.com/api")
+
+    threads = [threading.Thread(target=send_requests) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert HttpClient.get_stats()["requests"] == 400
+
+
+def test_reset_sdk_clients():
+    client = OpenAIProvider._get_client("test-key")
+    assert OpenAIProvider._get_client("test-key") is client
+
+    # The SDK clients using the closed client are created again
+    HttpClient.reset()
+    assert OpenAIProvider._get_client("test-key") is not client
+    assert not OpenAIProvider._get_client("test-key")._client.is_closed
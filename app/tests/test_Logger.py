@@ -0,0 +1,95 @@
+import json
+import logging
+from unittest.mock import patch
+
+from services.Logger import SimpleLogger, LazyQueueHandler, JsonFormatter, _log
+
+from tests.mocks import mock_trip_model
+
+
+class CountingObject:
+    """
+    An object counting how many times it was serialized.
+    """
+
+    def __init__(self):
+        self.serialized = 0
+
+    def __str__(self):
+        self.serialized += 1
+        return "counting"
+
+
+# --------------------------
+# Logger Tests
+# --------------------------
+
+
+@patch.object(LazyQueueHandler, "enqueue")
+def test_log_lazy_object(mock_enqueue):
+    logger = SimpleLogger()
+    obj = CountingObject()
+
+    # Disabled level: dropped before the object is serialized
+    logger.set_level("INFO", module=__name__)
+    _log("[Test] Disabled", obj=obj, level="DEBUG")
+    mock_enqueue.assert_not_called()
+    assert obj.serialized == 0
+
+    # Enabled level: serialized by the caller, then queued
+    logger.set_level("DEBUG", module=__name__)
+    _log("[Test] Enabled", obj=obj, level="DEBUG")
+    record = mock_enqueue.call_args[0][0]
+    assert obj.serialized == 1
+
+    line = json.loads(JsonFormatter().format(record))
+    assert line["level"] == "DEBUG"
+    assert line["module"] == __name__
+    assert line["message"] == "[Test] Enabled"
+    assert line["obj"] == "counting"
+    assert obj.serialized == 1
+
+    # The object is written as it was when logged
+    trip = {"title": "Before"}
+    _log("[Test] Changed", obj=trip)
+    trip["title"] = "After"
+    record = mock_enqueue.call_args[0][0]
+    assert json.loads(JsonFormatter().format(record))["obj"] == {"title": "Before"}
+
+    logging.getLogger(f"{SimpleLogger.LOGGER_NAME}.{__name__}").setLevel(logging.NOTSET)
+
+
+@patch.object(LazyQueueHandler, "enqueue")
+def test_log_debug_sampling(mock_enqueue):
+    logger = SimpleLogger()
+    logger.set_level("DEBUG", module=__name__)
+
+    try:
+        logger.set_debug_sample_rate(0)
+        _log("[Test] Sampled out", level="DEBUG")
+        _log("[Test] Not sampled", level="INFO")
+        assert mock_enqueue.call_count == 1
+
+        logger.set_debug_sample_rate(1)
+        _log("[Test] Sampled in", level="DEBUG")
+        assert mock_enqueue.call_count == 2
+    finally:
+        logger.set_debug_sample_rate(1)
+        logging.getLogger(f"{SimpleLogger.LOGGER_NAME}.{__name__}").setLevel(
+            logging.NOTSET
+        )
+
+
+def test_json_formatter_model():
+    record = logging.LogRecord(
+        "SimpleLogger.services.Trip", logging.INFO, "", 0, "Line\nbreak", (), None
+    )
+    record.obj = mock_trip_model()
+
+    line = JsonFormatter().format(record)
+    assert "\n" not in line
+
+    line = json.loads(line)
+    assert line["module"] == "services.Trip"
+    assert line["message"] == "Line\nbreak"
+    assert line["obj"]["slug"] == mock_trip_model().slug
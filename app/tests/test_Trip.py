@@ -1,11 +1,20 @@
+import os
 import json
 
+from datetime import timedelta
 from unittest.mock import patch
 from services.Trip import Trip
 from services.TripData import TripData
+from services.AttractionsData import AttractionsData
+from services.WeatherRefresher import WeatherRefresher
 from services.Logger import _log
 
-from tests.mocks import mock_trip_dict, mock_trip_csv_new_date
+from tests.mocks import (
+    mock_trip_dict,
+    mock_trip_csv_new_date,
+    mock_trip_model,
+    mock_forecast_list,
+)
 
 # --------------------------
 # CRUD Tests
@@ -55,6 +64,33 @@ def test_update_trip(app_data_save_mock):
     assert trip.model.title == "Updated title"
 
 
+# Test updating the cities of a trip stores their geocoded latitude and longitude
+@patch("services.Trip.Trip._get_coordinates")
+@patch("services.TripData.AppData.save")
+def test_update_trip_coordinates(app_data_save_mock, get_coordinates_mock):
+    app_data_save_mock.return_value = True
+    # Geocoded as (lat, long)
+    get_coordinates_mock.side_effect = lambda city, state: {
+        "São Paulo": (-23.5505199, -46.6333094),
+        "Rio de Janeiro": (-22.9068467, -43.1728965),
+    }[city]
+
+    trip = Trip(trip_data=mock_trip_dict())
+    trip.update(
+        {
+            "origin_city": "São Paulo",
+            "origin_state": "SP",
+            "destination_city": "Rio de Janeiro",
+            "destination_state": "RJ",
+        }
+    )
+
+    assert trip.get("origin_latitude") == -23.5505199
+    assert trip.get("origin_longitude") == -46.6333094
+    assert trip.get("destination_latitude") == -22.9068467
+    assert trip.get("destination_longitude") == -43.1728965
+
+
 # Test deleting a trip
 def test_delete_trip():
     # Create a new trip
@@ -116,6 +152,183 @@ def test_delete_trip_meta(app_data_save_mock):
     assert trip.get_meta("feedback") is None
 
 
+# Test the trip coordinates
+def test_get_trip_coordinates():
+    trip = mock_trip_model()
+    assert TripData.get_coordinates(trip) == (-22.9667613, -42.0277716)
+    assert TripData.get_coordinates(trip, "origin") == (-22.8812164, -49.2397734)
+
+
+# Test swapping back the coordinates of the trips saved swapped by older versions, once
+@patch("services.TripData.LatLong")
+def test_migrate_swapped_coordinates(lat_long_mock, tmp_path):
+    cities = {
+        "\u00c1guas de Santa B\u00e1rbara": (-22.8812164, -49.2397734),
+        "Arraial do Cabo": (-22.9667613, -42.0277716),
+    }
+    lat_long_mock.return_value.get_coordinates.side_effect = lambda city, state: cities[
+        city
+    ]
+    storage = {"__CONFIG_OVERRIDE_temp_storage_dir": str(tmp_path)}
+    with patch.dict(os.environ, storage):
+        trip_data = TripData()
+        swapped_trip = mock_trip_model()
+        swapped_trip.id = "swapped"
+        swapped_trip.destination_latitude, swapped_trip.destination_longitude = (
+            -42.0277716,
+            -22.9667613,
+        )
+        trip_data.save("swapped", swapped_trip)
+        trip = mock_trip_model()
+        trip.id = "in-order"
+        trip_data.save("in-order", trip)
+
+        assert trip_data.migrate_swapped_coordinates() == 1
+        for trip_id in ("swapped", "in-order"):
+            saved = trip_data._to_trip_model(
+                trip_data.app_data.get_versioned("trip", trip_id)[0]
+            )
+            assert TripData.get_coordinates(saved) == (-22.9667613, -42.0277716)
+            assert TripData.get_coordinates(saved, "origin") == (
+                -22.8812164,
+                -49.2397734,
+            )
+
+        # Marked as done, the trips are not read again
+        with patch.object(trip_data.app_data, "get_all_ids") as get_all_ids_mock:
+            assert trip_data.migrate_swapped_coordinates() == 0
+            get_all_ids_mock.assert_not_called()
+
+
+# Test finding the trips with a nearby destination
+@patch("services.TripData.TripData.get_all_trips")
+def test_get_trips_near(get_all_trips_mock):
+    get_all_trips_mock.return_value = [mock_trip_model()]
+
+    assert len(TripData().get_trips_near(-22.88, -42.02, km=15)) == 1
+    assert TripData().get_trips_near(-23.55, -46.63, km=50) == []
+    assert TripData().get_city_coordinates()[("Arraial do Cabo", "RJ")] == (
+        -22.9667613,
+        -42.0277716,
+    )
+
+
+# Test saving the trip attractions as references and resolving them again
+@patch("services.AttractionsData.AttractionsCatalog.get_by_id")
+@patch("services.TripData.AppData.save")
+def test_save_trip_attraction_refs(app_data_save_mock, get_by_id_mock):
+    app_data_save_mock.return_value = True
+    get_by_id_mock.return_value = None
+    trip = mock_trip_model()
+
+    TripData().save(trip.id, trip)
+
+    # The attractions are saved as snapshots, the trip only keeps their references
+    saved = {call.args[0]: call.args[2] for call in app_data_save_mock.call_args_list}
+    trip_data = json.loads(saved["trip"])
+    assert trip_data["attractions"] is None
+    assert [ref["id"] for ref in trip_data["attraction_refs"]] == [
+        attraction.id for attraction in trip.attractions
+    ]
+    assert saved["attraction_snapshots"]
+
+    # Deleted from the catalog, the attractions are resolved from their snapshots
+    assert TripData()._to_trip_model(trip_data).attractions == trip.attractions
+
+
+# Test resolving the attraction references against the catalog first
+@patch("services.AttractionsData.AttractionsCatalog.get_by_id")
+def test_get_trip_attraction_refs(get_by_id_mock):
+    trip = mock_trip_model()
+    attraction = trip.attractions[0].model_copy(update={"name": "Praia Nova"})
+    get_by_id_mock.side_effect = lambda id: attraction if id == attraction.id else None
+
+    AttractionsData._snapshots.clear()
+    with patch("services.AttractionsData.AppData.get") as app_data_get_mock:
+        app_data_get_mock.return_value = trip.attractions[1].model_dump(mode="json")
+        attractions = AttractionsData().from_refs(
+            [
+                {"id": attraction.id, "hash": "0" * 16},
+                {"id": trip.attractions[1].id, "hash": "1" * 16},
+            ]
+        )
+        app_data_get_mock.assert_called_once_with("attraction_snapshots", "1" * 16)
+
+    # The snapshots are loaded from JSON, compare them as JSON
+    assert attractions[0] == attraction
+    assert attractions[1].model_dump(mode="json") == trip.attractions[1].model_dump(
+        mode="json"
+    )
+
+
+# Test migrating the trips with embedded attractions to references, once
+@patch("services.AttractionsData.AttractionsCatalog.get_by_id")
+def test_migrate_attraction_refs(get_by_id_mock, tmp_path):
+    get_by_id_mock.return_value = None
+    storage = {"__CONFIG_OVERRIDE_temp_storage_dir": str(tmp_path)}
+    with patch.dict(os.environ, storage):
+        trip_data = TripData()
+        legacy_trip = mock_trip_model()
+        legacy_trip.id = "legacy"
+        trip_data.app_data.save("trip", "legacy", legacy_trip.model_dump_json())
+        migrated_trip = mock_trip_model()
+        migrated_trip.id = "migrated"
+        trip_data.save("migrated", migrated_trip)
+
+        assert trip_data.migrate_attraction_refs() == 1
+        saved, _ = trip_data.app_data.get_versioned("trip", "legacy")
+        assert saved["attractions"] is None
+        assert len(saved["attraction_refs"]) == len(mock_trip_dict()["attractions"])
+        assert saved["title"] == legacy_trip.title
+
+        # Marked as done, the trips are not read again
+        with patch.object(trip_data.app_data, "get_all_ids") as get_all_ids_mock:
+            assert trip_data.migrate_attraction_refs() == 0
+            get_all_ids_mock.assert_not_called()
+
+
+# Test keeping the attractions embedded when their snapshots can not be saved
+@patch("services.AttractionsData.AppData.exists")
+@patch("services.AttractionsData.AppData.save")
+def test_save_trip_attractions_without_snapshots(app_data_save_mock, exists_mock):
+    app_data_save_mock.return_value = False
+    exists_mock.return_value = False
+    trip = mock_trip_model()
+    # Not a snapshot cached by another test
+    trip.attractions[0].name = "Not saved"
+
+    assert AttractionsData().to_refs(trip.attractions) is None
+
+    saved = json.loads(TripData()._to_json(trip))
+    assert "attraction_refs" not in saved
+    assert len(saved["attractions"]) == len(trip.attractions)
+
+
+# Test loading the trips saved by the current schema through the trusted path
+@patch("services.AttractionsData.AttractionsCatalog.get_by_id")
+@patch("services.TripData.AppData.save")
+def test_load_trusted_trip(app_data_save_mock, get_by_id_mock):
+    app_data_save_mock.return_value = True
+    get_by_id_mock.return_value = None
+    trip = mock_trip_model()
+    TripData().save(trip.id, trip)
+    saved = {call.args[0]: call.args[2] for call in app_data_save_mock.call_args_list}
+
+    app_data = TripData().app_data
+    trusted_data = app_data._verify_checksum(saved["trip"], json.loads(saved["trip"]))
+    modified_data = app_data._verify_checksum(
+        saved["trip"].replace("Arraial", "Arrail"), json.loads(saved["trip"])
+    )
+    assert trusted_data["_schema"] == TripData.get_schema_version()
+    assert "_schema" not in modified_data
+
+    # Both paths load the same trip
+    trusted_trip = TripData()._to_trip_model(trusted_data)
+    validated_trip = TripData()._to_trip_model(modified_data)
+    assert trusted_trip == validated_trip
+    assert trusted_trip.model_dump_json() == trip.model_dump_json()
+
+
 # --------------------------
 # Import/Export Testes
 # --------------------------
@@ -181,3 +394,63 @@ def test_import_trip_json(app_data_save_mock):
 
     # Check if the trip was imported correctly
     assert trip["slug"] == "teste"
+
+
+# --------------------------
+# Weather Refresh Tests
+# --------------------------
+
+
+@patch("services.AttractionsData.AttractionsCatalog.get_by_id")
+@patch("services.WeatherRefresher.OpenWeatherMap")
+@patch("services.WeatherRefresher.TripData.get_all_trips")
+def test_weather_refresher(get_all_trips_mock, weather_mock, get_by_id_mock, tmp_path):
+    get_by_id_mock.return_value = None
+    storage = {"__CONFIG_OVERRIDE_temp_storage_dir": str(tmp_path)}
+    with patch.dict(os.environ, storage):
+        trip_data = TripData()
+
+        # Two upcoming trips to the same city and one trip beyond the forecast horizon
+        upcoming_trips = [mock_trip_model(), mock_trip_model()]
+        for i, trip in enumerate(upcoming_trips):
+            trip.id = f"weather-refresher-{i}"
+            trip.weather = None
+            trip_data.save(trip.id, trip.model_copy())
+        future_trip = mock_trip_model()
+        future_trip.start_date = future_trip.start_date + timedelta(days=30)
+        future_trip.end_date = future_trip.end_date + timedelta(days=30)
+        get_all_trips_mock.return_value = upcoming_trips + [future_trip]
+
+        # A user renames a trip while the forecasts are fetched
+        def rename_trip(trip):
+            trip.title = "Renamed"
+            return True
+
+        def get_forecast(city, state, fresh=False):
+            trip_data.patch(upcoming_trips[0].id, rename_trip)
+            return mock_forecast_list()
+
+        get_forecast_mock = weather_mock.return_value.get_forecast_for_next_5_days
+        get_forecast_mock.side_effect = get_forecast
+
+        status = WeatherRefresher().run()
+
+        # Each city is fetched once and only the upcoming trips are updated
+        get_forecast_mock.assert_called_once_with("Arraial do Cabo", "RJ", fresh=True)
+        assert status["cities_total"] == 1
+        assert status["trips_total"] == 2
+        assert status["trips_updated"] == 2
+        assert not status["running"]
+
+        # The weather is saved over the latest version of the trips
+        saved_trips = [
+            trip_data._to_trip_model(
+                trip_data.app_data.get_versioned("trip", trip.id)[0]
+            )
+            for trip in upcoming_trips
+        ]
+        assert [trip.title for trip in saved_trips] == ["Renamed", "Teste"]
+        assert len(saved_trips[0].weather) == len(mock_forecast_list())
+
+        # Nothing changed, so nothing is written again
+        assert WeatherRefresher().run()["trips_updated"] == 0
@@ -0,0 +1,42 @@
+from datetime import date, datetime, timedelta, timezone
+
+from lib.Utils import Utils
+
+
+# --------------------------
+# Utils Tests
+# --------------------------
+
+
+def test_slugify():
+    assert Utils.slugify("São Paulo") == "sao-paulo"
+    assert Utils.slugify("  Águas de Santa Bárbara, SP ") == "aguas-de-santa-barbara-sp"
+    assert Utils.slugify("Pau D'Arco do Piauí") == "pau-darco-do-piaui"
+    assert Utils.slugify("Itaguaçu da Bahia - BA") == "itaguacu-da-bahia-ba"
+    # Only the known accents become letters, anything else is removed
+    assert Utils.slugify("Ýpsilon_ß Ñandú") == "psilon-nandu"
+    assert Utils.slugify("") == ""
+
+
+def test_slugify_batch():
+    strings = ["São Paulo", "", "Rio de Janeiro, RJ", "Ýpsilon", "--a--b--"]
+    assert Utils.slugify_batch(strings) == [Utils.slugify(s) for s in strings]
+    assert Utils.slugify_batch(iter(strings)) == [Utils.slugify(s) for s in strings]
+    assert Utils.slugify_batch([]) == []
+
+    # Newlines in the strings are not taken as separators
+    assert Utils.slugify_batch(["a\nb", "c"]) == ["ab", "c"]
+
+
+def test_date_strings():
+    assert Utils.to_date_string("2026-01-02T10:30:00") == "2026-01-02T00:00:00"
+    assert (
+        Utils.to_date_string(date(2026, 1, 2), format="iso_date_only") == "2026-01-02"
+    )
+    assert Utils.to_datetime("2026-01-02") == datetime(2026, 1, 2)
+    assert Utils.to_datetime(date(2026, 1, 2)) == datetime(2026, 1, 2)
+
+    # The same instant in other time zones keeps its own time
+    time_utc = datetime(2026, 1, 2, 12, 0, tzinfo=timezone.utc)
+    time_brt = time_utc.astimezone(timezone(timedelta(hours=-3)))
+    assert Utils.to_time_string(time_utc) != Utils.to_time_string(time_brt)
@@ -1,8 +1,23 @@
+import json
+import time
+import httpx
+import pytest
+import asyncio
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from pydantic import ValidationError
+
 from services.Logger import _log
 from views.WeatherView import WeatherView
+from lib.ForecastIndex import ForecastIndex
+from services.ForecastStore import ForecastStore
+from services.OpenWeatherMap import OpenWeatherMap
+from services.AsyncOpenWeatherMap import AsyncOpenWeatherMap
 
-from tests.mocks import mock_forecast_list, mock_trip_model, mock_trip
+from models.Weather import ForecastModel, ForecastSeries
 
+from tests.mocks import mock_forecast_list, mock_trip_model, mock_trip
 
 # --------------------------
 # WeatherView Tests
@@ -22,3 +37,292 @@ def test_render_forecast():
     rendered_forecast = weather_view.render_forecast()
 
     assert rendered_forecast
+
+
+# --------------------------
+# ForecastIndex Tests
+# --------------------------
+
+
+def test_forecast_index():
+    weather = mock_forecast_list()
+    forecast_index = ForecastIndex(weather)
+
+    start_date = mock_trip_model().start_date
+    end_date = mock_trip_model().end_date
+
+    assert forecast_index.get(start_date) == weather[0]
+    assert forecast_index.get(start_date + timedelta(days=1)) is None
+    assert len(forecast_index.between(start_date, end_date)) == len(weather)
+    assert forecast_index.between(end_date, end_date) == [weather[-1]]
+
+
+# --------------------------
+# ForecastSeries Tests
+# --------------------------
+
+
+def test_forecast_series():
+    weather = mock_trip_model().weather
+    forecast_list = [ForecastModel(**forecast.model_dump()) for forecast in weather]
+
+    assert isinstance(weather, ForecastSeries)
+    assert weather.city_name == "Arraial do Cabo"
+    assert len(weather.conditions) == 2
+    assert weather[-1] == forecast_list[-1]
+    assert weather.to_list() == forecast_list
+
+    # Same JSON as a list of ForecastModel objects, without float32 noise
+    dumped = json.loads(mock_trip_model().model_dump_json())["weather"]
+    assert dumped == [forecast.model_dump(mode="json") for forecast in forecast_list]
+    assert dumped[0]["temperature_min"] == 23.27
+    assert dumped[0]["temperature"] is None
+
+
+def test_forecast_series_from_trusted():
+    dumped = json.loads(mock_trip_model().model_dump_json())["weather"]
+    weather = ForecastSeries.from_trusted(dumped)
+
+    assert weather == ForecastSeries(dumped)
+    assert ForecastSeries.serialize(weather) == ForecastSeries.serialize(
+        ForecastSeries(dumped)
+    )
+    assert weather.places == [("Arraial do Cabo", "RJ")]
+
+    # Unexpected data falls back to the full conversion
+    dumped[0]["date"] = "2024-10-21T12:00:00-03:00"
+    assert ForecastSeries.from_trusted(dumped) == ForecastSeries(dumped)
+
+
+def test_forecast_series_validation():
+    dumped = json.loads(mock_trip_model().model_dump_json())["weather"]
+
+    # Plain data is validated like a list of ForecastModel objects
+    for field, value in [
+        ("weather", None),
+        ("city_name", None),
+        ("timestamp", 1.7),
+        ("temperature", "abc"),
+        ("date", "not a date"),
+    ]:
+        forecasts = [dict(forecast) for forecast in dumped]
+        forecasts[0][field] = value
+        with pytest.raises(ValidationError, match=field):
+            ForecastSeries(forecasts)
+
+    # Unix timestamps are valid dates, stored in UTC
+    forecasts = [dict(forecast) for forecast in dumped]
+    forecasts[0]["date"] = 1729026000
+    assert ForecastSeries(forecasts)[0].date == datetime(2024, 10, 15, 21, 0)
+
+
+# --------------------------
+# OpenWeatherMap Tests
+# --------------------------
+
+
+def test_aggregate_daily():
+    open_weather_map = OpenWeatherMap(api_key="test")
+
+    # 2024-10-21 21:00 and 2024-10-22 00:00, 03:00, 06:00 in Brasília (UTC-3)
+    data = {
+        "city": {"timezone": -10800},
+        "list": [
+            {
+                "dt": 1729555200 + i * 10800,
+                "main": {"temp": temperature},
+                "wind": {"speed": wind_speed},
+                "weather": [{"description": weather}],
+            }
+            for i, (temperature, wind_speed, weather) in enumerate(
+                [
+                    (20.0, 1.0, "céu limpo"),
+                    (18.0, 2.0, "chuva leve"),
+                    (16.0, 4.0, "nublado"),
+                    (17.0, 6.0, "chuva leve"),
+                ]
+            )
+        ],
+    }
+    columns = open_weather_map._to_forecast_columns(data)
+    daily = open_weather_map._aggregate_daily(columns, "Rio de Janeiro", "RJ")
+
+    assert [str(forecast.date.date()) for forecast in daily] == [
+        "2024-10-21",
+        "2024-10-22",
+    ]
+    assert daily[1].temperature_min == 16.0
+    assert daily[1].temperature_max == 18.0
+    assert daily[1].wind_speed == 4.0
+    assert daily[1].weather == "chuva leve"
+    assert daily[1].timestamp == 1729555200 + 10800
+
+    # Date windows use the same aggregation
+    window = open_weather_map._aggregate_daily(
+        columns,
+        "Rio de Janeiro",
+        "RJ",
+        start_date=daily[1].date.date(),
+        end_date=daily[1].date.date(),
+    )
+    assert window == daily[1:]
+
+
+def test_async_weather_many(tmp_path, monkeypatch):
+    monkeypatch.setenv("__CONFIG_OVERRIDE_temp_storage_dir", str(tmp_path))
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url.path)
+
+        # Rate limit the first request
+        if len(requests) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if "geocode" in request.url.path:
+            location = {"lat": -22.97, "lng": -42.03}
+            return httpx.Response(
+                200,
+                json={
+                    "status": "OK",
+                    "results": [{"geometry": {"location": location}}],
+                },
+            )
+        if request.url.path.endswith("/forecast"):
+            forecast = {
+                "dt": int(time.time()),
+                "main": {"temp": 25.0},
+                "wind": {"speed": 3.0},
+                "weather": [{"description": "céu limpo"}],
+            }
+            return httpx.Response(
+                200, json={"city": {"timezone": 0}, "list": [forecast]}
+            )
+        return httpx.Response(200, json={"name": "Arraial do Cabo", "dt": 0})
+
+    AsyncOpenWeatherMap._coordinates.clear()
+    open_weather_map = AsyncOpenWeatherMap(
+        api_key="test",
+        google_maps_api_key="test",
+        transport=httpx.MockTransport(handler),
+    )
+    open_weather_map.backoff_factor = 0
+
+    async def fetch_many():
+        return await asyncio.gather(
+            open_weather_map.get_forecasts_many([("Arraial do Cabo", "RJ")]),
+            open_weather_map.get_current_weather_many([("Arraial do Cabo", "RJ")]),
+        )
+
+    forecasts, weather = asyncio.run(fetch_many())
+
+    assert forecasts[("Arraial do Cabo", "RJ")][0].temperature_max == 25.0
+    assert weather[("Arraial do Cabo", "RJ")].city == "Arraial do Cabo"
+
+    # The city is geocoded once and the rate limited request is retried
+    assert sum("geocode" in path for path in requests) == 2
+    assert len(requests) == 4
+
+
+# Test reusing the same client from another event loop
+def test_async_weather_many_event_loops(tmp_path, monkeypatch):
+    monkeypatch.setenv("__CONFIG_OVERRIDE_temp_storage_dir", str(tmp_path))
+
+    async def handler(request):
+        await asyncio.sleep(0)
+        location = {"lat": -22.97, "lng": -42.03}
+        return httpx.Response(
+            200,
+            json={"status": "OK", "results": [{"geometry": {"location": location}}]},
+        )
+
+    # One request in flight, so the cities wait for the limiter
+    open_weather_map = AsyncOpenWeatherMap(
+        api_key="test",
+        google_maps_api_key="test",
+        concurrency=1,
+        transport=httpx.MockTransport(handler),
+    )
+    cities = [("Paraty", "RJ"), ("Cunha", "SP")]
+
+    async def geocode_many():
+        return await open_weather_map._run_many(
+            cities, open_weather_map._get_coordinates_async
+        )
+
+    for _ in range(2):
+        AsyncOpenWeatherMap._coordinates.clear()
+        assert asyncio.run(geocode_many()) == {
+            city: (-22.97, -42.03) for city in cities
+        }
+
+
+# Test fetching a fresh forecast while the cache would serve the expired one
+def test_forecast_fresh(tmp_path, monkeypatch):
+    monkeypatch.setenv("__CONFIG_OVERRIDE_temp_storage_dir", str(tmp_path))
+
+    def forecast_data(temperature):
+        forecast = {
+            "dt": int(time.time()),
+            "main": {"temp": temperature},
+            "wind": {"speed": 3.0},
+            "weather": [{"description": "céu limpo"}],
+        }
+        return {"city": {"timezone": 0}, "list": [forecast]}
+
+    # The cached forecast has expired, but is still served while it is refreshed
+    store = ForecastStore()
+    store._write(
+        store.get_key(-22.97, -42.03),
+        {"fetched_at": 0, "expires_at": time.time() - 60, "data": forecast_data(20.0)},
+    )
+
+    fresh_data = forecast_data(25.0)
+    open_weather_map = OpenWeatherMap(api_key="test")
+    with patch.object(
+        OpenWeatherMap, "get_coordinates", return_value=(-22.97, -42.03)
+    ), patch(
+        "services.OpenWeatherMap.HttpClient.get_json", return_value=fresh_data
+    ) as get_json:
+        forecasts = open_weather_map.get_forecast_for_next_5_days(
+            "Arraial do Cabo", "RJ", fresh=True
+        )
+
+    get_json.assert_called_once()
+    assert forecasts[0].temperature_max == 25.0
+    assert store.get_fresh(-22.97, -42.03) == fresh_data
+
+
+# --------------------------
+# ForecastStore Tests
+# --------------------------
+
+
+def test_forecast_store(tmp_path):
+    store = ForecastStore(cache_dir=str(tmp_path))
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"list": [len(calls)]}
+
+    # Nearby coordinates share the cached forecast
+    assert store.get(-22.9711, -43.1822, fetch) == {"list": [1]}
+    assert store.get(-22.9689, -43.1796, fetch) == {"list": [1]}
+    assert len(calls) == 1
+
+    # Forecasts expire at the next 3-hour boundary
+    assert store.get_expiration(3 * 3600 - 1) == 3 * 3600
+    assert store.get_expiration(3 * 3600) == 6 * 3600
+
+    # Expired forecasts are served while they are refreshed in the background
+    path = tmp_path / f"{store.get_key(-22.9711, -43.1822)}.json"
+    entry = json.loads(path.read_text())
+    entry["expires_at"] = time.time() - 60
+    path.write_text(json.dumps(entry))
+
+    assert store.get(-22.9711, -43.1822, fetch) == {"list": [1]}
+    for _ in range(50):
+        if len(calls) == 2 and not ForecastStore._refresh_lock.get_keys():
+            break
+        time.sleep(0.1)
+    assert store.get(-22.9711, -43.1822, fetch) == {"list": [2]}
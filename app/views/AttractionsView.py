@@ -1,13 +1,10 @@
 import streamlit as st
-import datetime
 import random
 
-from services.YelpAttractionsScrapper import YelpAttractionsScrapper
-from services.GooglePlacesAttractionsScrapper import GooglePlacesAttractionsScrapper
-
 from services.AttractionsData import AttractionsData
+from services.AttractionsRefresher import AttractionsRefresher
+from services.ImageCache import ImageCache
 from services.Logger import _log
-from lib.Utils import Utils
 
 from models.Attraction import AttractionModel
 from typing import List
@@ -25,7 +22,7 @@ class AttractionsView:
         start: int = 0,
         limit: int = 18,
         attractions: List[AttractionModel] = None,
-        expire_time: int = 8640000,  # 100 days
+        expire_time: int = None,
     ):
         """
         Initialize the AttractionsView class.
@@ -36,7 +33,7 @@ class AttractionsView:
             start (int): Starting index for fetching attractions.
             limit (int): Number of attractions to fetch.
             attractions (list[Attraction]): Pre-fetched attractions data (optional).
-            expire_time (int): Time in seconds to expire the data (default: 100 days).
+            expire_time (int): Time in seconds to expire the data (default: 'attractions_max_age' config, 100 days).
         """
         self.city_name = city_name
         self.state_name = state_name
@@ -44,6 +41,7 @@ class AttractionsView:
         self.start = start
         self.limit = limit
         self.expire_time = expire_time
+        self.image_cache = ImageCache()
 
         # Should be last!
         self.attractions = attractions if attractions else self._get_attractions()
@@ -90,7 +88,7 @@ class AttractionsView:
             attraction (AttractionModel): AttractionModel object.
         """
         try:
-            st.image(str(attraction.image), use_container_width=True)
+            st.image(self._get_image(attraction), use_container_width=True)
 
             # Display a star for review_stars
             stars = "⭐" * int(attraction.review_stars)
@@ -126,7 +124,7 @@ class AttractionsView:
             selected (bool): Whether the attraction is pre-selected (default: False).
         """
         try:
-            st.image(str(attraction.image), use_container_width=True)
+            st.image(self._get_image(attraction), use_container_width=True)
 
             # Display a star for review_stars
             stars = "⭐" * int(attraction.review_stars)
@@ -157,71 +155,42 @@ class AttractionsView:
                 level="ERROR",
             )
 
-    def _get_attractions(self) -> List[AttractionModel]:
-        """
-        Get the attractions data for the specified city and state.
-
-        Returns:
-            list[AttractionModel]: List of validated AttractionModel objects.
+    def _get_image(self, attraction: AttractionModel) -> str:
         """
-        with st.spinner("Buscando atrações..."):
-            attractions = AttractionsData().get(self.slug)
-
-            # Check if the data is expired
-            old_attractions = None
-            if attractions and self._attractions_expired(attractions[0].created_at):
-                old_attractions = attractions  # Save the old data
-                attractions = None
-
-            if attractions:
-                return attractions
-
-            # Fetch the attractions data
-            try:
-                attractions = self._fetch_attractions()
-            except Exception as e:
-                _log(f"Error fetching attractions: {e}", level="ERROR")
-                # Use the old data if available
-                attractions = old_attractions if old_attractions else []
-
-            return attractions
+        Get the image to display in the grid, the thumbnail of the cached images.
 
-    def _fetch_attractions(self) -> List[AttractionModel]:
-        """
-        Fetch the attractions data from the available sources.
-        Currently, it tries to fetch from Google Places and Yelp as fallback.
+        Args:
+            attraction (AttractionModel): AttractionModel object.
 
         Returns:
-            list[AttractionModel]: List of AttractionModel objects.
+            str: The thumbnail path, or the attraction image if it has no thumbnail.
         """
-        # Try to fetch the attractions from Google Places first
-        attractions = GooglePlacesAttractionsScrapper().get_near_attractions(
-            self.city_name, self.state_name, self.start, self.limit
-        )
-
-        # If no attractions are found, try fetching from Yelp
-        if not attractions:
-            attractions = YelpAttractionsScrapper().get_near_attractions(
-                self.city_name, self.state_name, self.start, self.limit
-            )
+        return self.image_cache.get_thumbnail(str(attraction.image))
 
-        # Save the attractions data
-        AttractionsData().save(slug=self.slug, attractions=attractions)
-
-        return attractions
-
-    def _attractions_expired(self, created_at: datetime) -> bool:
+    def _get_attractions(self) -> List[AttractionModel]:
         """
-        Check if the attractions data is expired.
-
-        Args:
-            created_at (datetime): The creation date of the data.
+        Get the attractions data for the specified city and state.
+        Expired data is returned right away and refreshed in the background.
 
         Returns:
-            bool: True if the data is expired, False otherwise.
+            list[AttractionModel]: List of validated AttractionModel objects.
         """
-        lifetime = datetime.datetime.now() - Utils.to_datetime(created_at)
-        lifetime_seconds = lifetime.total_seconds()
-        is_expired = lifetime_seconds > self.expire_time
+        refresher = AttractionsRefresher()
+        if self.expire_time:
+            refresher.max_age = self.expire_time
+
+        attractions = AttractionsData().get(self.slug)
+        if attractions:
+            if refresher.is_expired(attractions[0].created_at):
+                refresher.refresh_in_background(self.city_name, self.state_name)
+            return attractions
 
-        return is_expired
+        # Nothing to show yet, fetch the attractions data now
+        with st.spinner("Buscando atrações..."):
+            try:
+                return refresher.refresh(
+                    self.city_name, self.state_name, self.start, self.limit
+                )
+            except Exception as e:
+                _log(f"Error fetching attractions: {e}", level="ERROR")
+                return []
@@ -3,8 +3,11 @@ import streamlit as st
 
 import streamlit.components.v1 as components
 
+from services.AppData import AppData
+from services.AttractionsCatalog import AttractionsCatalog
 from services.GoogleMaps import GoogleMaps
 from services.CityState import CityStateData
+from services.TripData import TripData
 from services.Logger import _log
 
 from lib.Utils import Utils
@@ -76,6 +79,8 @@ class TripView:
             st.write("##### Atrações para conhecer")
             self.render_attractions()
 
+        self.render_nearby_attractions()
+
         st.write("#### 🤖 Roteiro")
         self.render_itinerary()
 
@@ -163,10 +168,11 @@ class TripView:
 
         # Display Google Maps directions iframe
         google_maps = GoogleMaps()
+        city_state_data = CityStateData()
         origin = f"""{self.trip_model.origin_city}, {
-            CityStateData().uf_to_state(self.trip_model.origin_state)}"""
+            city_state_data.uf_to_state(self.trip_model.origin_state)}"""
         destination = f"""{self.trip_model.destination_city}, {
-            CityStateData().uf_to_state(self.trip_model.destination_state)}"""
+            city_state_data.uf_to_state(self.trip_model.destination_state)}"""
         iframe_url = google_maps.get_google_maps_directions_iframe_url(
             origin, destination, mode=self.trip_model.travel_by
         )
@@ -222,6 +228,29 @@ class TripView:
         if attractions:
             AttractionsView(attractions=attractions).render_attractions()
 
+    def render_nearby_attractions(self, limit: int = 12):
+        """
+        Render the attractions of the other cities near the destination.
+
+        Args:
+            limit (int): The maximum number of attractions to show.
+        """
+        km = float(AppData().get_config("attractions_nearby_km") or 100)
+        lat, long = TripData.get_coordinates(self.trip_model)
+        destination = (
+            self.trip_model.destination_city,
+            self.trip_model.destination_state,
+        )
+        attractions = [
+            attraction
+            for attraction, _ in AttractionsCatalog().within_radius(lat, long, km)
+            if (attraction.city_name, attraction.state_name) != destination
+        ][:limit]
+
+        if attractions:
+            st.write(f"##### Atrações a até {km:.0f} km do destino")
+            AttractionsView(attractions=attractions).render_attractions()
+
     def render_notes(self):
         """
         Render the trip notes.
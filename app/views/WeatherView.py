@@ -6,8 +6,9 @@ from services.OpenWeatherMap import OpenWeatherMap
 from services.Logger import _log
 
 from lib.Utils import Utils
+from lib.ForecastIndex import ForecastIndex
 
-from models.Weather import ForecastModel
+from models.Weather import ForecastModel, ForecastSeries
 from typing import List
 
 
@@ -21,7 +22,7 @@ class WeatherView:
         city_name="",
         state_name="",
         days=6,
-        weather_data: List[ForecastModel] = None,
+        weather_data: List[ForecastModel] | ForecastSeries = None,
     ):
         """
         Initialize the WeatherView class.
@@ -30,7 +31,7 @@ class WeatherView:
             city_name (str): The name of the city.
             state_name (str): The name of the state.
             days (int): The number of days to forecast.
-            weather_data (List[ForecastModel], optional): The weather data to render. Defaults to None.
+            weather_data (List[ForecastModel] | ForecastSeries, optional): The weather data to render. Defaults to None.
         """
         self.city_name = city_name
         self.state_name = state_name
@@ -43,10 +44,13 @@ class WeatherView:
         """
         # Check if the forecast data is available
         # Currently, the forecast data is only available for the next 5 days
-        if not self.forecast or type(self.forecast) != list:
+        if not self.forecast or not isinstance(self.forecast, (list, ForecastSeries)):
             st.info("Ainda não temos previsão do tempo para a data selecionada.")
             return
 
+        # One forecast per date, sorted by date
+        forecast_list = ForecastIndex(self.forecast).to_list()
+
         # Display temperatures in 5 columns
         columns = 6
         cols = st.columns(columns)
@@ -55,10 +59,10 @@ class WeatherView:
         _rendered_forecast = None
         for d in range(self.days):
 
-            if d >= len(self.forecast):
+            if d >= len(forecast_list):
                 forecast = None
             else:
-                forecast = self.forecast[d]
+                forecast = forecast_list[d]
                 forecast = forecast.__dict__
 
             with cols[i % columns]: